@@ -2,30 +2,73 @@
 Calendar API endpoints
 """
 
-from fastapi import APIRouter, Query
-from typing import List, Dict, Optional
+import gzip
+import hashlib
+import json
+import logging
+from datetime import date
+from typing import Dict
 
-from backend.services.data_service import DataService
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import Response
+
+from backend.core.assets import accepts_encoding, encoded_etag, etag_matches
+from backend.core.log import get_logger
+from backend.services.calendar_snapshot import filter_calendar
+from backend.services.data_service import get_data_service
 
 router = APIRouter()
-data_service = DataService()
+data_service = get_data_service()
+logger = get_logger(__name__)
+
+
+def calendar_response(request: Request, period: str = "all", status: str = "all") -> Response:
+    """The formatted calendar from the shared snapshot, filtered by period and status"""
+    view = data_service.calendar_snapshot.current()
+    if view is None:
+        return Response(content=b"[]", media_type="application/json")
+
+    filtered = (period or "all") != "all" or (status or "all") != "all"
+    etag = f'"calendar-{view.generation}"'
+    if filtered:
+        # Filtered responses depend on the filters and today's date as well as the data
+        key = f"{period}|{status}|{date.today().isoformat()}".encode('utf-8')
+        etag = f'"calendar-{view.generation}-{hashlib.sha1(key).hexdigest()[:12]}"'
+    gzipped = accepts_encoding(request.headers.get("accept-encoding", ""), "gzip")
+    if gzipped:
+        etag = encoded_etag(etag, "gzip")
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "X-Snapshot-Generation": str(view.generation)}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
+    if filtered:
+        entries = filter_calendar(json.loads(view.section('calendar')), period, status)
+        body = json.dumps(entries, separators=(',', ':')).encode('utf-8')
+        if gzipped:
+            body = gzip.compress(body, compresslevel=6)
+    else:
+        # Pre-serialized once per data change and shared by every worker
+        body = view.section('calendar.gz' if gzipped else 'calendar')
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Returning IPOs", extra={'count': view.meta.get('count'), 'generation': view.generation})
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @router.get("")
 async def get_calendar(
-    period: Optional[str] = Query("all", description="Filter by period"),
-    status: Optional[str] = Query("all", description="Filter by status")
-) -> List[Dict]:
+    request: Request,
+    period: str = Query("all", description="Filter by period: this-week, next-week, this-month"),
+    status: str = Query("all", description="Filter by status")
+) -> Response:
     """Get IPO calendar data"""
-    
-    # Get all IPOs
-    ipos = data_service.get_ipo_calendar()
-    
-    # Apply filters if needed
-    # For now, return all
-    return ipos
+    return calendar_response(request, period, status)
 
 @router.get("/{ticker}")
 async def get_ipo_details(ticker: str) -> Dict:
     """Get details for specific IPO"""
-    
+
     return data_service.get_company_profile(ticker)
@@ -0,0 +1,68 @@
+"""
+Debug endpoints - live profiling and memory diagnostics (require DEBUG_TOKEN)
+"""
+
+import asyncio
+from typing import Dict
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+
+from backend.core.profiling import (
+    DEFAULT_INTERVAL, MAX_WINDOW_SECONDS, debug_token, finish_window, is_authorized,
+    memory_tracker, sample_window
+)
+
+def require_debug_token(request: Request):
+    """404 when debugging is disabled, 401 when the token is missing or wrong"""
+    if not debug_token():
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_authorized({k.lower(): v for k, v in request.headers.items()}):
+        raise HTTPException(status_code=401, detail="Debug token required")
+
+router = APIRouter(dependencies=[Depends(require_debug_token)])
+
+@router.post("/debug/profile")
+async def profile_window(
+    seconds: float = Query(10.0, gt=0, le=MAX_WINDOW_SECONDS),
+    interval_ms: float = Query(DEFAULT_INTERVAL * 1e3, ge=1, le=1000),
+    format: str = Query("collapsed", pattern="^(collapsed|top)$")
+):
+    """Sample every thread's stack for a time window while traffic keeps flowing"""
+    sampler = sample_window(seconds, interval_ms / 1e3)
+    if sampler is None:
+        raise HTTPException(status_code=409, detail="Another profiling session is running")
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        finish_window(sampler)
+
+    if format == "top":
+        return {"seconds": seconds, "samples": sampler.samples, "top": sampler.top()}
+    return PlainTextResponse(sampler.collapsed(), headers={"X-Profile-Samples": str(sampler.samples)})
+
+@router.get("/debug/memory")
+async def memory_status() -> Dict:
+    """Whether tracemalloc is running and how much it has traced"""
+    return memory_tracker.status()
+
+@router.post("/debug/memory/start")
+async def memory_start(frames: int = Query(10, ge=1, le=50)) -> Dict:
+    """Start tracing allocations and take the baseline snapshot"""
+    return memory_tracker.start(frames)
+
+@router.post("/debug/memory/snapshot")
+async def memory_snapshot(
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(25, ge=1, le=500)
+) -> Dict:
+    """Allocation growth since the previous snapshot"""
+    result = memory_tracker.snapshot(group_by, limit)
+    if result is None:
+        raise HTTPException(status_code=409, detail="Memory tracing is not running")
+    return result
+
+@router.post("/debug/memory/stop")
+async def memory_stop() -> Dict:
+    """Stop tracing and drop the baseline"""
+    return memory_tracker.stop()
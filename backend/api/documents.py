@@ -0,0 +1,97 @@
+"""
+Filing viewer endpoints - citation chunks and HTTP Range reads
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Query, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+from backend.services.document_service import DocumentService
+from backend.services.table_store import TableStore
+
+router = APIRouter()
+document_service = DocumentService()
+table_store = TableStore()
+
+@router.get("/tables/query")
+async def query_tables(
+    kind: Optional[str] = Query(None, description="use_of_proceeds, capitalization, dilution, ..."),
+    label: Optional[str] = Query(None, description="Row label substring"),
+    column: Optional[str] = Query(None, description="Column header substring"),
+    ticker: Optional[List[str]] = Query(None),
+    limit: int = Query(1000, ge=1, le=10000)
+) -> List[Dict]:
+    """Numeric table cells across filings, each with its citation ID"""
+    return table_store.query(kind, label, column, ticker, limit)
+
+@router.get("/documents/{ticker}/{filename}/tables")
+async def get_document_tables(ticker: str, filename: str) -> List[Dict]:
+    """Tables extracted from a processed filing, as column-major frames"""
+    if document_service.resolve(ticker, filename) is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    tables = table_store.tables(ticker, Path(filename).stem)
+    if tables is None:
+        raise HTTPException(status_code=404, detail="Tables not extracted yet")
+    return tables
+
+@router.get("/documents/{ticker}/{filename}/citations")
+async def get_citation_chunk(
+    ticker: str,
+    filename: str,
+    start: int = Query(0, ge=0, description="First citation (0-based)"),
+    end: int = Query(49, ge=0, description="Last citation (inclusive)")
+) -> Response:
+    """Serve citations start..end of a processed filing as an HTML fragment"""
+    chunk = document_service.citation_chunk(ticker, filename, start, end)
+    if chunk is None:
+        raise HTTPException(status_code=404, detail="Citation index not found")
+
+    headers = {
+        "X-Citation-Range": f"{chunk['first']}-{chunk['last']}",
+        "X-Citation-Total": str(chunk['total']),
+    }
+    return Response(content=chunk['html'], media_type="text/html; charset=utf-8", headers=headers)
+
+@router.get("/documents/{ticker}/{filename}")
+async def get_document(ticker: str, filename: str, request: Request) -> Response:
+    """Serve a filing, honouring HTTP Range so viewers can page through it"""
+    path = document_service.resolve(ticker, filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    path = document_service.cited_path(path)
+    if document_service.is_compressed(path):
+        # Compressed blobs are streamed whole; Range needs a plain file to map
+        return StreamingResponse(
+            document_service.store.iter_chunks(path),
+            media_type="text/html; charset=utf-8"
+        )
+
+    size = document_service.size(path)
+    headers = {"Accept-Ranges": "bytes"}
+
+    range_header = request.headers.get("range")
+    if not range_header:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(
+            document_service.iter_range(path, 0, size),
+            media_type="text/html; charset=utf-8",
+            headers=headers
+        )
+
+    byte_range = document_service.parse_range(range_header, size)
+    if byte_range is None:
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    headers["Content-Length"] = str(end - start)
+    return StreamingResponse(
+        document_service.iter_range(path, start, end),
+        status_code=206,
+        media_type="text/html; charset=utf-8",
+        headers=headers
+    )
@@ -0,0 +1,71 @@
+"""
+Job endpoints - queue heavy document work and poll its progress
+"""
+
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+import backend.services.job_handlers  # noqa: F401  (registers the job kinds)
+from backend.models.schemas import JobRequest
+from backend.services.job_queue import DEFAULT_DB_PATH, JOB_KINDS, JobQueue, WorkerPool
+
+router = APIRouter()
+job_queue = JobQueue(os.getenv("JOBS_DB_PATH", DEFAULT_DB_PATH))
+
+# Set both to 0 to leave the work to scripts/run_job_workers.py
+worker_pool = WorkerPool(
+    job_queue,
+    cpu_workers=int(os.getenv("JOB_WORKERS_CPU", "2")),
+    io_workers=int(os.getenv("JOB_WORKERS_IO", "4")),
+)
+
+def start_workers():
+    if any(worker_pool.sizes.values()):
+        worker_pool.start()
+
+def stop_workers():
+    worker_pool.stop()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the job workers for as long as the app serves"""
+    start_workers()
+    try:
+        yield
+    finally:
+        stop_workers()
+
+# The queue calls below hash files and wait on SQLite locks, so these are plain functions
+# that FastAPI runs in its threadpool rather than on the event loop
+
+@router.post("/jobs", status_code=202)
+def submit_job(request: JobRequest):
+    """Queue a job; an identical queued, running or finished job is returned instead (200)"""
+    if request.kind not in JOB_KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind; expected one of {sorted(JOB_KINDS)}")
+    try:
+        job = job_queue.submit(request.kind, request.payload, request.priority)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return JSONResponse(job, status_code=200 if job['deduplicated'] else 202)
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str) -> Dict:
+    """Job status, progress and, once done, its result"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/jobs")
+def list_jobs(
+    status: Optional[str] = Query(None, pattern="^(queued|running|done|failed)$"),
+    kind: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=500)
+) -> List[Dict]:
+    """Most recent jobs first"""
+    return job_queue.recent(status, kind, limit)
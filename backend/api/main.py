@@ -2,14 +2,17 @@
 FastAPI main application for Hedge Intelligence
 Created: 2025-06-14 14:41:58 UTC
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import JSONResponse
 
-from backend.api import routes, websockets
+from backend.api import debug, documents, jobs, routes, websockets
+from backend.core.assets import AssetPipeline, NegotiatedGZipMiddleware
+from backend.core.metrics import MetricsMiddleware, metrics_response
+from backend.core.profiling import ProfilingMiddleware
 
-app = FastAPI(title="Hedge Intelligence API", version="2.0.0")
+# The lifespan starts and stops the background job workers
+app = FastAPI(title="Hedge Intelligence API", version="2.0.0", lifespan=jobs.lifespan)
 
 # Enable CORS
 app.add_middleware(
@@ -19,18 +22,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="frontend/static"), name="static")
+# Compress large JSON responses (citation lists, calendars)
+app.add_middleware(NegotiatedGZipMiddleware, minimum_size=1000)
+
+# Per-request profiling (X-Profile header or ?__profile=, requires DEBUG_TOKEN)
+app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so timings include compression
+app.add_middleware(MetricsMiddleware)
+
+# Static assets are fingerprinted and pre-compressed once at startup
+assets = AssetPipeline(static_dir="frontend/static", index_path="frontend/index.html")
+
+@app.get("/static/{path:path}", include_in_schema=False)
+async def serve_static(path: str, request: Request):
+    return assets.serve_static(path, request)
 
 # Serve frontend
 @app.get("/")
-async def serve_frontend():
-    with open("frontend/index.html", "r") as f:
-        return HTMLResponse(content=f.read())
+async def serve_frontend(request: Request):
+    response = assets.serve_index(request)
+    if response is None:
+        return JSONResponse({"error": "Frontend not found"}, status_code=404)
+    return response
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
 
 # Include routers
 app.include_router(routes.router)
+app.include_router(documents.router)
 app.include_router(websockets.router)
+app.include_router(debug.router)
+app.include_router(jobs.router)
 
 if __name__ == "__main__":
     import uvicorn
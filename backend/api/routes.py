@@ -3,71 +3,59 @@ API Routes with proper IPO data mapping
 Date: 2025-06-14 17:58:42 UTC
 """
 
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Request
+from fastapi.responses import Response
 from typing import List, Dict, Optional
-from backend.services.data_service import DataService
+from backend.api.calendar import calendar_response
+from backend.core.log import get_logger
+from backend.services.data_service import get_data_service
 from pathlib import Path
 import json
 
 router = APIRouter()
-data_service = DataService()
-
-def format_ipo_for_display(ipo: Dict) -> Dict:
-    """Format IPO data for frontend display with ALL fields"""
-    
-    # Format the display data properly
-    formatted = {
-        # Date should show expected trade date
-        'expected_date': ipo.get('expected_date', 'TBD'),
-        
-        # Core fields
-        'ticker': ipo.get('ticker', ''),
-        'company': ipo.get('company', ''),
-        
-        # Financial data
-        'price_range': ipo.get('price_range', 'TBD'),
-        'price_low': ipo.get('price_low', 0),
-        'price_high': ipo.get('price_high', 0),
-        'shares': f"{ipo.get('shares_millions', 0):.1f}M" if ipo.get('shares_millions') else '-',
-        'volume': ipo.get('volume', '-'),
-        
-        # Status and metadata
-        'status': ipo.get('status', 'Expected'),
-        'documents': ipo.get('filing_count', 0),
-        'lockup': ipo.get('lockup', '180 days'),
-        
-        # Additional fields
-        'lead_managers': ipo.get('lead_managers', '-'),
-        'scoop_rating': ipo.get('scoop_rating', '-'),
-        'exchange': ipo.get('exchange', 'TBD'),
-    }
-    
-    return formatted
+data_service = get_data_service()
+logger = get_logger(__name__)
 
 @router.get("/calendar")
 async def get_ipo_calendar(
+    request: Request,
     period: str = Query("all"),
     status: str = Query("all")
-) -> List[Dict]:
+) -> Response:
     """Get IPO calendar with proper data"""
-    
-    # Get real data
-    listings = data_service.get_ipo_calendar({'period': period, 'status': status})
-    
-    # Format for display
-    formatted = [format_ipo_for_display(ipo) for ipo in listings]
-    
-    print(f"📊 API: Returning {len(formatted)} IPOs")
-    if formatted:
-        print(f"   First: {formatted[0].get('ticker')} - {formatted[0].get('expected_date')}")
-    
-    return formatted
+    return calendar_response(request, period, status)
+
+@router.get("/listings")
+async def query_listings(
+    status: Optional[str] = Query(None),
+    since: Optional[str] = Query(None, description="Expected date from, YYYY-MM-DD"),
+    until: Optional[str] = Query(None, description="Expected date to, YYYY-MM-DD"),
+    cik: Optional[str] = Query(None),
+    sector: Optional[str] = Query(None)
+) -> List[Dict]:
+    """Raw calendar listings filtered by status, date, CIK or sector"""
+    return data_service.query_listings(status, since, until, cik, sector)
 
 @router.get("/companies/tree")
 async def get_companies_tree() -> Dict:
     """Get companies organized by sector"""
     return data_service.get_companies_tree()
 
+@router.get("/companies/tree/summary")
+async def get_companies_tree_summary() -> List[Dict]:
+    """Sector nodes with per-node counts"""
+    return data_service.get_companies_tree_summary()
+
+@router.get("/companies/tree/{sector}")
+async def expand_companies_tree(
+    sector: str,
+    industry: Optional[str] = Query(None),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000)
+) -> Dict:
+    """Lazily expand one sector node"""
+    return data_service.expand_companies_tree(sector, industry, offset, limit)
+
 @router.get("/company/{ticker}")
 async def get_company_details(ticker: str) -> Dict:
     """Get company details"""
@@ -78,6 +66,40 @@ async def get_company_details(ticker: str) -> Dict:
     profile['documents'] = data_service.get_company_documents(ticker)
     return profile
 
+@router.get("/filings")
+async def get_filings(
+    ticker: Optional[str] = Query(None),
+    form_type: Optional[str] = Query(None, description="e.g. S-1, 8-K, SC 13G/A"),
+    since: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    until: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    sort: str = Query("date_desc", pattern="^(date_desc|date_asc|form)$")
+) -> List[Dict]:
+    """List filings from the manifest"""
+    return data_service.get_filings(ticker, form_type, since, until, sort)
+
+@router.get("/company/{ticker}/lockup")
+async def get_company_lockup(ticker: str) -> Dict:
+    """Get lock-up period extracted from the company's prospectus"""
+    lockup = data_service.get_lockup(ticker)
+    if not lockup:
+        raise HTTPException(status_code=404, detail="No lock-up found in filings")
+    return lockup
+
+@router.get("/cik/resolve")
+async def resolve_cik(
+    ticker: Optional[str] = Query(None),
+    company: Optional[str] = Query(None)
+) -> Dict:
+    """Resolve a ticker/company to a CIK with scored candidates"""
+    if not ticker and not company:
+        raise HTTPException(status_code=400, detail="ticker or company is required")
+    return data_service.resolve_cik(ticker, company)
+
+@router.get("/cik/calendar")
+async def resolve_calendar_ciks() -> Dict:
+    """Resolve CIKs for the whole IPO calendar"""
+    return data_service.resolve_calendar_ciks()
+
 @router.get("/watchlist")
 async def get_watchlist() -> Dict:
     """Get watchlist"""
@@ -88,3 +110,11 @@ async def update_watchlist(ticker: str, action: str = "add") -> Dict:
     """Update watchlist"""
     success = data_service.update_watchlist(ticker, action)
     return {'success': success}
+
+@router.get("/alerts")
+async def get_alerts(
+    ticker: Optional[str] = Query(None),
+    unread: bool = Query(False)
+) -> List[Dict]:
+    """Watchlist alerts, newest first"""
+    return data_service.get_alerts(ticker, unread)
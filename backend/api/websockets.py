@@ -1,31 +1,75 @@
-""" 
+"""
 WebSocket endpoints for real-time features
-""" 
+"""
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import json
 from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict
+
+from backend.core.log import get_logger
+from backend.services.chat_service import ChatService
+from backend.services.filing_manifest import document_key
 
 router = APIRouter()
+logger = get_logger(__name__)
+chat_service = ChatService()
+
+
+def _question(message: Dict) -> str:
+    """The question in a chat frame: {"text": ...} or {"question": ...}; ValueError otherwise"""
+    if message.get("text") is None:
+        raise ValueError("Messages must be text frames")
+    try:
+        payload = json.loads(message["text"])
+    except ValueError:
+        raise ValueError("Messages must be JSON")
+    question = (payload.get("text") or payload.get("question")) if isinstance(payload, dict) else None
+    if not isinstance(question, str) or not question.strip():
+        raise ValueError('Expected {"text": "<question>"}')
+    return question.strip()
+
+
+async def _answer(document: str, question: str) -> Dict:
+    try:
+        answer = await chat_service.answer(document, question)
+    except LookupError as e:
+        return {"type": "error", "text": str(e)}
+    except Exception as e:
+        logger.warning("Chat answer failed", extra={'document': document, 'error': str(e)})
+        return {"type": "error", "text": "Could not answer right now"}
+    return {
+        "type": "assistant",
+        "text": answer["text"],
+        "citations": answer["citations"],
+        "cached": answer["cached"],
+        "match": answer["match"],
+    }
+
 
-@router.websocket("/ws/chat/{document_id}")
-async def chat_endpoint(websocket: WebSocket, document_id: str):
-    """Document-aware chat with citations"""
+@router.websocket("/ws/chat/{ticker}/{filename}")
+async def chat_endpoint(websocket: WebSocket, ticker: str, filename: str):
+    """Document-aware chat with citations; repeated questions are answered from the cache"""
     await websocket.accept()
-    
+    # Filenames repeat across companies, so the filing is named by both
+    document = document_key(Path(ticker) / filename)
+
     try:
         while True:
-            data = await websocket.receive_text()
-            message = json.loads(data)
-            
-            # TODO: Implement AI response
-            response = {
-                "type": "assistant",
-                "text": "Chat response placeholder",
-                "citations": [],
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            }
-            
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            # Every frame gets a reply, so a client never waits on one that was dropped
+            try:
+                question = _question(message)
+            except ValueError as e:
+                response = {"type": "error", "text": str(e)}
+            else:
+                response = await _answer(document, question)
+            response["timestamp"] = datetime.now(timezone.utc).isoformat()
+
             await websocket.send_json(response)
-    
+
     except WebSocketDisconnect:
         pass
@@ -0,0 +1,249 @@
+"""
+Static asset pipeline - fingerprinted, pre-compressed frontend assets
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import re
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response
+from starlette.datastructures import Headers, MutableHeaders
+
+from backend.core.log import get_logger
+from backend.core.metrics import record_cache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = get_logger(__name__)
+
+# Fingerprinted URLs never change content, so browsers may cache them forever
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# Plain URLs (and index.html) must be revalidated against the ETag
+REVALIDATE_CACHE = "no-cache"
+
+# Below this size compression costs more than it saves
+MIN_COMPRESS_SIZE = 512
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+# Skip editor / backup copies that live next to the real assets
+IGNORED_SUFFIXES = (".backup", ".bak", ".map", "~")
+
+ENTITY_TAG_PATTERN = re.compile(r'(?:W/)?"[^"]*"')
+
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Accept-Encoding as coding -> q-value"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, *params = [p.strip() for p in part.split(";")]
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def accepts_encoding(accept_encoding: str, encoding: str) -> bool:
+    """Whether a client takes this encoding: listed (or covered by "*") with q > 0"""
+    accepted = accepted_encodings(accept_encoding)
+    return accepted.get(encoding, accepted.get("*", 0.0)) > 0
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check: "*" or any entity tag in the list, compared weakly (W/ ignored)"""
+    if if_none_match.strip() == "*":
+        return True
+    listed = {tag[2:] if tag.startswith("W/") else tag for tag in ENTITY_TAG_PATTERN.findall(if_none_match)}
+    return (etag[2:] if etag.startswith("W/") else etag) in listed
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Entity tag of an encoded variant: '"abc"' -> '"abc-gzip"'; identity keeps the tag"""
+    if encoding == "identity" or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+class NegotiatedGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that honours q-values: "gzip;q=0" is a refusal, not a request.
+
+    A response it compresses gets its own entity tag (see encoded_etag), since the gzip
+    body is a different representation from the one the handler tagged.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if not accepts_encoding(Headers(scope=scope).get("accept-encoding", ""), "gzip"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_tagged(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                etag = headers.get("etag")
+                if etag and headers.get("content-encoding") == "gzip" and not etag.endswith('-gzip"'):
+                    headers["etag"] = encoded_etag(etag, "gzip")
+            await send(message)
+
+        await super().__call__(scope, receive, send_tagged)
+
+
+class Asset:
+    """One static file with its pre-computed encodings"""
+
+    def __init__(self, rel_path: str, content: bytes):
+        self.rel_path = rel_path
+        self.media_type = mimetypes.guess_type(rel_path)[0] or "application/octet-stream"
+        self.digest = hashlib.md5(content).hexdigest()[:10]
+        self.fingerprinted_path = self._fingerprint(rel_path, self.digest)
+
+        # encoding -> bytes ("identity" is always present)
+        self.variants: Dict[str, bytes] = {"identity": content}
+        if len(content) >= MIN_COMPRESS_SIZE and self.media_type.startswith(COMPRESSIBLE_TYPES):
+            gz = gzip.compress(content, compresslevel=9, mtime=0)
+            if len(gz) < len(content):
+                self.variants["gzip"] = gz
+            if brotli is not None:
+                br = brotli.compress(content, quality=11)
+                if len(br) < len(content):
+                    self.variants["br"] = br
+
+        # Each encoding is its own representation, so each gets its own entity tag
+        self.etags: Dict[str, str] = {
+            encoding: encoded_etag(f'"{self.digest}"', encoding) for encoding in self.variants
+        }
+
+    @staticmethod
+    def _fingerprint(rel_path: str, digest: str) -> str:
+        """css/styles.css -> css/styles.<digest>.css"""
+        path = Path(rel_path)
+        return str(path.with_name(f"{path.stem}.{digest}{path.suffix}").as_posix())
+
+    def pick(self, accept_encoding: str) -> str:
+        """Best available encoding for an Accept-Encoding header"""
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and accepts_encoding(accept_encoding, encoding):
+                return encoding
+        return "identity"
+
+
+class AssetPipeline:
+    """Serve frontend/static from memory with ETags and immutable caching"""
+
+    def __init__(self, static_dir: str = "frontend/static", index_path: str = "frontend/index.html",
+                 url_prefix: str = "/static"):
+        self.static_dir = Path(static_dir)
+        self.index_path = Path(index_path)
+        self.url_prefix = url_prefix.rstrip("/")
+
+        self.assets: Dict[str, Asset] = {}
+        self.fingerprinted: Dict[str, Asset] = {}
+
+        self._index: Optional[Asset] = None
+        self._index_mtime: Optional[float] = None
+
+        self.build()
+
+    def build(self):
+        """Scan the static directory and pre-compute all variants"""
+        assets = {}
+        fingerprinted = {}
+
+        if self.static_dir.exists():
+            for file in sorted(self.static_dir.rglob("*")):
+                if not file.is_file() or file.name.endswith(IGNORED_SUFFIXES):
+                    continue
+                rel_path = file.relative_to(self.static_dir).as_posix()
+                asset = Asset(rel_path, file.read_bytes())
+                assets[rel_path] = asset
+                fingerprinted[asset.fingerprinted_path] = asset
+
+        self.assets = assets
+        self.fingerprinted = fingerprinted
+        # Force index.html to be re-rendered against the new fingerprints
+        self._index = None
+        self._index_mtime = None
+
+        logger.info("Built static assets", extra={'count': len(assets), 'brotli': brotli is not None})
+
+    def url_for(self, rel_path: str) -> str:
+        """Fingerprinted URL for a static asset (falls back to the plain URL)"""
+        asset = self.assets.get(rel_path)
+        name = asset.fingerprinted_path if asset else rel_path
+        return f"{self.url_prefix}/{name}"
+
+    def _rewrite_index(self, html: str) -> str:
+        """Point index.html at fingerprinted asset URLs"""
+        pattern = re.compile(r'(["\'])' + re.escape(self.url_prefix) + r'/([^"\'?#]+)\1')
+        return pattern.sub(lambda m: f"{m.group(1)}{self.url_for(m.group(2))}{m.group(1)}", html)
+
+    def index(self) -> Optional[Asset]:
+        """index.html bytes, reloaded only when the file changes on disk"""
+        try:
+            mtime = self.index_path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+        if self._index is None or mtime != self._index_mtime:
+            html = self.index_path.read_text(encoding="utf-8")
+            self._index = Asset("index.html", self._rewrite_index(html).encode("utf-8"))
+            self._index_mtime = mtime
+
+        return self._index
+
+    def respond(self, asset: Asset, request: Request, cache_control: str) -> Response:
+        """Build a response honouring If-None-Match and Accept-Encoding"""
+        encoding = asset.pick(request.headers.get("accept-encoding", ""))
+        headers = {
+            "ETag": asset.etags[encoding],
+            "Cache-Control": cache_control,
+        }
+        if len(asset.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+
+        not_modified = etag_matches(request.headers.get("if-none-match", ""), asset.etags[encoding])
+        record_cache('browser_etag', not_modified)
+        if not_modified:
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+
+        return Response(content=asset.variants[encoding], media_type=asset.media_type, headers=headers)
+
+    def serve_index(self, request: Request) -> Optional[Response]:
+        """Response for / or None if there is no frontend"""
+        asset = self.index()
+        if asset is None:
+            return None
+        return self.respond(asset, request, REVALIDATE_CACHE)
+
+    def serve_static(self, path: str, request: Request) -> Response:
+        """Response for /static/{path}"""
+        asset = self.fingerprinted.get(path)
+        if asset is not None:
+            return self.respond(asset, request, IMMUTABLE_CACHE)
+
+        asset = self.assets.get(path)
+        if asset is not None:
+            return self.respond(asset, request, REVALIDATE_CACHE)
+
+        return Response(status_code=404)
@@ -0,0 +1,125 @@
+"""
+Structured logging - leveled, rate-limited, one JSON object per line
+
+Usage:
+    from backend.core.log import get_logger
+    logger = get_logger(__name__)
+    logger.info("Loaded IPOs", extra={"count": 17, "source": "ipo_calendar.json"})
+
+LOG_LEVEL (default INFO) and LOG_FORMAT (json | text) are read from the environment.
+Disabled levels cost one integer comparison: pass values as extra/%-args, not f-strings.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+ROOT_LOGGER = "backend"
+
+# Per call site: at most BURST records, refilled at RATE per second
+RATE = 1.0
+BURST = 10
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """{"ts", "level", "logger", "msg", ...extra fields}"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = ' '.join(f"{k}={v}" for k, v in vars(record).items() if k not in _RECORD_FIELDS)
+        line = f"{record.levelname:<7} {record.name}: {record.getMessage()}"
+        if fields:
+            line = f"{line} {fields}"
+        if record.exc_info:
+            line = f"{line}\n{self.formatException(record.exc_info)}"
+        return line
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per call site so a hot loop cannot flood the log"""
+
+    def __init__(self, rate: float = RATE, burst: int = BURST):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        # (logger, pathname, lineno) -> [tokens, last refill, suppressed]
+        self._buckets: Dict[Tuple[str, str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Errors are never dropped
+        if record.levelno >= logging.ERROR:
+            return True
+
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+
+            bucket[0] -= 1
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+
+_configured = False
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None):
+    """Install the handler on the backend logger (idempotent)"""
+    global _configured
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel((level or os.getenv('LOG_LEVEL', 'INFO')).upper())
+
+    if _configured:
+        return
+    _configured = True
+
+    handler = logging.StreamHandler(sys.stderr)
+    fmt = fmt or os.getenv('LOG_FORMAT', 'json')
+    handler.setFormatter(TextFormatter() if fmt == 'text' else JsonFormatter())
+    handler.addFilter(RateLimitFilter())
+    logger.addHandler(handler)
+    logger.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the backend hierarchy, configuring logging on first use"""
+    if not _configured:
+        configure_logging()
+    if name != ROOT_LOGGER and not name.startswith(ROOT_LOGGER + '.'):
+        name = f"{ROOT_LOGGER}.{name}"
+    return logging.getLogger(name)
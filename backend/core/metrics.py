@@ -0,0 +1,417 @@
+"""
+Metrics - counters and histograms exposed in Prometheus text format, summed across processes
+
+Every process (uvicorn worker or job worker) mirrors its values into a file of its own
+under METRICS_DIR, mapped so an update is one write into shared memory. A scrape of any
+worker sums the files of every process, so each scrape reports totals for the whole
+deployment. Files of exited processes keep counting towards counters and histograms;
+gauges only count live processes.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from starlette.responses import Response
+
+from backend.core.log import get_logger
+
+logger = get_logger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+METRICS_MAGIC = b'HIMETR01'
+# magic, bytes used; entries follow as [key length][key, padded to 8 bytes][float64]
+HEADER_FORMAT = '<8sI4x'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+INITIAL_FILE_SIZE = 64 * 1024
+
+# Seconds; tuned for API calls (ms) up to model calls (tens of seconds)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists but belongs to someone else, or the platform cannot tell
+        return True
+    return True
+
+
+class ProcessValues:
+    """This process's metric values, mirrored into <pid>.metrics under directory.
+
+    Only the owning process writes its file. An entry is appended once per series and then
+    updated in place; the used length moves only after an entry is complete, so readers
+    never see half of one.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._path = None
+        self._map = None
+        self._used = 0
+        # (metric name, labels, sample) -> offset of its value
+        self._positions: Dict[Tuple, int] = {}
+
+    def _open(self):
+        pid = os.getpid()
+        self._pid = pid
+        self._map = None
+        self._positions = {}
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{pid}.metrics"
+            if path.exists():
+                # Left by an exited process with the same pid; its totals still count
+                path.replace(path.with_name(f"{pid}-{time.time_ns()}.metrics"))
+            with open(path, 'w+b') as f:
+                f.truncate(INITIAL_FILE_SIZE)
+                self._map = mmap.mmap(f.fileno(), INITIAL_FILE_SIZE)
+        except OSError as e:
+            logger.warning("Metrics stay in-process", extra={'directory': str(self.directory), 'error': str(e)})
+            return
+        self._path = path
+        self._used = HEADER_SIZE
+        struct.pack_into(HEADER_FORMAT, self._map, 0, METRICS_MAGIC, self._used)
+
+    def set(self, key: Tuple, value: float):
+        with self._lock:
+            # Also true in a forked child, which must not write its parent's file
+            if self._pid != os.getpid():
+                self._open()
+            if self._map is None:
+                return
+            position = self._positions.get(key)
+            if position is None:
+                position = self._append(key)
+            struct.pack_into('<d', self._map, position, value)
+
+    def _append(self, key: Tuple) -> int:
+        name, labels, sample = key
+        encoded = json.dumps([name, list(labels), sample]).encode('utf-8')
+        padded = (4 + len(encoded) + 7) // 8 * 8
+        if self._used + padded + 8 > len(self._map):
+            self._grow(self._used + padded + 8)
+        struct.pack_into('<I', self._map, self._used, len(encoded))
+        self._map[self._used + 4:self._used + 4 + len(encoded)] = encoded
+        position = self._used + padded
+        struct.pack_into('<d', self._map, position, 0.0)
+        self._used = position + 8
+        struct.pack_into('<I', self._map, 8, self._used)
+        self._positions[key] = position
+        return position
+
+    def _grow(self, needed: int):
+        size = len(self._map)
+        while size < needed:
+            size *= 2
+        # Only this object maps the file for writing, and it holds the lock
+        self._map.close()
+        with open(self._path, 'r+b') as f:
+            f.truncate(size)
+            self._map = mmap.mmap(f.fileno(), size)
+
+    def others(self) -> Iterator[Tuple[bool, str, float]]:
+        """(process alive, JSON [name, labels, sample], value) from every other process's file"""
+        for path in self.directory.glob("*.metrics"):
+            name = path.stem
+            if name == str(os.getpid()):
+                continue
+            try:
+                data = path.read_bytes()
+            except OSError:
+                continue
+            if data[:8] != METRICS_MAGIC:
+                continue
+            pid, _, archived = name.partition('-')
+            alive = not archived and pid.isdigit() and _alive(int(pid))
+            used = min(struct.unpack_from('<I', data, 8)[0], len(data))
+            position = HEADER_SIZE
+            while position + 4 <= used:
+                length = struct.unpack_from('<I', data, position)[0]
+                value_at = position + (4 + length + 7) // 8 * 8
+                if value_at + 8 > used:
+                    break
+                key = data[position + 4:position + 4 + length].decode('utf-8')
+                yield alive, key, struct.unpack_from('<d', data, value_at)[0]
+                position = value_at + 8
+
+
+PROCESS_VALUES = ProcessValues(os.getenv('METRICS_DIR', 'data/metrics'))
+
+
+def _number(value: float) -> str:
+    # Counts summed as floats still print as exact integers
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def key(self, labels: Tuple[str, ...], sample: str = '') -> Tuple:
+        """Name of one stored value; sample tells a histogram's buckets and sum apart"""
+        return (self.name, labels, sample)
+
+    def samples(self) -> Dict[Tuple[str, ...], Dict[str, float]]:
+        """This process's values: labels -> sample -> value"""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonic count per label set"""
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            value = self.values[labels] = self.values.get(labels, 0.0) + amount
+            PROCESS_VALUES.set(self.key(labels), value)
+
+    def get(self, *labels: str) -> float:
+        """Value in this process alone"""
+        return self.values.get(labels, 0.0)
+
+    def samples(self) -> Dict[Tuple[str, ...], Dict[str, float]]:
+        return {labels: {'': value} for labels, value in list(self.values.items())}
+
+    def render(self, samples: Dict[Tuple[str, ...], Dict[str, float]]) -> List[str]:
+        lines = self.header()
+        for labels, values in sorted(samples.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(values.get('', 0.0))}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+    kind = 'gauge'
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self.values[labels] = value
+            PROCESS_VALUES.set(self.key(labels), value)
+
+
+class Histogram(Metric):
+    """Cumulative buckets plus sum and count per label set"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self.values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            series = self.values.get(labels)
+            if series is None:
+                series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    break
+            else:
+                i = len(self.buckets)
+            series[i] += 1
+            series[-1] += value
+            PROCESS_VALUES.set(self.key(labels, str(i)), series[i])
+            PROCESS_VALUES.set(self.key(labels, 'sum'), series[-1])
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels: str) -> int:
+        """Observations in this process alone"""
+        series = self.values.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> Dict[Tuple[str, ...], Dict[str, float]]:
+        with self._lock:
+            return {
+                labels: {**{str(i): count for i, count in enumerate(series[:-1])}, 'sum': series[-1]}
+                for labels, series in self.values.items()
+            }
+
+    def render(self, samples: Dict[Tuple[str, ...], Dict[str, float]]) -> List[str]:
+        lines = self.header()
+        for labels, values in sorted(samples.items()):
+            cumulative = 0
+            for i, bound in enumerate(self.buckets):
+                cumulative += values.get(str(i), 0)
+                le = 'le="%g"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {_number(cumulative)}")
+            cumulative += values.get(str(len(self.buckets)), 0)
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {_number(cumulative)}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(values.get('sum', 0.0))}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {_number(cumulative)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.metrics.get(name) or self.register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.metrics.get(name) or self.register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.metrics.get(name) or self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        """Every metric summed over this process and the other processes' files"""
+        totals = {name: metric.samples() for name, metric in self.metrics.items()}
+        for alive, key, value in PROCESS_VALUES.others():
+            name, labels, sample = json.loads(key)
+            metric = self.metrics.get(name)
+            if metric is None or (metric.kind == 'gauge' and not alive):
+                continue
+            values = totals[name].setdefault(tuple(labels), {})
+            values[sample] = values.get(sample, 0.0) + value
+
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.extend(metric.render(totals[name]))
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"))
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route"))
+HTTP_IN_PROGRESS = REGISTRY.gauge(
+    "http_requests_in_progress", "HTTP requests currently being served")
+WEBSOCKETS_OPEN = REGISTRY.gauge(
+    "websocket_connections", "Open websocket connections")
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss)", ("cache", "result"))
+
+PROVIDER_LATENCY = REGISTRY.histogram(
+    "provider_request_duration_seconds", "Model provider call latency", ("provider", "outcome"))
+
+JOBS = REGISTRY.counter(
+    "jobs_total", "Finished background jobs by kind and status", ("kind", "status"))
+JOB_DURATION = REGISTRY.histogram(
+    "job_duration_seconds", "Background job run time by kind", ("kind",))
+
+
+def record_cache(cache: str, hit: bool):
+    """Count a cache lookup; the hit ratio is hit / (hit + miss)"""
+    CACHE_REQUESTS.inc(cache, 'hit' if hit else 'miss')
+
+
+@contextmanager
+def time_provider(provider: str) -> Iterator[None]:
+    """Time a model provider call, labelled ok/error"""
+    start = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        PROVIDER_LATENCY.observe(time.perf_counter() - start, provider, outcome)
+
+
+def _route_template(scope) -> str:
+    """'/api/company/{ticker}' rather than the raw path, to keep label cardinality bounded"""
+    # The router leaves the matched route in the scope; its path is the template, prefix included
+    path = getattr(scope.get('route'), 'path', None)
+    return path if path else 'unmatched'
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency, status counts and open websockets"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'websocket':
+            WEBSOCKETS_OPEN.inc()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                WEBSOCKETS_OPEN.dec()
+            return
+
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_PROGRESS.dec()
+            method = scope.get('method', '')
+            route = _route_template(scope)
+            HTTP_LATENCY.observe(elapsed, method, route)
+            HTTP_REQUESTS.inc(method, route, str(status[0]))
+
+
+def metrics_response() -> Response:
+    """Prometheus scrape body"""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,281 @@
+"""
+Profiling - per-request cProfile, stack sampling and tracemalloc diffs
+
+Everything here is off unless DEBUG_TOKEN is set and the caller presents it, either as
+an X-Debug-Token header or as "Authorization: Bearer <token>".
+"""
+
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+from backend.core.log import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY = "__profile"
+PROFILE_FORMATS = ("pstats", "collapsed")
+
+DEFAULT_INTERVAL = 0.005
+# Single requests are short, so they are sampled more densely
+REQUEST_INTERVAL = 0.001
+MAX_WINDOW_SECONDS = 60.0
+
+# Only one cProfile / sampling session may run at a time
+_session_lock = threading.Lock()
+
+
+def debug_token() -> Optional[str]:
+    return os.getenv("DEBUG_TOKEN") or None
+
+
+def is_authorized(headers: Dict[str, str]) -> bool:
+    """Constant-time check of X-Debug-Token or a bearer token against DEBUG_TOKEN"""
+    token = debug_token()
+    if not token:
+        return False
+    presented = headers.get("x-debug-token", "")
+    if not presented:
+        scheme, _, value = headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer":
+            presented = value.strip()
+    return bool(presented) and hmac.compare_digest(presented.encode(), token.encode())
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = Path(code.co_filename)
+    # site-packages/starlette/routing.py -> starlette/routing.py
+    parts = path.parts
+    for marker in ("site-packages", "backend"):
+        if marker in parts:
+            start = parts.index(marker) + (1 if marker == "site-packages" else 0)
+            path = Path(*parts[start:])
+            break
+    return f"{code.co_name} ({path.as_posix()}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Background thread that snapshots every thread's stack at a fixed interval"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, thread_ids: Optional[List[int]] = None):
+        self.interval = interval
+        self.thread_ids = set(thread_ids) if thread_ids else None
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or (self.thread_ids and thread_id not in self.thread_ids):
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(labels))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Folded stacks ("a;b;c 12" per line) for flamegraph.pl or speedscope"""
+        return '\n'.join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + '\n'
+
+    def top(self, limit: int = 25) -> List[Dict]:
+        """Functions most often on top of the stack"""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [
+            {"function": leaf, "samples": count, "percent": round(100 * count / total, 2)}
+            for leaf, count in leaves.most_common(limit)
+        ]
+
+
+def sample_window(seconds: float, interval: float = DEFAULT_INTERVAL) -> Optional[StackSampler]:
+    """Start a whole-process sampler; None if another profiling session is running"""
+    if not _session_lock.acquire(blocking=False):
+        return None
+    sampler = StackSampler(interval)
+    sampler.start()
+    logger.info("Profiling window started", extra={'seconds': seconds, 'interval': interval})
+    return sampler
+
+
+def finish_window(sampler: StackSampler):
+    sampler.stop()
+    _session_lock.release()
+
+
+def format_pstats(profiler: cProfile.Profile, sort: str = "cumulative", limit: int = 60) -> str:
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+class ProfilingMiddleware:
+    """Profile a single request when asked via X-Profile or ?__profile=, returning the profile"""
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _requested_format(scope) -> Optional[str]:
+        headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope.get('headers', [])}
+        requested = headers.get(PROFILE_HEADER)
+        if requested is None:
+            query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+            values = query.get(PROFILE_QUERY)
+            requested = values[0] if values else None
+        if requested is None or not is_authorized(headers):
+            return None
+        return requested if requested in PROFILE_FORMATS else "pstats"
+
+    async def __call__(self, scope, receive, send):
+        fmt = self._requested_format(scope) if scope['type'] == 'http' and debug_token() else None
+        if fmt is None or not _session_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        # The profiled response is discarded; its status and size are reported in headers
+        response = {'status': 500, 'bytes': 0}
+
+        async def capture(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+            elif message['type'] == 'http.response.body':
+                response['bytes'] += len(message.get('body', b''))
+
+        profiler = cProfile.Profile() if fmt == "pstats" else None
+        sampler = StackSampler(REQUEST_INTERVAL, [threading.get_ident()]) if fmt == "collapsed" else None
+        start = time.perf_counter()
+        try:
+            if sampler:
+                sampler.start()
+            if profiler:
+                profiler.enable()
+            await self.app(scope, receive, capture)
+        finally:
+            if profiler:
+                profiler.disable()
+            if sampler:
+                sampler.stop()
+            _session_lock.release()
+        elapsed_ms = (time.perf_counter() - start) * 1e3
+
+        body = (format_pstats(profiler) if profiler else sampler.collapsed()).encode('utf-8')
+        logger.info("Profiled request", extra={
+            'path': scope.get('path'), 'format': fmt, 'elapsed_ms': round(elapsed_ms, 2)
+        })
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/plain; charset=utf-8'),
+                (b'content-length', str(len(body)).encode()),
+                (b'x-profiled-status', str(response['status']).encode()),
+                (b'x-profiled-bytes', str(response['bytes']).encode()),
+                (b'x-profiled-duration-ms', f"{elapsed_ms:.2f}".encode()),
+                (b'cache-control', b'no-store'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+class MemoryTracker:
+    """tracemalloc snapshots, each diffed against the one before"""
+
+    def __init__(self):
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _filtered(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+        return snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def start(self, frames: int = 10) -> Dict:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self.baseline = self._filtered(tracemalloc.take_snapshot())
+            return self.status()
+
+    def stop(self) -> Dict:
+        with self._lock:
+            tracemalloc.stop()
+            self.baseline = None
+            return self.status()
+
+    def status(self) -> Dict:
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit() if tracemalloc.is_tracing() else 0,
+            "traced_mb": round(current / 1e6, 3),
+            "peak_mb": round(peak / 1e6, 3),
+        }
+
+    def snapshot(self, group_by: str = "lineno", limit: int = 25) -> Optional[Dict]:
+        """Top allocation growth since the previous snapshot; None if not tracing"""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                return None
+            snapshot = self._filtered(tracemalloc.take_snapshot())
+            previous = self.baseline
+            self.baseline = snapshot
+
+        if previous is None:
+            stats = [(s.traceback, s.size, s.size, s.count, s.count) for s in snapshot.statistics(group_by)]
+        else:
+            stats = [(s.traceback, s.size, s.size_diff, s.count, s.count_diff)
+                     for s in snapshot.compare_to(previous, group_by)]
+
+        stats.sort(key=lambda s: abs(s[2]), reverse=True)
+        top = []
+        for trace, size, size_diff, count, count_diff in stats[:limit]:
+            if group_by == "traceback":
+                where = [f"{frame.filename}:{frame.lineno}" for frame in trace]
+            elif group_by == "filename":
+                where = trace[0].filename
+            else:
+                where = f"{trace[0].filename}:{trace[0].lineno}"
+            top.append({
+                "where": where,
+                "size_kb": round(size / 1024, 1),
+                "size_diff_kb": round(size_diff / 1024, 1),
+                "count": count,
+                "count_diff": count_diff,
+            })
+
+        return {**self.status(), "group_by": group_by, "top": top}
+
+
+memory_tracker = MemoryTracker()
@@ -0,0 +1,216 @@
+"""
+Shared snapshots - versioned, read-only mmap segments shared by every worker process
+
+A snapshot is published once as an immutable file <name>.<generation>.snap. A small
+control file holds the current generation; every worker maps it, so a publish is seen
+by all workers on their next read, and the data pages live once in the page cache no
+matter how many workers map them.
+
+Layout of a snapshot file:
+    8 bytes   magic
+    4 bytes   header length (little endian)
+    N bytes   header JSON {"generation", "meta", "sections": {name: [offset, length]},
+                           "indexes": {name: {key: [offset, length]}}}
+    ...       section bytes, offsets relative to the end of the header
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from backend.core.log import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_MAGIC = b'HISNAP01'
+CONTROL_MAGIC = b'HICTRL01'
+# magic, generation
+CONTROL_FORMAT = '<8sQ'
+CONTROL_SIZE = struct.calcsize(CONTROL_FORMAT)
+
+# Older generations are unlinked once a newer one is published; readers that still
+# map them keep working because the mapping outlives the directory entry
+KEEP_GENERATIONS = 2
+
+# section name -> bytes; index name -> (section name, {key: (offset in section, length)})
+Sections = Dict[str, bytes]
+Indexes = Dict[str, Tuple[str, Dict[str, Tuple[int, int]]]]
+
+
+class SnapshotView:
+    """One generation of a snapshot, mapped read-only"""
+
+    def __init__(self, generation: int, path: Path):
+        self.generation = generation
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._map[:8] != SNAPSHOT_MAGIC:
+            self._map.close()
+            raise ValueError(f"Not a snapshot file: {path}")
+        header_len = struct.unpack_from('<I', self._map, 8)[0]
+        header = json.loads(self._map[12:12 + header_len])
+        self._base = 12 + header_len
+
+        self.meta: Dict = header['meta']
+        self.sections: Dict[str, list] = header['sections']
+        self.indexes: Dict[str, Dict[str, list]] = header['indexes']
+
+    def section(self, name: str) -> Optional[bytes]:
+        entry = self.sections.get(name)
+        if entry is None:
+            return None
+        start = self._base + entry[0]
+        return self._map[start:start + entry[1]]
+
+    def lookup(self, index: str, key: str) -> Optional[bytes]:
+        entry = self.indexes.get(index, {}).get(key)
+        if entry is None:
+            return None
+        start = self._base + entry[0]
+        return self._map[start:start + entry[1]]
+
+
+class SharedSnapshot:
+    """Publish-once, map-everywhere snapshot with a generation counter"""
+
+    def __init__(self, name: str, directory: Optional[str] = None):
+        self.name = name
+        # Point SNAPSHOT_DIR at /dev/shm to keep snapshots off disk entirely
+        self.directory = Path(directory or os.getenv('SNAPSHOT_DIR', 'data/snapshots'))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.control_path = self.directory / f"{name}.ctl"
+
+        self._thread_lock = threading.Lock()
+        self._control_file = self._open_control()
+        self._control = mmap.mmap(self._control_file.fileno(), CONTROL_SIZE, access=mmap.ACCESS_WRITE)
+        self._view: Optional[SnapshotView] = None
+
+    def _open_control(self):
+        """Open (creating if needed) the control file every worker maps"""
+        fd = os.open(self.control_path, os.O_RDWR | os.O_CREAT, 0o644)
+        control_file = os.fdopen(fd, 'r+b')
+        with self._locked(control_file):
+            if os.fstat(fd).st_size < CONTROL_SIZE:
+                control_file.seek(0)
+                control_file.write(struct.pack(CONTROL_FORMAT, CONTROL_MAGIC, 0))
+                control_file.flush()
+        return control_file
+
+    @contextmanager
+    def _locked(self, control_file) -> Iterator[None]:
+        """Exclusive across threads, and across processes where flock exists"""
+        with self._thread_lock:
+            if fcntl is not None:
+                fcntl.flock(control_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(control_file.fileno(), fcntl.LOCK_UN)
+
+    def _data_path(self, generation: int) -> Path:
+        return self.directory / f"{self.name}.{generation:08d}.snap"
+
+    @property
+    def generation(self) -> int:
+        """Current published generation (0 = nothing published yet); one shared-memory read"""
+        return struct.unpack_from('<Q', self._control, 8)[0]
+
+    def current(self) -> Optional[SnapshotView]:
+        """The latest generation, remapped only when the generation counter moved"""
+        generation = self.generation
+        if generation == 0:
+            return None
+        if self._view is not None and self._view.generation == generation:
+            return self._view
+
+        try:
+            view = SnapshotView(generation, self._data_path(generation))
+        except FileNotFoundError:
+            # Superseded and pruned between reading the counter and opening the file
+            return self.current() if self.generation != generation else None
+
+        # The old view is not closed: a request may still be reading it (see calendar_response).
+        # Its mapping is released with the last reference to it.
+        self._view = view
+        return view
+
+    def refresh(self, is_stale: Callable[[Optional[SnapshotView]], bool],
+                build: Callable[[], Tuple[Sections, Indexes, Dict]]) -> Optional[SnapshotView]:
+        """Return the current view, building and publishing a new generation if it is stale.
+
+        Only one worker builds; the rest wait on the lock and then find it fresh.
+        """
+        view = self.current()
+        if not is_stale(view):
+            return view
+
+        with self._locked(self._control_file):
+            view = self.current()
+            if not is_stale(view):
+                return view
+
+            generation = self.generation + 1
+            sections, indexes, meta = build()
+            self._write(generation, sections, indexes, meta)
+
+            struct.pack_into('<Q', self._control, 8, generation)
+            self._control.flush()
+            self._prune(generation)
+
+        logger.info("Published snapshot", extra={'snapshot': self.name, 'generation': generation})
+        return self.current()
+
+    def _write(self, generation: int, sections: Sections, indexes: Indexes, meta: Dict):
+        """Write a complete snapshot file, then move it into place"""
+        layout = {}
+        offset = 0
+        for name, blob in sections.items():
+            layout[name] = [offset, len(blob)]
+            offset += len(blob)
+
+        absolute = {
+            index_name: {key: [layout[section][0] + start, length] for key, (start, length) in entries.items()}
+            for index_name, (section, entries) in indexes.items()
+        }
+        header = json.dumps({
+            'generation': generation,
+            'meta': meta,
+            'sections': layout,
+            'indexes': absolute,
+        }, separators=(',', ':')).encode('utf-8')
+
+        path = self._data_path(generation)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            for blob in sections.values():
+                f.write(blob)
+        tmp_path.replace(path)
+
+    def _prune(self, generation: int):
+        for path in self.directory.glob(f"{self.name}.*.snap"):
+            try:
+                old = int(path.suffixes[-2].lstrip('.'))
+            except (IndexError, ValueError):
+                continue
+            if old <= generation - KEEP_GENERATIONS:
+                try:
+                    path.unlink()
+                except OSError:
+                    # Still mapped on platforms that refuse to unlink open files
+                    pass
@@ -3,51 +3,84 @@ FastAPI Main Application
 Date: 2025-06-14 18:01:07 UTC
 """
 
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from pathlib import Path
 
 # Import routes
 from backend.api.routes import router as api_router
+from backend.api.documents import router as documents_router
+from backend.api.websockets import router as websockets_router
+from backend.api.debug import router as debug_router
+from backend.api.jobs import lifespan, router as jobs_router
+from backend.core.assets import AssetPipeline, NegotiatedGZipMiddleware
+from backend.core.metrics import MetricsMiddleware, metrics_response
+from backend.core.profiling import ProfilingMiddleware
 
 # Create app
 app = FastAPI(
     title="Hedge Intelligence API",
     version="1.0.0",
-    description="IPO Intelligence Platform"
+    description="IPO Intelligence Platform",
+    # Starts and stops the background job workers
+    lifespan=lifespan
 )
 
+# Compress large JSON responses (citation lists, calendars)
+app.add_middleware(NegotiatedGZipMiddleware, minimum_size=1000)
+
+# Per-request profiling (X-Profile header or ?__profile=, requires DEBUG_TOKEN)
+app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so timings include compression
+app.add_middleware(MetricsMiddleware)
+
 # Include API routes with /api prefix
 app.include_router(api_router, prefix="/api")
+app.include_router(documents_router, prefix="/api")
+
+# The frontend connects to /ws/chat on the same origin
+app.include_router(websockets_router)
+
+# Profiling and memory diagnostics under /debug
+app.include_router(debug_router)
 
-# Mount static files
+# Background jobs, processed by workers started with the app
+app.include_router(jobs_router, prefix="/api")
+
+# Static assets are fingerprinted and pre-compressed once at startup
 static_path = Path("frontend/static")
-if static_path.exists():
-    app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
-else:
+index_path = Path("frontend/index.html")
+if not static_path.exists():
     # Try alternative path
     static_path = Path("static")
-    if static_path.exists():
-        app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
+if not index_path.exists():
+    index_path = Path("index.html")
+
+assets = AssetPipeline(static_dir=str(static_path), index_path=str(index_path))
+
+@app.get("/static/{path:path}", include_in_schema=False)
+async def serve_static(path: str, request: Request):
+    return assets.serve_static(path, request)
 
 # Serve index.html at root
 @app.get("/")
-async def read_index():
-    index_path = Path("frontend/index.html")
-    if not index_path.exists():
-        index_path = Path("index.html")
-    
-    if index_path.exists():
-        return FileResponse(str(index_path))
-    else:
-        return {"error": "Frontend not found"}
+async def read_index(request: Request):
+    response = assets.serve_index(request)
+    if response is None:
+        return JSONResponse({"error": "Frontend not found"}, status_code=404)
+    return response
 
 # Health check
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
+
 # Debug endpoint to check data
 @app.get("/debug/data")
 async def debug_data():
@@ -13,6 +13,8 @@ class LockupCitation(BaseModel):
     page: Optional[int] = None
     section: Optional[str] = None
     confidence: float
+    citation_id: Optional[str] = None
+    filing: Optional[str] = None
 
 class LockupMetadata(BaseModel):
     """Complete lockup information as metadata"""
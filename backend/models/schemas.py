@@ -2,7 +2,7 @@
 Pydantic models for type safety
 """ 
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 class IPOListing(BaseModel):
@@ -24,3 +24,8 @@ class Citation(BaseModel):
     text: str
     section_id: str
     page: int
+
+class JobRequest(BaseModel):
+    kind: str
+    payload: Dict[str, Any] = {}
+    priority: int = 0
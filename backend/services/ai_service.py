@@ -3,26 +3,35 @@
 
 import os
 import json
+import re
 import asyncio
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone
-import traceback
+
+from backend.core.log import get_logger
+from backend.core.metrics import time_provider
+from backend.services.cik_resolver import CikResolver
 
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
+logger = get_logger(__name__)
+
+# "180 days", "90-day" in a listing's lock-up field
+LOCKUP_DAYS_PATTERN = re.compile(r'(\d+)[\s-]*days?', re.I)
+
 try:
     from openai import AsyncOpenAI
 except ImportError:
-    print("Installing openai...")
+    logger.warning("Installing openai")
     os.system("pip install openai==1.3.0")
     from openai import AsyncOpenAI
 
 try:
     import google.generativeai as genai
 except ImportError:
-    print("Installing google-generativeai...")
+    logger.warning("Installing google-generativeai")
     os.system("pip install google-generativeai")
     import google.generativeai as genai
 
@@ -30,12 +39,14 @@ class AIService:
     """Enhanced AI service with validation and chat"""
     
     def __init__(self):
+        # Local CIK index answers most CIK checks without a model call
+        self.cik_resolver = CikResolver()
+        
         # Get API keys
         openai_key = os.getenv('OPENAI_API_KEY')
         gemini_key = os.getenv('GEMINI_API_KEY')
         
-        print(f"🔑 OpenAI Key: {'✅' if openai_key else '❌'}")
-        print(f"🔑 Gemini Key: {'✅' if gemini_key else '❌'}")
+        logger.info("AI provider keys", extra={'openai': bool(openai_key), 'gemini': bool(gemini_key)})
         
         if not openai_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
@@ -45,24 +56,55 @@ class AIService:
         # Initialize AI clients
         try:
             self.openai = AsyncOpenAI(api_key=openai_key)
-            print("✅ OpenAI client initialized")
-        except Exception as e:
-            print(f"❌ OpenAI init error: {e}")
+            logger.info("OpenAI client initialized")
+        except Exception:
+            logger.exception("OpenAI init error")
             self.openai = None
             
         # Initialize Gemini
         try:
             genai.configure(api_key=gemini_key)
             self.gemini = genai.GenerativeModel('gemini-pro')
-            print("✅ Gemini client initialized")
-        except Exception as e:
-            print(f"❌ Gemini init error: {e}")
+            logger.info("Gemini client initialized")
+        except Exception:
+            logger.exception("Gemini init error")
             self.gemini = None
         
-    async def validate_ipo_data(self, ipo: Dict[str, Any]) -> Dict[str, Any]:
-        """Silently validate IPO data with both models"""
+    async def validate_ipo_data(self, ipo: Dict[str, Any], lockup: Optional[Dict] = None) -> Dict[str, Any]:
+        """Validate IPO data; both models are only asked when the local CIK index is unsure.
+        
+        lockup is the lock-up extracted from the company's filings (LockupService), if any.
+        """
         
-        print(f"\n🔍 Validating IPO: {ipo.get('ticker')} - {ipo.get('company')}")
+        logger.info("Validating IPO", extra={'ticker': ipo.get('ticker'), 'company': ipo.get('company')})
+        
+        # The local index is authoritative for CIKs whenever it is confident; the lock-up
+        # still needs checking, against the filings or else one model
+        resolution = self.cik_resolver.resolve(ipo.get('ticker'), ipo.get('company'))
+        local_cik = self.cik_resolver.verify(ipo.get('ticker'), ipo.get('company'), ipo.get('cik'))
+        if local_cik is not None:
+            cik_confidence = resolution['match']['confidence'] / 100
+            lockup_result = await self._validate_lockup(ipo, lockup)
+            if lockup_result is None:
+                return {
+                    "validated": False,
+                    "cik_valid": local_cik,
+                    "cik_source": "local",
+                    "resolved_cik": resolution['match']['cik'],
+                    "confidence": 0.0,
+                    "error": "No successful lock-up validation"
+                }
+            return {
+                "validated": True,
+                "cik_valid": local_cik,
+                "lockup_valid": lockup_result['lockup_valid'],
+                "confidence": (cik_confidence + lockup_result['confidence']) / 2,
+                "validators_agreed": True,
+                "cik_source": "local",
+                "lockup_source": lockup_result['source'],
+                "resolved_cik": resolution['match']['cik'],
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            }
         
         # Run validations
         results = []
@@ -71,24 +113,49 @@ class AIService:
         if self.openai:
             try:
                 openai_result = await self._validate_with_openai(ipo)
-                print(f"  OpenAI result: {openai_result}")
+                logger.debug("OpenAI result", extra={'result': openai_result})
                 results.append(openai_result)
-            except Exception as e:
-                print(f"  ❌ OpenAI error: {e}")
-                traceback.print_exc()
+            except Exception:
+                logger.exception("OpenAI validation error")
         
         # Try Gemini
         if self.gemini:
             try:
                 gemini_result = await self._validate_with_gemini(ipo)
-                print(f"  Gemini result: {gemini_result}")
+                logger.debug("Gemini result", extra={'result': gemini_result})
                 results.append(gemini_result)
-            except Exception as e:
-                print(f"  ❌ Gemini error: {e}")
-                traceback.print_exc()
+            except Exception:
+                logger.exception("Gemini validation error")
         
         # Combine results
-        return self._combine_validations(results, ipo)
+        combined = self._combine_validations(results, ipo)
+        combined['cik_source'] = 'models'
+        combined['candidates'] = resolution['candidates']
+        return combined
+    
+    async def _validate_lockup(self, ipo: Dict, lockup: Optional[Dict]) -> Optional[Dict]:
+        """Lock-up check for a listing whose CIK is settled: the extracted period if there is
+        one to compare with, else the first model that answers"""
+        listed = LOCKUP_DAYS_PATTERN.search(str(ipo.get('lockup') or ''))
+        if lockup and lockup.get('period_days') and listed:
+            return {
+                "lockup_valid": int(listed.group(1)) == lockup['period_days'],
+                "confidence": lockup.get('confidence_score') or 0.0,
+                "source": "filings"
+            }
+        
+        for client, validate in ((self.openai, self._validate_with_openai), (self.gemini, self._validate_with_gemini)):
+            if not client:
+                continue
+            result = await validate(ipo)
+            if 'error' not in result:
+                return {
+                    "lockup_valid": result.get('lockup_valid', False),
+                    "confidence": result.get('confidence', 0),
+                    "source": "models"
+                }
+        logger.warning("No lock-up validation result", extra={'ticker': ipo.get('ticker')})
+        return None
     
     async def _validate_with_openai(self, ipo: Dict) -> Dict:
         """OpenAI validation"""
@@ -102,14 +169,15 @@ class AIService:
             Return JSON: {{"cik_valid": true, "lockup_valid": true, "confidence": 0.8}}
             """
             
-            response = await self.openai.chat.completions.create(
-                model="gpt-3.5-turbo",  # Use 3.5 for testing
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1
-            )
+            with time_provider('openai'):
+                response = await self.openai.chat.completions.create(
+                    model="gpt-3.5-turbo",  # Use 3.5 for testing
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.1
+                )
             
             content = response.choices[0].message.content
-            print(f"    OpenAI raw response: {content}")
+            logger.debug("OpenAI raw response", extra={'content': content})
             
             # Try to parse JSON
             try:
@@ -123,7 +191,7 @@ class AIService:
                 return {"error": "Could not parse response"}
             
         except Exception as e:
-            print(f"    OpenAI exception: {str(e)}")
+            logger.warning("OpenAI exception", extra={'error': str(e)})
             return {"error": str(e), "source": "openai"}
     
     async def _validate_with_gemini(self, ipo: Dict) -> Dict:
@@ -137,13 +205,14 @@ class AIService:
             {{"cik_valid": true, "lockup_valid": true, "confidence": 0.8}}
             """
             
-            response = await asyncio.to_thread(
-                self.gemini.generate_content,
-                prompt
-            )
+            with time_provider('gemini'):
+                response = await asyncio.to_thread(
+                    self.gemini.generate_content,
+                    prompt
+                )
             
             text = response.text.strip()
-            print(f"    Gemini raw response: {text}")
+            logger.debug("Gemini raw response", extra={'content': text})
             
             # Clean up response
             if '```json' in text:
@@ -160,17 +229,52 @@ class AIService:
             return {"error": "Could not parse Gemini response"}
             
         except Exception as e:
-            print(f"    Gemini exception: {str(e)}")
+            logger.warning("Gemini exception", extra={'error': str(e)})
             return {"error": str(e), "source": "gemini"}
     
+    async def answer_question(self, question: str, passages: List[Dict]) -> Dict[str, Any]:
+        """Answer from filing passages only, citing the passage IDs used"""
+        if not self.openai:
+            return {"error": "OpenAI client not available"}
+
+        context = "\n\n".join(f"[{p['id']}] {p['text']}" for p in passages)
+        prompt = f"""
+        Answer the question using ONLY these excerpts from an SEC filing.
+        Cite the excerpt IDs you used. If the excerpts do not answer it, say so and cite nothing.
+
+        {context}
+
+        Question: {question}
+
+        Return JSON: {{"answer": "...", "citations": ["cite-..."]}}
+        """
+
+        try:
+            with time_provider('openai'):
+                response = await self.openai.chat.completions.create(
+                    model="gpt-4",
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0
+                )
+            content = response.choices[0].message.content
+            import re
+            json_match = re.search(r'\{.*\}', content, re.DOTALL)
+            if not json_match:
+                return {"error": "Could not parse response"}
+            result = json.loads(json_match.group())
+            return {"text": result.get("answer", ""), "citations": result.get("citations", []), "model": "gpt-4"}
+
+        except Exception as e:
+            logger.warning("OpenAI exception", extra={'error': str(e)})
+            return {"error": str(e), "source": "openai"}
+
     def _combine_validations(self, results: List[Dict], ipo: Dict) -> Dict:
         """Combine validation results"""
-        print(f"\n  Combining {len(results)} results...")
         
         valid_results = [r for r in results if 'error' not in r]
         
         if not valid_results:
-            print("  ❌ No valid results")
+            logger.warning("No valid validation results", extra={'ticker': ipo.get('ticker')})
             return {
                 "validated": False,
                 "confidence": 0.0,
@@ -191,5 +295,5 @@ class AIService:
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
         
-        print(f"  ✅ Combined result: {result}")
+        logger.debug("Combined validation result", extra={'result': result})
         return result
\ No newline at end of file
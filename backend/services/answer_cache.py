@@ -0,0 +1,229 @@
+"""
+Answer Cache - cited answers to repeated document questions, served without a model call
+
+Answers are keyed by document and normalized question, and remember the citation IDs they
+cite. Citation IDs are hashes of block content, so an answer stays valid while every block
+it cites is still in the filing; reprocessing retires only answers citing a removed block
+(see invalidate), and lookups re-check the cited IDs against the current filing.
+
+A question worded differently matches a cached one by rule, not by similarity score: after
+dropping filler words, a generic "what"/"which" and plural endings, both must use exactly
+the same words (numbers and years included), and at least half of their ordered word pairs
+must agree, so "did Alpha acquire Beta" never answers "did Beta acquire Alpha".
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.core.log import get_logger
+from backend.core.metrics import record_cache
+
+logger = get_logger(__name__)
+
+DEFAULT_DB_PATH = "data/answers.db"
+
+# Share of ordered word pairs two questions with the same words must have in common
+PAIR_AGREEMENT = 0.5
+
+# Bumped when the answers table changes shape; cached answers are simply dropped
+SCHEMA_VERSION = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    -- Never reused (unlike a plain rowid), so "id > last loaded" finds every new answer
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    document        TEXT NOT NULL,
+    question_key    TEXT NOT NULL,
+    question        TEXT NOT NULL,
+    answer          TEXT NOT NULL,
+    citations       TEXT NOT NULL,          -- JSON [{"id", "text"}]
+    cited_ids       TEXT NOT NULL,          -- the citation IDs, space separated
+    model           TEXT,
+    hits            INTEGER NOT NULL DEFAULT 0,
+    created_at      TEXT NOT NULL,
+    last_hit_at     TEXT,
+    UNIQUE (document, question_key)
+);
+"""
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+CONTRACTIONS = (
+    (re.compile(r"\b(what|who|where|when|how|that|there)'s\b"), r"\1 is"),
+    (re.compile(r"n't\b"), " not"),
+    (re.compile(r"'re\b"), " are"),
+)
+# Words that never change what is being asked; most question words do ("who" vs "when")
+STOPWORDS = frozenset("""
+a an the is are was were be been being do does did of for in on at to by with this that these
+those it its me my i we our you your please tell can could would should will shall about there
+any some s
+""".split())
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _tokens(text: str) -> List[str]:
+    text = text.lower().replace('’', "'")
+    for pattern, replacement in CONTRACTIONS:
+        text = pattern.sub(replacement, text)
+    # "lock-up" and "lockup" are the same word
+    return [word.replace('-', '') for word in WORD_PATTERN.findall(text)
+            if word not in STOPWORDS and word.replace("'", '') not in STOPWORDS]
+
+
+def normalize_question(text: str) -> str:
+    """Exact-match key: case, punctuation, contractions and filler words removed"""
+    return ' '.join(word.replace("'", '') for word in _tokens(text))
+
+
+# Only ever ask for "the thing named": "what is the lockup period" is "lockup period"
+GENERIC_WORDS = frozenset(['what', 'which'])
+
+
+def _singular(word: str) -> str:
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+def match_words(key: str) -> List[str]:
+    """A normalized question as the words near matches compare: singular, no generic question word"""
+    return [_singular(word) for word in key.split() if word not in GENERIC_WORDS]
+
+
+def _pairs(words: List[str]) -> Set[Tuple[str, str]]:
+    return set(zip(words, words[1:]))
+
+
+def pair_agreement(first: List[str], second: List[str]) -> float:
+    """Share of ordered word pairs in common; 1.0 for one-word questions, which have none"""
+    first_pairs, second_pairs = _pairs(first), _pairs(second)
+    if not first_pairs and not second_pairs:
+        return 1.0
+    return len(first_pairs & second_pairs) / len(first_pairs | second_pairs)
+
+
+class AnswerCache:
+    """Cached answers per document, valid while their cited blocks are, with near-match lookup"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        # document -> (last id loaded, {question key: match words})
+        self._indexes: Dict[str, Tuple[int, Dict[str, List[str]]]] = {}
+        self._init_schema()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA busy_timeout = 10000")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self.conn
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        conn.execute("DROP TABLE IF EXISTS answers")
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _index(self, document: str) -> Dict[str, List[str]]:
+        """The document's cached questions, topped up with rows other workers added"""
+        last_id, entries = self._indexes.get(document, (0, {}))
+        rows = self.conn.execute(
+            "SELECT id, question_key FROM answers WHERE document = ? AND id > ? ORDER BY id",
+            (document, last_id)
+        ).fetchall()
+        for row in rows:
+            entries[row['question_key']] = match_words(row['question_key'])
+            last_id = row['id']
+        self._indexes[document] = (last_id, entries)
+        return entries
+
+    def lookup(self, document: str, question: str, current_ids: Set[str]) -> Optional[Dict]:
+        """Cached answer for this question (or one worded alike) whose cited blocks are all in
+        current_ids, the document's citation IDs as processed now"""
+        key = normalize_question(question)
+        entries = self._index(document)
+
+        match = 'exact'
+        if key not in entries:
+            match = 'similar'
+            words = match_words(key)
+            scored = [(pair_agreement(words, entry_words), entry_key)
+                      for entry_key, entry_words in entries.items() if set(entry_words) == set(words)]
+            score, key = max(scored, default=(0.0, None))
+            if score < PAIR_AGREEMENT:
+                record_cache('answers', False)
+                return None
+
+        row = self.conn.execute(
+            "SELECT * FROM answers WHERE document = ? AND question_key = ?", (document, key)
+        ).fetchone()
+        if row is None:
+            # Deleted by another worker
+            entries.pop(key, None)
+        elif not set(row['cited_ids'].split()) <= current_ids:
+            # A cited block changed or went away since the answer was given
+            self._delete(document, [key])
+            row = None
+        record_cache('answers', row is not None)
+        if row is None:
+            return None
+        self.conn.execute(
+            "UPDATE answers SET hits = hits + 1, last_hit_at = ? WHERE document = ? AND question_key = ?",
+            (_now(), document, key)
+        )
+        return {
+            'question': row['question'],
+            'text': row['answer'],
+            'citations': json.loads(row['citations']),
+            'model': row['model'],
+            'match': match,
+        }
+
+    def store(self, document: str, question: str, answer: str,
+              citations: List[Dict], model: Optional[str] = None):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO answers (document, question_key, question, answer, "
+            "citations, cited_ids, model, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (document, normalize_question(question), question, answer,
+             json.dumps(citations), ' '.join(dict.fromkeys(c['id'] for c in citations)), model, _now())
+        )
+
+    def _delete(self, document: str, keys: List[str]) -> int:
+        entries = self._indexes.get(document, (0, {}))[1]
+        for key in keys:
+            entries.pop(key, None)
+        return self.conn.executemany(
+            "DELETE FROM answers WHERE document = ? AND question_key = ?", [(document, key) for key in keys]
+        ).rowcount
+
+    def invalidate(self, document: str, removed_ids: Optional[Iterable[str]] = None) -> int:
+        """Drop the answers citing any of removed_ids (every answer if None); called on reprocessing"""
+        removed = None if removed_ids is None else set(removed_ids)
+        keys = [
+            row['question_key'] for row in self.conn.execute(
+                "SELECT question_key, cited_ids FROM answers WHERE document = ?", (document,))
+            if removed is None or not removed.isdisjoint(row['cited_ids'].split())
+        ]
+        retired = self._delete(document, keys) if keys else 0
+        if retired:
+            logger.info("Retired cached answers", extra={'document': document, 'count': retired})
+        return retired
@@ -0,0 +1,153 @@
+"""
+Calendar Snapshot - the formatted calendar, published once for all workers
+"""
+
+import gzip
+import json
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.core.metrics import record_cache
+from backend.core.shared_snapshot import SharedSnapshot, SnapshotView
+from backend.services.storage import iso_date
+
+SNAPSHOT_NAME = "calendar"
+
+
+def format_ipo_for_display(ipo: Dict) -> Dict:
+    """Format IPO data for frontend display with ALL fields"""
+
+    # Format the display data properly
+    formatted = {
+        # Date should show expected trade date
+        'expected_date': ipo.get('expected_date', 'TBD'),
+
+        # Core fields
+        'ticker': ipo.get('ticker', ''),
+        'company': ipo.get('company', ''),
+
+        # Financial data
+        'price_range': ipo.get('price_range', 'TBD'),
+        'price_low': ipo.get('price_low', 0),
+        'price_high': ipo.get('price_high', 0),
+        'shares': f"{ipo.get('shares_millions', 0):.1f}M" if ipo.get('shares_millions') else '-',
+        'volume': ipo.get('volume', '-'),
+
+        # Status and metadata
+        'status': ipo.get('status', 'Expected'),
+        'documents': ipo.get('filing_count', 0),
+        'lockup': ipo.get('lockup', '180 days'),
+
+        # Additional fields
+        'lead_managers': ipo.get('lead_managers', '-'),
+        'scoop_rating': ipo.get('scoop_rating', '-'),
+        'exchange': ipo.get('exchange', 'TBD'),
+    }
+
+    return formatted
+
+
+def period_range(period: str, today: Optional[date] = None) -> Optional[Tuple[str, str]]:
+    """ISO (first, last) dates of a calendar period; None for "all" or an unknown period"""
+    today = today or date.today()
+    monday = today - timedelta(days=today.weekday())
+    if period == 'this-week':
+        first, last = monday, monday + timedelta(days=6)
+    elif period == 'next-week':
+        first, last = monday + timedelta(days=7), monday + timedelta(days=13)
+    elif period == 'this-month':
+        first = today.replace(day=1)
+        last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    else:
+        return None
+    return first.isoformat(), last.isoformat()
+
+
+def filter_calendar(entries: List[Dict], period: str = 'all', status: str = 'all',
+                    today: Optional[date] = None) -> List[Dict]:
+    """Formatted calendar entries in a period and with a status (case-insensitive)"""
+    dates = period_range(period, today)
+    wanted = status.lower() if status and status != 'all' else None
+    filtered = []
+    for entry in entries:
+        if wanted and str(entry.get('status', '')).lower() != wanted:
+            continue
+        if dates:
+            expected = iso_date(entry.get('expected_date'))
+            if not expected or not dates[0] <= expected <= dates[1]:
+                continue
+        filtered.append(entry)
+    return filtered
+
+
+def _json(value) -> bytes:
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+class CalendarSnapshot:
+    """Serialized calendar response and per-ticker listings in a shared snapshot.
+
+    Sections:
+        listings      raw listings as a JSON array, indexed by ticker
+        calendar      the /api/calendar response body
+        calendar.gz   the same, gzip-compressed once at publish time
+    """
+
+    def __init__(self, load_sources: Callable[[], Dict], load_listings: Callable[[], List[Dict]],
+                 load_lockups: Callable[[], Dict[str, str]]):
+        # Versions of the inputs (file mtimes, store write counters); any change rebuilds
+        self._sources = load_sources
+        self.load_listings = load_listings
+        self.load_lockups = load_lockups
+        self.snapshot = SharedSnapshot(SNAPSHOT_NAME)
+
+    def _is_stale(self, view: Optional[SnapshotView]) -> bool:
+        stale = view is None or view.meta.get('sources') != self._sources()
+        record_cache('calendar_snapshot', not stale)
+        return stale
+
+    def _build(self) -> Tuple[Dict[str, bytes], Dict, Dict]:
+        sources = self._sources()
+        listings = self.load_listings()
+        lockups = self.load_lockups()
+
+        # Listings are serialized one by one so each can be sliced out by ticker
+        items = []
+        by_ticker = {}
+        offset = 1
+        for ipo in listings:
+            raw = _json(ipo)
+            if ipo.get('ticker'):
+                by_ticker[ipo['ticker']] = (offset, len(raw))
+            items.append(raw)
+            offset += len(raw) + 1
+
+        # Prefer lock-ups extracted from filings over the scraper default
+        calendar = _json([
+            format_ipo_for_display({**ipo, 'lockup': lockups[ipo.get('ticker')]} if ipo.get('ticker') in lockups else ipo)
+            for ipo in listings
+        ])
+
+        sections = {
+            'listings': b'[' + b','.join(items) + b']',
+            'calendar': calendar,
+            'calendar.gz': gzip.compress(calendar, compresslevel=6),
+        }
+        indexes = {'ticker': ('listings', by_ticker)}
+        meta = {'sources': sources, 'count': len(listings)}
+        return sections, indexes, meta
+
+    def current(self) -> Optional[SnapshotView]:
+        """Up-to-date view, rebuilding it (once, across all workers) if a source changed"""
+        return self.snapshot.refresh(self._is_stale, self._build)
+
+    def listings(self) -> List[Dict]:
+        """Every raw listing, parsed from the snapshot on each call rather than kept per worker"""
+        view = self.current()
+        return json.loads(view.section('listings')) if view else []
+
+    def listing(self, ticker: str) -> Optional[Dict]:
+        """One raw listing, parsed from its slice of the snapshot"""
+        view = self.current()
+        raw = view.lookup('ticker', ticker) if view else None
+        return json.loads(raw) if raw else None
@@ -0,0 +1,156 @@
+"""
+Chat Service - cited answers to questions about a processed filing
+
+Passages are the filing's citation blocks, ranked by BM25 against the question; the model
+only sees the top few. Answers are cached with the blocks they cite (see AnswerCache), so a
+repeated question is answered from the cache without retrieval or a model call for as long
+as those blocks are unchanged.
+"""
+
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from backend.core.log import get_logger
+from backend.core.metrics import record_cache
+from backend.services.answer_cache import AnswerCache, normalize_question
+from backend.services.document_service import DocumentService
+from backend.services.filing_text import html_text
+
+logger = get_logger(__name__)
+
+TOP_PASSAGES = 6
+# Long blocks (whole tables) are cut to this many characters in the prompt
+PASSAGE_CHARS = 1500
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TERM_PATTERN = re.compile(r'[a-z0-9]+')
+# Rare enough in a filing to outscore the words that matter, but never what is asked about
+QUESTION_WORDS = frozenset(['what', 'who', 'whom', 'which', 'when', 'where', 'why', 'how'])
+
+
+def _terms(text: str) -> List[str]:
+    # "lock-up" and "lockup" are the same term
+    return TERM_PATTERN.findall(text.lower().replace('-', ''))
+
+
+class PassageIndex:
+    """BM25 over one version of a filing's citation blocks"""
+
+    def __init__(self, passages: List[Dict]):
+        self.passages = passages
+        self.counts = [Counter(_terms(p['text'])) for p in passages]
+        self.lengths = [sum(counts.values()) for counts in self.counts]
+        self.average = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        frequency: Counter = Counter()
+        for counts in self.counts:
+            frequency.update(counts.keys())
+        total = len(passages)
+        self.idf = {term: math.log(1 + (total - n + 0.5) / (n + 0.5)) for term, n in frequency.items()}
+
+    def search(self, question: str, limit: int = TOP_PASSAGES) -> List[Dict]:
+        terms = [term for term in set(_terms(normalize_question(question)))
+                 if term in self.idf and term not in QUESTION_WORDS]
+        scored = []
+        for i, counts in enumerate(self.counts):
+            score = 0.0
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[i] / (self.average or 1))
+            for term in terms:
+                tf = counts.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+            if score:
+                scored.append((score, i))
+        scored.sort(reverse=True)
+        return [self.passages[i] for _, i in scored[:limit]]
+
+
+class ChatService:
+    """Answer questions about a processed filing, citing its blocks"""
+
+    def __init__(self):
+        self.documents = DocumentService()
+        self.cache = AnswerCache()
+        self._ai = None
+        # document -> (offsets table it was built from, its citation IDs, passage index or None)
+        self._indexes: Dict[str, Tuple[Dict, Set[str], Optional[PassageIndex]]] = {}
+
+    def _offsets(self, document: str) -> Optional[Dict]:
+        """The document's citation offsets, if it was processed and its cited HTML exists"""
+        offsets = self.documents.get_offsets(document)
+        if offsets is None or not Path(offsets['source']).is_file():
+            return None
+        return offsets
+
+    def citation_ids(self, document: str) -> Optional[Set[str]]:
+        """Content IDs of the document's blocks as processed now; cached answers must cite only these"""
+        offsets = self._offsets(document)
+        if offsets is None:
+            return None
+        cached = self._indexes.get(document)
+        # get_offsets hands back the same table until the document is reprocessed
+        hit = bool(cached and cached[0] is offsets)
+        record_cache('citation_ids', hit)
+        if not hit:
+            cached = (offsets, set(offsets['ids']), None)
+            self._indexes[document] = cached
+        return cached[1]
+
+    def _passages(self, document: str) -> PassageIndex:
+        offsets, ids, index = self._indexes[document]
+        if index is not None:
+            return index
+
+        source = Path(offsets['source'])
+        passages = []
+        for citation_id, start, end in zip(offsets['ids'], offsets['starts'], offsets['ends']):
+            text = html_text(self.documents.read(source, start, end).decode('utf-8', 'replace'))
+            if text:
+                passages.append({'id': citation_id, 'text': text})
+        index = PassageIndex(passages)
+        self._indexes[document] = (offsets, ids, index)
+        return index
+
+    def _model(self):
+        if self._ai is None:
+            # Imported on first miss: cached answers never need the model clients
+            from backend.services.ai_service import AIService
+            self._ai = AIService()
+        return self._ai
+
+    async def answer(self, document: str, question: str) -> Dict:
+        """Cited answer from the cache, else retrieved passages and one model call"""
+        current_ids = self.citation_ids(document)
+        if current_ids is None:
+            raise LookupError("Document has not been processed for citations")
+
+        cached = self.cache.lookup(document, question, current_ids)
+        if cached is not None:
+            return {**cached, 'cached': True}
+
+        passages = self._passages(document).search(question)
+        if not passages:
+            return {'text': "No passages in this filing match the question.", 'citations': [],
+                    'cached': False, 'match': None}
+
+        result = await self._model().answer_question(
+            question, [{'id': p['id'], 'text': p['text'][:PASSAGE_CHARS]} for p in passages])
+        if 'error' in result:
+            raise RuntimeError(result['error'])
+
+        # Only IDs that were actually shown to the model count as citations
+        by_id = {p['id']: p for p in passages}
+        citations = [
+            {'id': citation_id, 'text': by_id[citation_id]['text'][:200]}
+            for citation_id in dict.fromkeys(result.get('citations', [])) if citation_id in by_id
+        ]
+        if citations:
+            self.cache.store(document, question, result['text'], citations, result.get('model'))
+        logger.info("Answered question", extra={
+            'document': document, 'passages': len(passages), 'citations': len(citations)
+        })
+        return {'text': result['text'], 'citations': citations, 'model': result.get('model'),
+                'cached': False, 'match': None}
@@ -0,0 +1,209 @@
+"""
+CIK Resolver - local ticker/company -> CIK lookup over EDGAR's company tickers file
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from backend.core.log import get_logger
+
+logger = get_logger(__name__)
+
+# Same layout as https://www.sec.gov/files/company_tickers.json
+DEFAULT_TICKERS_PATH = "data/company_tickers.json"
+
+# Legal-form words carry no identity ("Reddit Inc" == "Reddit, Inc.")
+STOP_TOKENS = {
+    'inc', 'incorporated', 'corp', 'corporation', 'co', 'company', 'ltd', 'limited', 'llc',
+    'plc', 'lp', 'sa', 'ag', 'nv', 'the', 'de', 'cayman',
+}
+# Calendar annotations such as "(NASDAQ-New Filing)" or "(NASDAQ  Uplisting)"
+ANNOTATION_PATTERN = re.compile(r'\((?:nasdaq|nyse|amex)[^)]*\)', re.I)
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Scores are 0-100 like the confidences in cik_mappings.json
+CONFIDENT = 90
+# Names less alike than this are not worth returning as candidates
+MIN_SIMILARITY = 0.5
+# Words in more names than this ("holdings", "therapeutics") are too common to seed candidates
+COMMON_TOKEN_POSTINGS = 200
+
+
+def normalize_name(name: str) -> str:
+    """'HW Electro Co., Ltd. (NASDAQ-New Filing)' -> 'hw electro'"""
+    name = ANNOTATION_PATTERN.sub(' ', name.lower())
+    tokens = [t for t in TOKEN_PATTERN.findall(name) if t not in STOP_TOKENS]
+    return ' '.join(tokens)
+
+
+def trigrams(normalized: str) -> Set[str]:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CikResolver:
+    """Token + trigram inverted indexes for resolving issuers to CIKs without a model call"""
+
+    def __init__(self, tickers_path: str = DEFAULT_TICKERS_PATH):
+        self.tickers_path = Path(tickers_path)
+
+        # entry id -> {"cik", "ticker", "name", "normalized", "trigrams", "tokens"}
+        self.entries: List[Dict] = []
+        self.by_ticker: Dict[str, List[int]] = {}
+        self.by_cik: Dict[str, List[int]] = {}
+        self.trigram_index: Dict[str, List[int]] = {}
+        self.token_index: Dict[str, List[int]] = {}
+
+        self.load()
+
+    def load(self):
+        """Build the indexes from the company tickers file"""
+        self.entries = []
+        self.by_ticker = {}
+        self.by_cik = {}
+        self.trigram_index = {}
+        self.token_index = {}
+
+        if not self.tickers_path.exists():
+            logger.warning("No company tickers file", extra={'path': str(self.tickers_path)})
+            return
+
+        with open(self.tickers_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        rows = data.values() if isinstance(data, dict) else data
+        for row in rows:
+            self.add(str(row['cik_str']), row.get('ticker', ''), row.get('title', ''))
+
+    def add(self, cik: str, ticker: str, name: str):
+        """Index one company"""
+        normalized = normalize_name(name)
+        grams = trigrams(normalized)
+        entry_id = len(self.entries)
+
+        self.entries.append({
+            'cik': cik.zfill(10),
+            'ticker': ticker.upper(),
+            'name': name,
+            'normalized': normalized,
+            'trigrams': grams,
+            'tokens': set(normalized.split()),
+        })
+
+        self.by_ticker.setdefault(ticker.upper(), []).append(entry_id)
+        self.by_cik.setdefault(cik.zfill(10), []).append(entry_id)
+        for gram in grams:
+            self.trigram_index.setdefault(gram, []).append(entry_id)
+        for token in self.entries[-1]['tokens']:
+            self.token_index.setdefault(token, []).append(entry_id)
+
+    @staticmethod
+    def _dice(left: Set[str], right: Set[str]) -> float:
+        if not left or not right:
+            return 0.0
+        return 2 * len(left & right) / (len(left) + len(right))
+
+    def _candidate(self, entry_id: int, score: float, method: str) -> Dict:
+        entry = self.entries[entry_id]
+        return {
+            'cik': entry['cik'],
+            'ticker': entry['ticker'],
+            'name': entry['name'],
+            'confidence': int(round(score * 100)),
+            'method': method,
+        }
+
+    def _name_candidates(self, grams: Set[str], tokens: Set[str], limit: int) -> List[tuple]:
+        """(entry id, similarity) for names at least MIN_SIMILARITY alike, best first"""
+        # Usual case: the name shares a distinctive word ("reddit") with few other companies
+        shared: Set[int] = set()
+        for token in tokens:
+            postings = self.token_index.get(token, ())
+            if len(postings) <= COMMON_TOKEN_POSTINGS:
+                shared.update(postings)
+        if shared:
+            return self._score(shared, grams, tokens, limit)
+
+        # Misspelt or only generic words. Prefix filter: Dice >= s needs an overlap of at
+        # least s*|q|/(2-s) trigrams, so any such name shares one of the rarest |q| - overlap + 1
+        min_overlap = max(1, int(MIN_SIMILARITY * len(grams) / (2 - MIN_SIMILARITY)))
+        rarest = sorted(grams, key=lambda g: len(self.trigram_index.get(g, ())))
+        for gram in rarest[:len(grams) - min_overlap + 1]:
+            shared.update(self.trigram_index.get(gram, ()))
+        return self._score(shared, grams, tokens, limit)
+
+    def _score(self, entry_ids: Set[int], grams: Set[str], tokens: Set[str], limit: int) -> List[tuple]:
+        scored = []
+        for entry_id in entry_ids:
+            entry = self.entries[entry_id]
+            similarity = self._dice(grams, entry['trigrams'])
+            if similarity < MIN_SIMILARITY:
+                continue
+            # Sharing a whole word is stronger evidence than scattered trigrams
+            if tokens & entry['tokens']:
+                similarity = min(1.0, similarity + 0.05)
+            scored.append((entry_id, similarity))
+
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+    def resolve(self, ticker: Optional[str] = None, company: Optional[str] = None,
+                limit: int = 5) -> Dict:
+        """Best CIK match for a ticker and/or company name, with scored candidates"""
+        ticker = (ticker or '').strip().upper()
+        normalized = normalize_name(company or '')
+        grams = trigrams(normalized) if normalized else set()
+
+        candidates = []
+
+        # Fast path: exact ticker hit, confirmed by name similarity
+        for entry_id in self.by_ticker.get(ticker, ()):
+            if grams:
+                similarity = self._dice(grams, self.entries[entry_id]['trigrams'])
+                score = 0.6 + 0.4 * similarity
+                method = 'ticker+name'
+            else:
+                score = 0.9
+                method = 'ticker'
+            candidates.append(self._candidate(entry_id, score, method))
+
+        best_ticker = max((c['confidence'] for c in candidates), default=0)
+        if grams and best_ticker < CONFIDENT:
+            seen = {c['cik'] for c in candidates}
+            tokens = set(normalized.split())
+            for entry_id, similarity in self._name_candidates(grams, tokens, limit):
+                if self.entries[entry_id]['cik'] in seen:
+                    continue
+                # A name match under a different ticker is capped below "confident"
+                score = similarity * (0.85 if ticker else 1.0)
+                candidates.append(self._candidate(entry_id, score, 'name'))
+
+        candidates.sort(key=lambda c: c['confidence'], reverse=True)
+        candidates = candidates[:limit]
+
+        best = candidates[0] if candidates else None
+        return {
+            'ticker': ticker,
+            'company': company,
+            'match': best if best and best['confidence'] >= CONFIDENT else None,
+            'candidates': candidates,
+        }
+
+    def resolve_many(self, listings: List[Dict]) -> Dict[str, Dict]:
+        """Resolve a whole calendar: ticker -> resolution"""
+        return {
+            listing.get('ticker', ''): self.resolve(listing.get('ticker'), listing.get('company'))
+            for listing in listings
+        }
+
+    def verify(self, ticker: Optional[str], company: Optional[str], cik: Optional[str]) -> Optional[bool]:
+        """True/False if the CIK can be checked locally, None if a model should decide"""
+        resolution = self.resolve(ticker, company)
+        match = resolution['match']
+        if not match:
+            return None
+        if not cik:
+            return False
+        return match['cik'] == str(cik).zfill(10)
@@ -1,10 +1,165 @@
 """Citation Service for document processing"""
 
+from bisect import bisect_right
+from collections import Counter
+from difflib import SequenceMatcher
 from pathlib import Path
 from bs4 import BeautifulSoup
+from bs4.builder import HTMLTreeBuilder
+from datetime import datetime, timezone
 import hashlib
 import json
-from typing import Dict, List, Optional
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.core.log import get_logger
+from backend.services.answer_cache import AnswerCache
+from backend.services.filing_manifest import document_key, parse_filing_name
+from backend.services.filing_store import FilingStore
+from backend.services.table_extractor import CONTEXT_HEADINGS, HEADING_TAGS, extract_table, heading_text
+from backend.services.table_store import TableStore
+
+logger = get_logger(__name__)
+
+CITABLE_TAGS = ['h1', 'h2', 'h3', 'p', 'table', 'li']
+
+# Raw blocks are only cut where none of these is open, so no citable element and no heading
+# a table's context is read from spans two blocks
+ANCHOR_TAGS = frozenset(CITABLE_TAGS) | frozenset(HEADING_TAGS)
+
+# Closed as soon as they open, as in BeautifulSoup's html.parser builder
+VOID_TAGS = HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS
+
+# Start tags that end an open <p>, as in browsers; html.parser alone would nest the rest of
+# the filing inside an unclosed one
+P_CLOSERS = frozenset(['p', 'table', 'h1', 'h2', 'h3', 'h4'])
+
+# Comments, script/style bodies and declarations (skipped), end tags (2), start tags (3, 4: "/")
+TOKEN_PATTERN = re.compile(
+    r'<!--.*?(?:-->|\Z)|<(script|style)\b[^>]*>.*?(?:</\1\s*>|\Z)|<[!?][^>]*>'
+    r'|</([a-zA-Z][^\t\n\r\f />\x00]*)[^>]*>'
+    r'|<([a-zA-Z][^\t\n\r\f />\x00]*)(?:[^>"\']|"[^"]*"|\'[^\']*\')*?(/?)>',
+    re.S | re.I
+)
+START_TAG_PATTERN = re.compile(r'<([a-zA-Z][^\t\n\r\f />\x00]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*?)(/?)>')
+TAG_NAME_PATTERN = re.compile(r'<[a-zA-Z][^\t\n\r\f />\x00]*')
+ATTRIBUTE_PATTERN = re.compile(r'''\s*([^\s=/>"']+)(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s>"']*))?|[\s\S]''')
+NEWLINE_PATTERN = re.compile(r'\n')
+
+SPACE_PATTERN = re.compile(r'\s+')
+
+PROGRESS_EVERY = 250
+
+# Opening/closing tags per citable tag, for finding where an element ends in serialized HTML
+TAG_PATTERNS = {
+    tag: re.compile(rb'<(/?)' + tag.encode() + rb'\b[^>]*?(/?)>', re.I) for tag in CITABLE_TAGS
+}
+
+
+def _replace_file(path: Path, data: bytes) -> None:
+    """Write via a temp file and rename: readers mmap these files, and truncating a mapped
+    file under them raises SIGBUS"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    tmp_path.replace(path)
+
+
+def _element_end(html: bytes, start: int, tag: str) -> int:
+    """Offset just past the element opening at start, by tag depth; -1 if unbalanced.
+
+    A byte scan instead of re-serializing each element, which is quadratic for nested blocks.
+    """
+    depth = 0
+    for match in TAG_PATTERNS[tag].finditer(html, start):
+        if match.group(1):
+            depth -= 1
+            if depth == 0:
+                return match.end()
+        elif not match.group(2):
+            depth += 1
+    return -1
+
+
+def content_id(tag: str, text: str, seen: Counter) -> str:
+    """Citation ID from the element's own content, so inserting a block elsewhere never renumbers it.
+
+    Repeated identical blocks get -2, -3, ... in document order.
+    """
+    normalized = SPACE_PATTERN.sub(' ', text).strip()
+    digest = hashlib.sha1(f"{tag}\0{normalized}".encode('utf-8')).hexdigest()[:12]
+    return _numbered(digest, seen)
+
+
+def _numbered(digest: str, seen: Counter) -> str:
+    seen[digest] += 1
+    return f"cite-{digest}" if seen[digest] == 1 else f"cite-{digest}-{seen[digest]}"
+
+
+def split_blocks(raw_html: str) -> Tuple[List[Tuple[int, Tuple[str, ...], int]], Dict[int, str]]:
+    """Cut a filing's raw HTML into top-level blocks with a regex scan instead of a parse.
+
+    Returns each block's start, the tags open there (outermost first) and how many open <p>
+    it closes (see P_CLOSERS), and the offset and name of every citable start tag. Nesting
+    otherwise follows BeautifulSoup's html.parser builder: an end tag closes the latest open
+    tag of its name and everything inside it, and is ignored if none is open.
+    """
+    blocks = [(0, (), 0)]
+    citable = {}
+    stack: List[str] = []
+    # Open anchors below each stack entry, so popping to any depth is O(1)
+    anchors_below: List[int] = []
+    anchors = 0
+    for match in TOKEN_PATTERN.finditer(raw_html):
+        start_name, end_name = match.group(3, 2)
+        if start_name:
+            name = start_name.lower()
+            if name in ANCHOR_TAGS:
+                closed = 0
+                if anchors and name in P_CLOSERS and all(
+                        open_name == 'p' for open_name in stack if open_name in ANCHOR_TAGS):
+                    depth = stack.index('p')
+                    closed = anchors - anchors_below[depth]
+                    anchors = anchors_below[depth]
+                    del stack[depth:], anchors_below[depth:]
+                if not anchors and match.start():
+                    blocks.append((match.start(), tuple(stack), closed))
+                if name in TAG_PATTERNS:
+                    citable[match.start()] = name
+            if match.group(4) or name in VOID_TAGS:
+                continue
+            stack.append(name)
+            anchors_below.append(anchors)
+            anchors += name in ANCHOR_TAGS
+        elif end_name:
+            name = end_name.lower()
+            if name in stack:
+                depth = len(stack) - 1 - stack[::-1].index(name)
+                anchors = anchors_below[depth]
+                del stack[depth:], anchors_below[depth:]
+    return blocks, citable
+
+
+def _block_digest(raw_block: str, open_tags: Tuple[str, ...]) -> str:
+    # The open tags decide which element a stray end tag closes, so they are part of the content
+    return hashlib.sha1(f"{'/'.join(open_tags)}\0{raw_block}".encode('utf-8')).hexdigest()
+
+
+def _cite_tag(raw_html: str, start: int, citation_id: str) -> Tuple[str, int]:
+    """The start tag at start rewritten with the citation ID, and the offset just past it"""
+    cite = f' id="{citation_id}" data-cite="true"'
+    match = START_TAG_PATTERN.match(raw_html, start)
+    if match is None:
+        # Unterminated tag: the attributes still go right after the name
+        name_end = TAG_NAME_PATTERN.match(raw_html, start).end()
+        return raw_html[start:name_end] + cite, name_end
+    kept = ''.join(
+        attr.group(0) for attr in ATTRIBUTE_PATTERN.finditer(match.group(2))
+        if (attr.group(1) or '').lower() not in ('id', 'data-cite')
+    )
+    return f"<{match.group(1)}{kept.rstrip()}{cite}{match.group(3)}>", match.end()
+
 
 class CitationService:
     """Handle citation processing for documents"""
@@ -12,68 +167,371 @@ class CitationService:
     def __init__(self):
         self.indices_dir = Path("data/indices")
         self.indices_dir.mkdir(parents=True, exist_ok=True)
+        self.store = FilingStore()
+        self.tables = TableStore()
+        self.answers = AnswerCache()
     
-    async def process_document(self, doc_path: str) -> Dict:
-        """Add citation IDs to every citable element"""
+    def previous_version(self, doc_path: str) -> Optional[str]:
+        """Document key of the version to diff against: this filing's own earlier
+        processing, else the latest earlier filing of the same form (S-1 for an S-1/A)"""
+        path = Path(doc_path)
+        if (self.indices_dir / f"{document_key(path)}_citations.json").exists():
+            return document_key(path)
         
-        with open(doc_path, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f.read(), 'html.parser')
+        meta = parse_filing_name(path.name)
+        if not meta['filing_date']:
+            return None
+        base_form = meta['form_type'].replace('/A', '')
+        candidates = []
+        for other in path.parent.glob("*.html"):
+            other_meta = parse_filing_name(other.name)
+            if (other.stem != path.stem and not other.stem.endswith('_cited')
+                    and other_meta['form_type'].replace('/A', '') == base_form
+                    and other_meta['filing_date'] and other_meta['filing_date'] < meta['filing_date']
+                    and (self.indices_dir / f"{document_key(other)}_citations.json").exists()):
+                candidates.append((other_meta['filing_date'], document_key(other)))
+        return max(candidates)[1] if candidates else None
+    
+    async def process_document(self, doc_path: str, previous: Optional[str] = None,
+                               progress: Optional[Callable[[float, str], None]] = None) -> Dict:
+        """Add citation IDs to every citable element.
         
-        citations = []
-        page_num = 1
+        The raw HTML is split into top-level blocks (split_blocks) and diffed by block digest
+        against the previous version (see previous_version). Only runs of changed blocks are
+        parsed; unchanged blocks keep their cited bytes, citations, byte offsets and tables,
+        shifted to where they now are. An unchanged block is parsed again on its own only if
+        the headings before one of its tables or its duplicate-ID numbering changed.
+        """
+        report = progress or (lambda fraction, message: None)
         
-        # Add IDs to all citable elements
-        for idx, elem in enumerate(soup.find_all(['h1', 'h2', 'h3', 'p', 'table', 'li'])):
-            # Skip empty elements
-            if not elem.get_text(strip=True):
-                continue
-            
-            # Generate stable citation ID
-            text_preview = elem.get_text()[:50]
-            citation_id = f"cite-{idx}-{hashlib.md5(text_preview.encode()).hexdigest()[:6]}"
-            elem['id'] = citation_id
-            elem['data-cite'] = 'true'
-            
-            # Estimate page number (rough calculation)
-            if 'page' in elem.get_text().lower():
-                page_match = re.search(r'page\s+(\d+)', elem.get_text(), re.I)
-                if page_match:
-                    page_num = int(page_match.group(1))
-            
-            citations.append({
-                "id": citation_id,
-                "text": elem.get_text()[:200] + "..." if len(elem.get_text()) > 200 else elem.get_text(),
-                "type": elem.name,
-                "page": page_num,
-                "position": idx * 100,  # Rough position for scrolling
-                "tag": elem.name
-            })
+        # Plain file if present, otherwise decompressed from the filing store
+        raw_html = self.store.read_text(doc_path)
+        doc_name = document_key(doc_path)
+        ticker = Path(doc_path).parent.name
+        processed_path = doc_path.replace('.html', '_cited.html')
+        
+        previous = previous or self.previous_version(doc_path)
+        old = self._load_version(previous) if previous else None
+        report(0.1, "split")
+        cited = self._cite(raw_html, *split_blocks(raw_html), old, report)
+        if cited is None:
+            # The scan and the parser disagree about this filing's tags: cite it as one block
+            logger.warning("Raw block scan disagrees with the parser", extra={'document': doc_name})
+            cited = self._cite(raw_html, [(0, (), 0)], None, None, report)
+        processed_bytes, citations, starts, ends, tables, records, stats = cited
+        
+        # What downstream indexes (tables, embeddings, answer caches) must redo
+        previous_ids = [c['id'] for c in self._read_index(previous)] if previous else []
+        ids = [c['id'] for c in citations]
+        previous_set = set(previous_ids)
+        current_set = set(ids)
+        revision = {
+            "previous": previous,
+            "unchanged": sum(1 for citation_id in ids if citation_id in previous_set),
+            "added": [citation_id for citation_id in ids if citation_id not in previous_set],
+            "removed": [citation_id for citation_id in previous_ids if citation_id not in current_set],
+            "changed_regions": stats['regions'],
+            "blocks": len(records),
+            "blocks_parsed": stats['parsed'],
+            "tables_extracted": stats['extracted'],
+        }
         
         # Save processed HTML
-        processed_path = doc_path.replace('.html', '_cited.html')
-        with open(processed_path, 'w', encoding='utf-8') as f:
-            f.write(str(soup))
+        report(0.8, "writing")
+        _replace_file(Path(processed_path), processed_bytes)
         
-        # Save citation index
-        doc_name = Path(doc_path).stem
-        index_path = self.indices_dir / f"{doc_name}_citations.json"
+        # Byte-offset table so viewers can fetch citation ranges without the whole file
+        _replace_file(self.indices_dir / f"{doc_name}_offsets.json", json.dumps({
+            "document": doc_name,
+            "source": processed_path,
+            "size": len(processed_bytes),
+            "ids": ids,
+            "starts": starts,
+            "ends": ends
+        }).encode('utf-8'))
+        # Block digests and sizes for diffing the next version
+        _replace_file(self.indices_dir / f"{doc_name}_blocks.json", json.dumps({
+            "document": doc_name,
+            "source": processed_path,
+            "size": len(processed_bytes),
+            "blocks": records
+        }).encode('utf-8'))
+        self.tables.save(ticker, Path(doc_path).stem, tables)
         
+        index_path = self.indices_dir / f"{doc_name}_citations.json"
         with open(index_path, 'w', encoding='utf-8') as f:
             json.dump({
                 "document": doc_name,
                 "total_citations": len(citations),
                 "citations": citations,
+                "revision": revision,
                 "processed_date": datetime.now(timezone.utc).isoformat()
             }, f, indent=2)
         
+        # Cached chat answers survive unless they cite a block that is gone; diffed against
+        # another filing, no removed IDs of this one are known, so all of its answers go
+        self.answers.invalidate(doc_name, revision['removed'] if previous == doc_name else None)
+        
+        logger.info("Processed document", extra={
+            'document': doc_name, 'citations': len(citations), 'previous': previous,
+            'added': len(revision['added']), 'removed': len(revision['removed']),
+            'blocks': len(records), 'blocks_parsed': stats['parsed'],
+            'tables_extracted': stats['extracted'], 'tables': len(tables)
+        })
+        
         return {
             "path": processed_path,
             "citations": citations,
-            "total": len(citations)
+            "total": len(citations),
+            "tables": len(tables),
+            "revision": revision
         }
     
-    async def get_citations(self, doc_id: str) -> List[Dict]:
-        """Get citations for a document"""
+    def _cite(self, raw_html: str, blocks: List[Tuple[int, Tuple[str, ...], int]], citable: Optional[Dict[int, str]],
+              old: Optional[Dict], report: Callable[[float, str], None]) -> Optional[Tuple]:
+        """Cited bytes, citations, offsets, tables and block records for a filing.
+        
+        citable (from split_blocks) is checked against every parse; None skips the check.
+        Returns None when they disagree.
+        """
+        bounds = [block[0] for block in blocks] + [len(raw_html)]
+        digests = [_block_digest(raw_html[bounds[n]:bounds[n + 1]], blocks[n][1]) for n in range(len(blocks))]
+        
+        # New block -> unchanged old block
+        reuse = {}
+        if old:
+            # Filler blocks (spacer paragraphs) repeat often enough to be junk; matches still
+            # extend over them
+            matcher = SequenceMatcher(None, [b['digest'] for b in old['blocks']], digests)
+            for op, i1, i2, j1, j2 in matcher.get_opcodes():
+                if op == 'equal':
+                    reuse.update(zip(range(j1, j2), range(i1, i2)))
+        
+        pieces = []
+        size = 0
+        citations = []
+        starts = []
+        ends = []
+        tables = []
+        records = []
+        regions = []
+        seen: Counter = Counter()
+        context: List[str] = []
+        page_num = 1
+        elements = 0
+        parsed = {}
+        # Headings before the fragment being parsed, for its tables' context
+        fragment_context: List[str] = []
+        stats = {'parsed': 0, 'extracted': 0}
+        
+        for n in range(len(blocks)):
+            if n % PROGRESS_EVERY == 0:
+                report(0.1 + 0.7 * n / len(blocks), f"citing block {n}/{len(blocks)}")
+            
+            ids = None
+            if n in reuse and n not in parsed:
+                i = reuse[n]
+                record = old['blocks'][i]
+                first = old['citation_starts'][i]
+                old_citations = old['citations'][first:first + record['citations']]
+                ids = [_numbered(c['id'].split('-')[1], seen) for c in old_citations]
+                # Tables read the headings before them, which may have changed
+                stale_tables = record['tables'] and (old['tables'] is None or old['contexts'][i] != context)
+                if ids == [c['id'] for c in old_citations] and not stale_tables:
+                    shift = size - old['byte_starts'][i]
+                    pieces.append(old['cited'][old['byte_starts'][i]:old['byte_starts'][i] + record['size']])
+                    marks = dict(record['marks'])
+                    for k, citation in enumerate(old_citations):
+                        page_num = marks.get(k, page_num)
+                        citations.append({
+                            **citation,
+                            "page": page_num,
+                            "position": citation['position'] + (elements - old['element_starts'][i]) * 100
+                        })
+                        starts.append(old['starts'][first + k] + shift)
+                        ends.append(old['ends'][first + k] + shift)
+                        table = old['tables'].get(citation['id']) if record['tables'] else None
+                        if table:
+                            tables.append(table)
+                    size += record['size']
+                    elements += record['elements']
+                    context = (context + record['headings'])[-CONTEXT_HEADINGS:]
+                    records.append({**record, 'digest': digests[n]})
+                    continue
+                parsed.update(self._parse_blocks(raw_html, bounds, blocks, n, n + 1, citable))
+                fragment_context = context
+            elif n not in parsed:
+                # Parse the whole run of changed blocks at once
+                end = n + 1
+                while end < len(blocks) and end not in reuse:
+                    end += 1
+                parsed.update(self._parse_blocks(raw_html, bounds, blocks, n, end, citable))
+                fragment_context = context
+            
+            block = parsed.pop(n, None)
+            if block is None:
+                return None
+            stats['parsed'] += 1
+            if not regions or regions[-1][1] != len(citations):
+                regions.append([len(citations), len(citations)])
+            
+            cursor = bounds[n]
+            out = []
+            out_size = 0
+            marks = []
+            for k, (offset, elem, text) in enumerate(block['citations']):
+                citation_id = ids[k] if ids else content_id(elem.name, text, seen)
+                chunk = raw_html[cursor:offset].encode('utf-8')
+                tag, cursor = _cite_tag(raw_html, offset, citation_id)
+                tag_bytes = tag.encode('utf-8')
+                out.extend((chunk, tag_bytes))
+                starts.append(size + out_size + len(chunk))
+                out_size += len(chunk) + len(tag_bytes)
+                
+                # Numeric tables are also kept as typed frames under the same citation ID
+                if elem.name == 'table':
+                    table = extract_table(elem, citation_id, fragment_context)
+                    stats['extracted'] += 1
+                    if table:
+                        tables.append(table)
+                
+                # Estimate page number (rough calculation)
+                if 'page' in text.lower():
+                    page_match = re.search(r'page\s+(\d+)', text, re.I)
+                    if page_match:
+                        page_num = int(page_match.group(1))
+                        marks.append([k, page_num])
+                
+                citations.append({
+                    "id": citation_id,
+                    "text": text[:200] + "..." if len(text) > 200 else text,
+                    "type": elem.name,
+                    "page": page_num,
+                    "position": (elements + block['positions'][k]) * 100,  # Rough position for scrolling
+                    "tag": elem.name
+                })
+            out.append(raw_html[cursor:bounds[n + 1]].encode('utf-8'))
+            block_bytes = b''.join(out)
+            
+            for k, (offset, elem, text) in enumerate(block['citations']):
+                local_start = starts[len(starts) - len(block['citations']) + k] - size
+                local_end = _element_end(block_bytes, local_start, elem.name)
+                ends.append(size + (local_end if local_end != -1 else len(block_bytes)))
+            
+            pieces.append(block_bytes)
+            size += len(block_bytes)
+            elements += block['elements']
+            context = (context + block['headings'])[-CONTEXT_HEADINGS:]
+            regions[-1][1] = len(citations)
+            records.append({
+                'digest': digests[n],
+                'size': len(block_bytes),
+                'citations': len(block['citations']),
+                'elements': block['elements'],
+                'tables': sum(1 for _, elem, _ in block['citations'] if elem.name == 'table'),
+                'headings': block['headings'],
+                'marks': marks,
+            })
+        
+        stats['regions'] = [region for region in regions if region[1] > region[0]]
+        return b''.join(pieces), citations, starts, ends, tables, records, stats
+    
+    def _parse_blocks(self, raw_html: str, bounds: List[int], blocks: List[Tuple[int, Tuple[str, ...], int]],
+                      first: int, end: int, citable: Optional[Dict[int, str]]) -> Dict[int, Optional[Dict]]:
+        """Parse blocks first..end-1 as one fragment and split what was found back into blocks.
+        
+        The fragment is prefixed with the tags open at its start so end tags close what they
+        would in the whole document, and gets the </p> tags split_blocks implied. A block maps
+        to None if citable disagrees with the parse.
+        """
+        start = blocks[first][0]
+        parts = [''.join(f"<{name}>" for name in blocks[first][1])]
+        # Where each block's raw text starts in the markup
+        markup_starts = []
+        size = len(parts[0])
+        for n in range(first, end):
+            if n > first and blocks[n][2]:
+                parts.append('</p>' * blocks[n][2])
+                size += len(parts[-1])
+            markup_starts.append(size)
+            parts.append(raw_html[bounds[n]:bounds[n + 1]])
+            size += len(parts[-1])
+        markup = ''.join(parts)
+        soup = BeautifulSoup(markup, 'html.parser')
+        line_starts = [0] + [match.end() for match in NEWLINE_PATTERN.finditer(markup)]
+        
+        def offset(elem) -> int:
+            position = line_starts[elem.sourceline - 1] + elem.sourcepos
+            n = max(bisect_right(markup_starts, position) - 1, 0)
+            return bounds[first + n] + position - markup_starts[n]
+        
+        parsed = {
+            n: {'citations': [], 'positions': [], 'elements': 0, 'headings': []}
+            for n in range(first, end)
+        }
+        found = []
+        for elem in soup.find_all(CITABLE_TAGS):
+            position = offset(elem)
+            found.append((position, elem.name))
+            block = parsed[bisect_right(bounds, position, first, end) - 1]
+            text = elem.get_text()
+            # Skip empty elements
+            if text.strip():
+                block['citations'].append((position, elem, text))
+                block['positions'].append(block['elements'])
+            block['elements'] += 1
+        
+        if citable is not None:
+            expected = [(position, citable[position]) for position in sorted(citable)
+                        if start <= position < bounds[end]]
+            if found != expected:
+                return dict.fromkeys(parsed)
+        
+        headings: Dict[int, List] = {n: [] for n in parsed}
+        for elem in soup.find_all(HEADING_TAGS):
+            headings[bisect_right(bounds, offset(elem), first, end) - 1].append(elem)
+        for n, block in parsed.items():
+            block['headings'] = [heading_text(elem) for elem in headings[n][-CONTEXT_HEADINGS:]]
+        return parsed
+    
+    def _load_version(self, doc_id: str) -> Optional[Dict]:
+        """An earlier processing's block records, citations, offsets, cited bytes and tables,
+        with per-block starts; None if missing or out of step with each other"""
+        blocks_path = self.indices_dir / f"{doc_id}_blocks.json"
+        offsets_path = self.indices_dir / f"{doc_id}_offsets.json"
+        if not blocks_path.exists() or not offsets_path.exists():
+            return None
+        with open(blocks_path, 'r', encoding='utf-8') as f:
+            version = json.load(f)
+        with open(offsets_path, 'r', encoding='utf-8') as f:
+            offsets = json.load(f)
+        citations = self._read_index(doc_id)
+        source = Path(version['source'])
+        records = version['blocks']
+        if (not source.exists() or source.stat().st_size != version['size']
+                or offsets['size'] != version['size']
+                or [c['id'] for c in citations] != offsets['ids']
+                or sum(record['citations'] for record in records) != len(citations)):
+            return None
+        
+        version.update(citations=citations, starts=offsets['starts'], ends=offsets['ends'],
+                       cited=source.read_bytes(), tables=self.tables.load(*doc_id.split('/', 1)),
+                       byte_starts=[], citation_starts=[], element_starts=[], contexts=[])
+        size = count = elements = 0
+        context: List[str] = []
+        for record in records:
+            version['byte_starts'].append(size)
+            version['citation_starts'].append(count)
+            version['element_starts'].append(elements)
+            version['contexts'].append(context)
+            size += record['size']
+            count += record['citations']
+            elements += record['elements']
+            context = (context + record['headings'])[-CONTEXT_HEADINGS:]
+        return version
+    
+    def _read_index(self, doc_id: str) -> List[Dict]:
+        """Citations from a document's citation index; doc_id is its document_key"""
         
         index_path = self.indices_dir / f"{doc_id}_citations.json"
         
@@ -84,10 +542,14 @@ class CitationService:
         
         return []
     
+    async def get_citations(self, doc_id: str) -> List[Dict]:
+        """Get citations for a document"""
+        return self._read_index(doc_id)
+    
     def find_citation_by_text(self, doc_id: str, search_text: str) -> Optional[Dict]:
         """Find a citation containing specific text"""
         
-        citations = self.get_citations(doc_id)
+        citations = self._read_index(doc_id)
         
         search_lower = search_text.lower()
         for citation in citations:
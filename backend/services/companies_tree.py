@@ -0,0 +1,142 @@
+"""
+Companies Tree - materialized sector/industry view of every issuer
+"""
+
+from typing import Dict, List, Optional
+
+UNCLASSIFIED = "Unclassified"
+
+
+class CompaniesTree:
+    """Sector -> industry -> company view, maintained one company at a time"""
+
+    def __init__(self):
+        # ticker -> leaf
+        self.leaves: Dict[str, Dict] = {}
+        # sector -> {"companies": {ticker: leaf}, "industries": {industry: count}, "filing_count": n}
+        self.sectors: Dict[str, Dict] = {}
+
+        # Sorted child lists and the full serialized tree are rebuilt lazily
+        self._sorted: Dict[str, List[Dict]] = {}
+        self._full: Optional[Dict] = None
+
+    @staticmethod
+    def _make_leaf(ticker: str, listing: Optional[Dict], profile: Optional[Dict], filing_count: int) -> Dict:
+        listing = listing or {}
+        profile = profile or {}
+        return {
+            'ticker': ticker,
+            'company': listing.get('company') or profile.get('name') or ticker,
+            'sector': profile.get('sector') or listing.get('sector') or UNCLASSIFIED,
+            'industry': profile.get('industry') or listing.get('industry') or UNCLASSIFIED,
+            'status': listing.get('status'),
+            'filing_count': filing_count
+        }
+
+    def _invalidate(self, sector: str):
+        self._sorted.pop(sector, None)
+        self._full = None
+
+    def _detach(self, leaf: Dict):
+        """Remove a leaf from its sector node and fix up counts"""
+        sector = self.sectors[leaf['sector']]
+        del sector['companies'][leaf['ticker']]
+        sector['filing_count'] -= leaf['filing_count']
+
+        industries = sector['industries']
+        industries[leaf['industry']] -= 1
+        if not industries[leaf['industry']]:
+            del industries[leaf['industry']]
+
+        if not sector['companies']:
+            del self.sectors[leaf['sector']]
+            self._sorted.pop(leaf['sector'], None)
+        self._invalidate(leaf['sector'])
+
+    def _attach(self, leaf: Dict):
+        """Add a leaf to its sector node and fix up counts"""
+        sector = self.sectors.setdefault(
+            leaf['sector'], {'companies': {}, 'industries': {}, 'filing_count': 0}
+        )
+        sector['companies'][leaf['ticker']] = leaf
+        sector['filing_count'] += leaf['filing_count']
+        sector['industries'][leaf['industry']] = sector['industries'].get(leaf['industry'], 0) + 1
+        self._invalidate(leaf['sector'])
+
+    def upsert(self, ticker: str, listing: Optional[Dict] = None, profile: Optional[Dict] = None,
+               filing_count: Optional[int] = None) -> bool:
+        """Insert or update one company; returns True if the tree changed"""
+        old = self.leaves.get(ticker)
+        if filing_count is None:
+            filing_count = old['filing_count'] if old else 0
+
+        leaf = self._make_leaf(ticker, listing, profile, filing_count)
+        if old == leaf:
+            return False
+
+        if old:
+            self._detach(old)
+        self.leaves[ticker] = leaf
+        self._attach(leaf)
+        return True
+
+    def set_filing_count(self, ticker: str, filing_count: int) -> bool:
+        """Update a company's filing count without touching anything else"""
+        leaf = self.leaves.get(ticker)
+        if not leaf or leaf['filing_count'] == filing_count:
+            return False
+
+        self.sectors[leaf['sector']]['filing_count'] += filing_count - leaf['filing_count']
+        leaf['filing_count'] = filing_count
+        self._invalidate(leaf['sector'])
+        return True
+
+    def remove(self, ticker: str) -> bool:
+        """Drop a company from the tree"""
+        leaf = self.leaves.pop(ticker, None)
+        if not leaf:
+            return False
+        self._detach(leaf)
+        return True
+
+    def children(self, sector: str) -> List[Dict]:
+        """Companies in a sector, sorted by name"""
+        if sector not in self._sorted:
+            node = self.sectors.get(sector)
+            companies = node['companies'].values() if node else []
+            self._sorted[sector] = sorted(companies, key=lambda c: c['company'].lower())
+        return self._sorted[sector]
+
+    def summary(self) -> List[Dict]:
+        """Top-level nodes with per-node counts (no children)"""
+        return [
+            {
+                'sector': name,
+                'company_count': len(node['companies']),
+                'filing_count': node['filing_count'],
+                'industries': [
+                    {'industry': industry, 'company_count': count}
+                    for industry, count in sorted(node['industries'].items())
+                ]
+            }
+            for name, node in sorted(self.sectors.items())
+        ]
+
+    def expand(self, sector: str, industry: Optional[str] = None,
+               offset: int = 0, limit: int = 100) -> Dict:
+        """One page of a sector's children"""
+        companies = self.children(sector)
+        if industry:
+            companies = [c for c in companies if c['industry'] == industry]
+        return {
+            'sector': sector,
+            'total': len(companies),
+            'offset': offset,
+            'companies': companies[offset:offset + limit]
+        }
+
+    def full(self) -> Dict:
+        """Whole tree as {sector: [companies]} (cached until something changes)"""
+        if self._full is None:
+            self._full = {sector: self.children(sector) for sector in sorted(self.sectors)}
+        return self._full
@@ -5,69 +5,285 @@ Author: thorrobber22
 """
 
 import json
+import os
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from backend.core.log import get_logger
+from backend.services.calendar_snapshot import CalendarSnapshot
+from backend.services.cik_resolver import CikResolver
+from backend.services.companies_tree import CompaniesTree
+from backend.services.filing_manifest import FilingManifest, normalize_company
+from backend.services.filing_store import FilingStore
+from backend.services.lockup_service import LockupService
+from backend.services.storage import Storage, iso_date
+
+logger = get_logger(__name__)
 
 class DataService:
     """Simple data service - real data only"""
     
     def __init__(self):
         self.data_dir = Path("data")
-    
-    def get_ipo_calendar(self, filters: Dict = None) -> List[Dict]:
-        """Get IPO calendar - REAL DATA ONLY"""
         
-        # Read the actual scraped data
-        calendar_path = self.data_dir / "ipo_calendar.json"
+        # SQLite store once scripts/import_json_to_sqlite.py has created it, JSON files otherwise
+        db_path = os.getenv("DATABASE_PATH", str(self.data_dir / "hedge.db"))
+        self.storage = Storage(db_path) if Storage.exists(db_path) else None
+        
+        # Raw and formatted calendar shared by all worker processes; workers keep no parsed copy
+        self.calendar_snapshot = CalendarSnapshot(self.calendar_sources, self._read_listings, self.get_lockup_periods)
+        # (listings version, company/ticker -> ticker) for mapping filing directories
+        self._tickers: Tuple[Optional[Tuple], Dict[str, str]] = (None, {})
         
-        if calendar_path.exists():
+        # Source versions the materialized companies tree was built from
+        self._tree_sources: Dict[str, Tuple] = {}
+        self._tree_listings: Dict[str, Dict] = {}
+        self._tree_profiles: Dict[str, Dict] = {}
+    
+    # Built on first use, so a worker that only serves the calendar never loads them
+    
+    @cached_property
+    def store(self) -> FilingStore:
+        return FilingStore(self.data_dir)
+    
+    @cached_property
+    def manifest(self) -> FilingManifest:
+        return FilingManifest(self.data_dir, ticker_for=self._ticker_for_company, store=self.store)
+    
+    @cached_property
+    def lockups(self) -> LockupService:
+        return LockupService(self.data_dir, self.manifest)
+    
+    @cached_property
+    def cik_resolver(self) -> CikResolver:
+        return CikResolver(str(self.data_dir / "company_tickers.json"))
+    
+    @cached_property
+    def tree(self) -> CompaniesTree:
+        return CompaniesTree()
+    
+    def _ticker_for_company(self, name: str) -> Optional[str]:
+        """Map a filings directory name (ticker or company name) to a ticker"""
+        # Read from the source, not the snapshot: building the snapshot maps filings to tickers
+        version = self._listings_version()
+        if self._tickers[0] != version:
+            tickers = {}
+            for ipo in self._read_listings():
+                if ipo.get('ticker'):
+                    tickers.setdefault(normalize_company(ipo.get('company', '')), ipo['ticker'])
+                    tickers[ipo['ticker']] = ipo['ticker']
+            self._tickers = (version, tickers)
+        tickers = self._tickers[1]
+        return tickers.get(name) or tickers.get(normalize_company(name))
+    
+    def _source_mtime(self, name: str) -> float:
+        path = self.data_dir / name
+        return path.stat().st_mtime if path.exists() else 0.0
+    
+    def _listings_version(self) -> Tuple:
+        if self.storage:
+            return ('db', self.storage.version('listings'))
+        return ('json', self._source_mtime("ipo_calendar.json"))
+    
+    def _profiles_version(self) -> Tuple:
+        if self.storage:
+            return ('db', self.storage.version('profiles'))
+        return ('json', self._source_mtime("company_profiles.json"))
+    
+    def calendar_sources(self) -> Dict:
+        """Versions of everything the formatted calendar is built from"""
+        return {
+            'calendar': list(self._listings_version()),
+            'lockups': self._source_mtime("lockups.json"),
+        }
+    
+    def _read_listings(self) -> List[Dict]:
+        """Listings from the store (or the scraper's JSON); only read when the snapshot is rebuilt"""
+        if self.storage:
+            listings = self.storage.get_listings()
+            source = str(self.storage.db_path)
+        else:
+            calendar_path = self.data_dir / "ipo_calendar.json"
+            if not calendar_path.exists():
+                logger.warning("No calendar data file", extra={'path': str(calendar_path)})
+                return []
             with open(calendar_path, 'r') as f:
                 data = json.load(f)
-            
-            # Return the actual listings
             listings = data.get('listings', [])
-            print(f"✅ Loaded {len(listings)} IPOs from {calendar_path.name}")
-            return listings
-        else:
-            print(f"❌ No data file at {calendar_path}")
-            return []
+            source = calendar_path.name
+        
+        logger.info("Loaded IPOs", extra={'count': len(listings), 'source': source})
+        return listings
+    
+    def get_ipo_calendar(self, filters: Dict = None) -> List[Dict]:
+        """Get IPO calendar - REAL DATA ONLY"""
+        # Parsed from the shared snapshot, which is rebuilt only when the scraper rewrites the data
+        return self.calendar_snapshot.listings()
+    
+    def query_listings(self, status: Optional[str] = None, since: Optional[str] = None,
+                       until: Optional[str] = None, cik: Optional[str] = None,
+                       sector: Optional[str] = None) -> List[Dict]:
+        """Calendar listings filtered by status, expected date range, CIK and sector"""
+        if self.storage:
+            return self.storage.get_listings(status=status, since=since, until=until, cik=cik, sector=sector)
+        
+        sectors = {p.get('ticker'): p.get('sector') for p in self.get_company_profiles()} if sector else {}
+        listings = []
+        for ipo in self.get_ipo_calendar():
+            expected = iso_date(ipo.get('expected_date'))
+            if (since or until) and not expected:
+                continue
+            if (not status or ipo.get('status') == status) \
+                    and (not since or expected >= since) and (not until or expected <= until) \
+                    and (not cik or ipo.get('cik') == cik.zfill(10)) \
+                    and (not sector or sectors.get(ipo.get('ticker')) == sector):
+                listings.append(ipo)
+        return listings
     
     def get_company_profile(self, ticker: str) -> Dict:
-        """Get company from IPO list"""
-        ipos = self.get_ipo_calendar()
-        for ipo in ipos:
-            if ipo.get('ticker') == ticker:
-                return ipo
-        return {}
+        """Get company from IPO list (a fresh dict, safe for callers to modify)"""
+        return self.calendar_snapshot.listing(ticker) or {}
     
     def get_company_documents(self, ticker: str) -> List[Dict]:
-        """Get documents if they exist"""
-        docs_dir = self.data_dir / "ipo_filings" / ticker
-        if docs_dir.exists():
-            return [
-                {"filename": f.name, "path": str(f)}
-                for f in docs_dir.glob("*.html")
-            ]
-        return []
-    
-    def get_watchlist(self) -> List[str]:
+        """Get documents from the filing manifest, newest first"""
+        self.manifest.refresh()
+        return self.manifest.for_ticker(ticker)
+    
+    def open_document(self, filing_id: str) -> Optional[Iterator[bytes]]:
+        """Stream a filing's bytes, decompressing from the filing store if needed"""
+        filing = self.manifest.get(filing_id)
+        if not filing:
+            return None
+        return self.store.iter_chunks(filing['path'])
+    
+    def get_filings(self, ticker: Optional[str] = None, form_type: Optional[str] = None,
+                    since: Optional[str] = None, until: Optional[str] = None,
+                    sort: str = "date_desc") -> List[Dict]:
+        """Filter and sort filings by form/date"""
+        self.manifest.refresh()
+        return self.manifest.query(ticker, form_type, since, until, sort)
+    
+    def get_lockup(self, ticker: str) -> Optional[Dict]:
+        """Extracted lock-up metadata with citations"""
+        metadata = self.lockups.get_lockup(ticker)
+        return metadata.model_dump(mode='json') if metadata else None
+    
+    def get_lockup_periods(self) -> Dict[str, str]:
+        """ticker -> extracted lock-up period for display"""
+        return self.lockups.get_periods()
+    
+    def resolve_cik(self, ticker: Optional[str], company: Optional[str]) -> Dict:
+        """Scored CIK candidates for a ticker/company"""
+        return self.cik_resolver.resolve(ticker, company)
+    
+    def resolve_calendar_ciks(self) -> Dict[str, Dict]:
+        """Resolve CIKs for every listing in the calendar"""
+        return self.cik_resolver.resolve_many(self.get_ipo_calendar())
+    
+    def get_watchlist(self, name: str = "default") -> List[str]:
         """Get watchlist"""
-        return []
+        if self.storage:
+            return self.storage.get_watchlist(name)
+        path = self.data_dir / "watchlists" / f"{name}.json"
+        if not path.exists():
+            return []
+        with open(path, 'r') as f:
+            return json.load(f)
     
-    def update_watchlist(self, ticker: str, action: str) -> bool:
+    def update_watchlist(self, ticker: str, action: str, name: str = "default") -> bool:
         """Update watchlist"""
+        if action not in ("add", "remove"):
+            return False
+        if self.storage:
+            if action == "add":
+                return self.storage.add_to_watchlist([ticker], name) > 0
+            return self.storage.remove_from_watchlist(ticker, name)
+        
+        tickers = self.get_watchlist(name)
+        if action == "add" and ticker not in tickers:
+            tickers.append(ticker)
+        elif action == "remove" and ticker in tickers:
+            tickers.remove(ticker)
+        else:
+            return False
+        path = self.data_dir / "watchlists" / f"{name}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(tickers, f, indent=2)
         return True
     
-    def get_companies_tree(self) -> Dict:
-        """Get companies by sector"""
-        ipos = self.get_ipo_calendar()
-        tree = {"Technology": []}
+    def get_alerts(self, ticker: Optional[str] = None, unread_only: bool = False) -> List[Dict]:
+        """Watchlist alerts, newest first"""
+        if self.storage:
+            return self.storage.get_alerts(ticker, unread_only)
+        path = self.data_dir / "watchlists" / "alerts.json"
+        if not path.exists():
+            return []
+        with open(path, 'r') as f:
+            alerts = json.load(f)
+        alerts = [a for a in alerts if (not ticker or a.get('ticker') == ticker)
+                  and (not unread_only or not a.get('read'))]
+        return sorted(alerts, key=lambda a: a.get('timestamp', ''), reverse=True)
+    
+    def get_company_profiles(self, sector: Optional[str] = None) -> List[Dict]:
+        """Get sector/industry profiles"""
+        if self.storage:
+            return self.storage.get_profiles(sector)
+        profiles_path = self.data_dir / "company_profiles.json"
+        if not profiles_path.exists():
+            return []
+        with open(profiles_path, 'r') as f:
+            profiles = json.load(f)
+        return [p for p in profiles if p.get('sector') == sector] if sector else profiles
+    
+    def _sync_tree(self):
+        """Apply calendar, profile and filing changes to the tree, one company at a time"""
+        sources = {
+            'calendar': self._listings_version(),
+            'profiles': self._profiles_version(),
+        }
         
-        for ipo in ipos:
-            tree["Technology"].append({
-                'ticker': ipo.get('ticker'),
-                'company': ipo.get('company'),
-                'filing_count': 0
-            })
+        if sources != self._tree_sources:
+            listings = {ipo['ticker']: ipo for ipo in self.get_ipo_calendar() if ipo.get('ticker')}
+            profiles = {p['ticker']: p for p in self.get_company_profiles() if p.get('ticker')}
+            
+            for ticker in set(self._tree_listings) | set(self._tree_profiles):
+                if ticker not in listings and ticker not in profiles:
+                    self.tree.remove(ticker)
+            
+            for ticker in set(listings) | set(profiles):
+                listing = listings.get(ticker)
+                profile = profiles.get(ticker)
+                if listing != self._tree_listings.get(ticker) or profile != self._tree_profiles.get(ticker):
+                    self.tree.upsert(ticker, listing, profile, self.manifest.count(ticker))
+            
+            self._tree_listings = listings
+            self._tree_profiles = profiles
+            self._tree_sources = sources
         
-        return tree
+        if self.manifest.refresh():
+            for ticker in self.tree.leaves:
+                self.tree.set_filing_count(ticker, self.manifest.count(ticker))
+    
+    def get_companies_tree(self) -> Dict:
+        """Get companies by sector"""
+        self._sync_tree()
+        return self.tree.full()
+    
+    def get_companies_tree_summary(self) -> List[Dict]:
+        """Sector nodes with company/filing counts, children not expanded"""
+        self._sync_tree()
+        return self.tree.summary()
+    
+    def expand_companies_tree(self, sector: str, industry: Optional[str] = None,
+                              offset: int = 0, limit: int = 100) -> Dict:
+        """One page of companies under a sector node"""
+        self._sync_tree()
+        return self.tree.expand(sector, industry, offset, limit)
+
+
+@lru_cache(maxsize=None)
+def get_data_service() -> DataService:
+    """The one DataService per process, shared by every router and job handler"""
+    return DataService()
@@ -0,0 +1,178 @@
+"""
+Document Service - serve filings in byte ranges and citation chunks
+"""
+
+import json
+import mmap
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from backend.core.metrics import record_cache
+from backend.services.filing_manifest import document_key
+from backend.services.filing_store import FilingStore
+
+# Each cached mapping holds a file descriptor; least recently used ones are dropped past this
+MAX_MAPS = 64
+
+
+class DocumentService:
+    """mmap-backed filing reads so a viewer never has to load a whole document"""
+
+    def __init__(self):
+        self.filings_dir = Path("data/ipo_filings")
+        self.indices_dir = Path("data/indices")
+        self.store = FilingStore()
+
+        # path -> (mtime, size, mmap), least recently used first
+        self._maps: "OrderedDict[str, Tuple[float, int, Optional[mmap.mmap]]]" = OrderedDict()
+        # document key -> (mtime, offsets table)
+        self._offsets: Dict[str, Tuple[float, Dict]] = {}
+
+    def resolve(self, ticker: str, filename: str) -> Optional[Path]:
+        """Path to a filing, refusing anything outside the filings directory"""
+        root = self.filings_dir.resolve()
+        path = (self.filings_dir / ticker / filename).resolve()
+        if root not in path.parents:
+            return None
+        if not path.is_file() and path not in self.store:
+            return None
+        return path
+
+    def cited_path(self, path: Path) -> Path:
+        """Citation-processed copy of a filing if one exists"""
+        if path.stem.endswith('_cited'):
+            return path
+        cited = path.with_name(f"{path.stem}_cited{path.suffix}")
+        return cited if cited.exists() else path
+
+    def is_compressed(self, path: Path) -> bool:
+        """Filing only exists in the compressed filing store"""
+        return not path.is_file()
+
+    def _map(self, path: Path) -> Tuple[int, Optional[mmap.mmap]]:
+        """Read-only mapping of a file, remapped when the file changes.
+
+        Writers replace files (write a temp file, then rename) rather than truncating them, so
+        a mapping stays valid for the old contents. Old and evicted mappings are never closed
+        here: a running iter_range may still hold one, and it is unmapped once released.
+        """
+        key = str(path)
+        stat = path.stat()
+        cached = self._maps.get(key)
+        hit = bool(cached and cached[0] == stat.st_mtime and cached[1] == stat.st_size)
+        record_cache('document_mmap', hit)
+        if hit:
+            self._maps.move_to_end(key)
+            return cached[1], cached[2]
+
+        mapped = None
+        if stat.st_size:
+            # mmap cannot map empty files
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._maps[key] = (stat.st_mtime, stat.st_size, mapped)
+        self._maps.move_to_end(key)
+        while len(self._maps) > MAX_MAPS:
+            self._maps.popitem(last=False)
+        return stat.st_size, mapped
+
+    def size(self, path: Path) -> int:
+        """File size in bytes"""
+        return self._map(path)[0]
+
+    def read(self, path: Path, start: int, end: int) -> bytes:
+        """Bytes [start, end) of a file straight from the page cache"""
+        size, mapped = self._map(path)
+        if mapped is None:
+            return b""
+        return mapped[max(0, start):min(end, size)]
+
+    def iter_range(self, path: Path, start: int, end: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Stream bytes [start, end) in chunks"""
+        size, mapped = self._map(path)
+        if mapped is None:
+            return
+        end = min(end, size)
+        for pos in range(max(0, start), end, chunk_size):
+            yield mapped[pos:min(pos + chunk_size, end)]
+
+    def get_offsets(self, document: str) -> Optional[Dict]:
+        """Citation byte-offset table written by CitationService.process_document.
+
+        document is the filing's document_key, "<company dir>/<stem>".
+        """
+        root = self.indices_dir.resolve()
+        offsets_path = self.indices_dir / f"{document}_offsets.json"
+        if root not in offsets_path.resolve().parents or not offsets_path.exists():
+            return None
+
+        mtime = offsets_path.stat().st_mtime
+        cached = self._offsets.get(document)
+        record_cache('citation_offsets', bool(cached and cached[0] == mtime))
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with open(offsets_path, 'r', encoding='utf-8') as f:
+            table = json.load(f)
+
+        self._offsets[document] = (mtime, table)
+        return table
+
+    def citation_chunk(self, ticker: str, filename: str, first: int, last: int) -> Optional[Dict]:
+        """HTML for citations first..last (inclusive, by position in the index)"""
+        path = self.resolve(ticker, filename)
+        if path is None:
+            return None
+
+        table = self.get_offsets(document_key(path))
+        if table is None or not table['ids']:
+            return None
+
+        total = len(table['ids'])
+        first = max(0, first)
+        last = min(last, total - 1)
+        if first > last:
+            return {"html": b"", "first": first, "last": last, "total": total}
+
+        # Starts are monotonic; ends are not (a table can close after its rows)
+        start = table['starts'][first]
+        end = max(table['ends'][first:last + 1])
+
+        cited = self.cited_path(path)
+        return {
+            "html": self.read(cited, start, end),
+            "first": first,
+            "last": last,
+            "total": total,
+            "ids": table['ids'][first:last + 1],
+            "byte_range": (start, end)
+        }
+
+    @staticmethod
+    def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+        """Parse a single 'bytes=' Range header into [start, end); None if unsatisfiable"""
+        unit, _, spec = header.partition('=')
+        if unit.strip().lower() != 'bytes' or not spec:
+            return None
+
+        # Multiple ranges are answered with the first one only
+        first_spec = spec.split(',')[0].strip()
+        start_text, _, end_text = first_spec.partition('-')
+
+        try:
+            if not start_text:
+                # Suffix range: last N bytes
+                length = int(end_text)
+                if length <= 0:
+                    return None
+                return max(0, size - length), size
+            start = int(start_text)
+            end = int(end_text) + 1 if end_text else size
+        except ValueError:
+            return None
+
+        if start >= size or end <= start:
+            return None
+        return start, min(end, size)
@@ -0,0 +1,310 @@
+"""
+Filing Manifest - parsed metadata for every downloaded filing
+"""
+
+import hashlib
+import json
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from backend.services.filing_store import FilingStore
+
+# 8-K_2024-12-18_11.html, F-6EF_2020-12-03_2.html, S-1_20250221.html
+FILENAME_PATTERN = re.compile(
+    r'^(?P<form>.+?)_(?P<date>\d{4}-\d{2}-\d{2}|\d{8})(?:_(?P<seq>\d+))?$'
+)
+
+# Derived files written next to the originals by CitationService
+DERIVED_SUFFIXES = ('_cited',)
+
+MANIFEST_VERSION = 2
+
+
+def document_key(path) -> str:
+    """"<company dir>/<stem>": the name citation indices are stored under.
+
+    Bare filenames repeat across companies (several S-1_20240601.html), so the stem alone is not unique.
+    """
+    path = Path(path)
+    stem = path.stem
+    for suffix in DERIVED_SUFFIXES:
+        if stem.endswith(suffix):
+            stem = stem[:-len(suffix)]
+    return f"{path.parent.name}/{stem}"
+
+
+def parse_filing_name(filename: str) -> Dict:
+    """Pull form type, filing date and sequence out of a filing filename"""
+    stem = Path(filename).stem
+    match = FILENAME_PATTERN.match(stem)
+    if not match:
+        return {'form_type': 'Unknown', 'filing_date': None, 'sequence': None}
+
+    form = match.group('form')
+    # Amendments are saved as "SC 13G-A" because "/" is not allowed in filenames
+    if form.endswith('-A'):
+        form = form[:-2] + '/A'
+
+    date = match.group('date')
+    if '-' not in date:
+        date = f"{date[:4]}-{date[4:6]}-{date[6:]}"
+
+    seq = match.group('seq')
+    return {
+        'form_type': form,
+        'filing_date': date,
+        'sequence': int(seq) if seq else None
+    }
+
+
+def normalize_company(name: str) -> str:
+    """Loose company key: 'Caris Life Sciences, Inc.' == 'Caris Life Sciences, Inc'"""
+    return re.sub(r'[^a-z0-9]+', ' ', name.lower()).strip()
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FilingManifest:
+    """Persistent, incrementally refreshed index of data/ipo_filings"""
+
+    def __init__(self, data_dir: Path, ticker_for: Optional[Callable[[str], Optional[str]]] = None,
+                 scan_interval: float = 30.0, store: Optional[FilingStore] = None):
+        self.data_dir = Path(data_dir)
+        self.filings_dir = self.data_dir / "ipo_filings"
+        self.manifest_path = self.data_dir / "filing_manifest.json"
+        self.indices_dir = self.data_dir / "indices"
+        self.ticker_for = ticker_for or (lambda name: None)
+        self.scan_interval = scan_interval
+        self.store = store
+
+        # "DIR/filename" -> entry
+        self.entries: Dict[str, Dict] = {}
+        # ticker -> entries sorted newest first
+        self._by_ticker: Dict[str, List[Dict]] = {}
+        self._last_scan = 0.0
+
+        self._load()
+        self.refresh(force=True)
+
+    def _load(self):
+        """Load the persisted manifest"""
+        if not self.manifest_path.exists():
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if data.get('version') == MANIFEST_VERSION:
+            self.entries = data.get('filings', {})
+
+    def _save(self):
+        """Persist the manifest atomically"""
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': MANIFEST_VERSION,
+                'updated_at': datetime.now(timezone.utc).isoformat(),
+                'filings': self.entries
+            }, f, indent=2)
+        tmp_path.replace(self.manifest_path)
+
+    def _load_ciks(self) -> Dict[str, str]:
+        """ticker -> CIK from cik_mappings.json"""
+        path = self.data_dir / "cik_mappings.json"
+        if not path.exists():
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            mappings = json.load(f)
+        return {
+            m['ticker']: m['cik']
+            for m in mappings.values()
+            if isinstance(m, dict) and m.get('ticker') and m.get('cik')
+        }
+
+    def _load_sources(self) -> Dict[tuple, str]:
+        """(ticker, form, date) -> EDGAR URL from sec_download_summary.json"""
+        path = self.data_dir / "sec_download_summary.json"
+        if not path.exists():
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            summary = json.load(f)
+        return {
+            (d.get('ticker'), d.get('type'), d.get('date')): d.get('url')
+            for d in summary.get('downloads', [])
+        }
+
+    def _processing_state(self, path: Path) -> str:
+        """raw -> cited (processed copy) -> indexed (citation offsets written)"""
+        if (self.indices_dir / f"{document_key(path)}_offsets.json").exists():
+            return 'indexed'
+        if path.with_name(f"{path.stem}_cited{path.suffix}").exists():
+            return 'cited'
+        return 'raw'
+
+    @staticmethod
+    def _make_entry(key: str, ticker: str, path: Path, size: int, mtime: Optional[float], sha256: str,
+                    storage: str, state: str, ciks: Dict[str, str], sources: Dict[tuple, str]) -> Dict:
+        meta = parse_filing_name(path.name)
+        return {
+            'id': key,
+            'ticker': ticker,
+            'cik': ciks.get(ticker),
+            'company_dir': key.split('/', 1)[0],
+            'filename': path.name,
+            'path': path.as_posix(),
+            'form_type': meta['form_type'],
+            'filing_date': meta['filing_date'],
+            'sequence': meta['sequence'],
+            'size': size,
+            'mtime': mtime,
+            'sha256': sha256,
+            'source_url': sources.get((ticker, meta['form_type'], meta['filing_date'])),
+            'storage': storage,
+            'state': state
+        }
+
+    def refresh(self, force: bool = False) -> bool:
+        """Re-scan the filings directory and blob store; only new or changed files are hashed"""
+        now = time.monotonic()
+        if not force and now - self._last_scan < self.scan_interval:
+            return False
+        self._last_scan = now
+
+        changed = False
+        seen = set()
+        ciks = None
+        sources = None
+
+        if self.filings_dir.exists():
+            for company_dir in sorted(p for p in self.filings_dir.iterdir() if p.is_dir()):
+                ticker = self.ticker_for(company_dir.name) or company_dir.name
+
+                for path in company_dir.glob("*.html"):
+                    if path.stem.endswith(DERIVED_SUFFIXES):
+                        continue
+
+                    key = f"{company_dir.name}/{path.name}"
+                    seen.add(key)
+                    stat = path.stat()
+                    entry = self.entries.get(key)
+                    state = self._processing_state(path)
+
+                    if (entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime
+                            and entry.get('storage') == 'file'):
+                        if entry['state'] != state or entry['ticker'] != ticker:
+                            entry['state'] = state
+                            entry['ticker'] = ticker
+                            changed = True
+                        continue
+
+                    if ciks is None:
+                        ciks = self._load_ciks()
+                        sources = self._load_sources()
+
+                    self.entries[key] = self._make_entry(
+                        key, ticker, path, stat.st_size, stat.st_mtime, _file_hash(path),
+                        'file', state, ciks, sources
+                    )
+                    changed = True
+
+        # Filings that only exist compressed in the blob store
+        if self.store is not None:
+            dir_tickers: Dict[str, str] = {}
+            for key in self.store.keys():
+                if key in seen:
+                    continue
+                seen.add(key)
+                ref = self.store.get_ref(key)
+                entry = self.entries.get(key)
+                if entry and entry['sha256'] == ref['sha256'] and entry['storage'] == 'compressed':
+                    continue
+
+                company_dir = key.split('/', 1)[0]
+                if company_dir not in dir_tickers:
+                    dir_tickers[company_dir] = self.ticker_for(company_dir) or company_dir
+                if ciks is None:
+                    ciks = self._load_ciks()
+                    sources = self._load_sources()
+
+                path = self.filings_dir / key
+                self.entries[key] = self._make_entry(
+                    key, dir_tickers[company_dir], path, ref['size'], None, ref['sha256'],
+                    'compressed', self._processing_state(path), ciks, sources
+                )
+                self.entries[key]['stored_size'] = ref['stored_size']
+                changed = True
+
+        for key in set(self.entries) - seen:
+            del self.entries[key]
+            changed = True
+
+        if changed or not self._by_ticker:
+            self._rebuild_views()
+        if changed:
+            self._save()
+
+        return changed
+
+    def _rebuild_views(self):
+        """Group entries by ticker, newest filing first"""
+        by_ticker: Dict[str, List[Dict]] = {}
+        for entry in self.entries.values():
+            by_ticker.setdefault(entry['ticker'], []).append(entry)
+        for entries in by_ticker.values():
+            entries.sort(key=lambda e: (e['filing_date'] or '', e['sequence'] or 0), reverse=True)
+        self._by_ticker = by_ticker
+
+    def set_state(self, filing_id: str, state: str):
+        """Record a processing-state change made outside the scanner"""
+        entry = self.entries.get(filing_id)
+        if entry and entry['state'] != state:
+            entry['state'] = state
+            self._save()
+
+    def get(self, filing_id: str) -> Optional[Dict]:
+        """Look up a single filing by id ("DIR/filename")"""
+        return self.entries.get(filing_id)
+
+    def for_ticker(self, ticker: str) -> List[Dict]:
+        """All filings for a ticker, newest first"""
+        return self._by_ticker.get(ticker, [])
+
+    def count(self, ticker: str) -> int:
+        """Number of filings for a ticker"""
+        return len(self._by_ticker.get(ticker, []))
+
+    def query(self, ticker: Optional[str] = None, form_type: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None,
+              sort: str = "date_desc") -> List[Dict]:
+        """Filter and sort filings without touching the filesystem"""
+        if ticker:
+            filings = self.for_ticker(ticker)
+        else:
+            filings = [e for entries in self._by_ticker.values() for e in entries]
+
+        if form_type:
+            wanted = form_type.upper()
+            filings = [f for f in filings if f['form_type'].upper() == wanted]
+        if since:
+            filings = [f for f in filings if (f['filing_date'] or '') >= since]
+        if until:
+            filings = [f for f in filings if f['filing_date'] and f['filing_date'] <= until]
+
+        if sort == "date_asc":
+            filings = sorted(filings, key=lambda e: (e['filing_date'] or '', e['sequence'] or 0))
+        elif sort == "date_desc" and not ticker:
+            filings = sorted(filings, key=lambda e: (e['filing_date'] or '', e['sequence'] or 0), reverse=True)
+        elif sort == "form":
+            filings = sorted(filings, key=lambda e: (e['form_type'], e['filing_date'] or ''))
+
+        return filings
@@ -0,0 +1,291 @@
+"""
+Filing Store - content-addressed, dictionary-compressed filing blobs
+"""
+
+import hashlib
+import io
+import json
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Union
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# zstd dictionaries are trained up to this size; zlib only uses the last 32 KB
+DICTIONARY_SIZE = 112 * 1024
+ZLIB_DICTIONARY_SIZE = 32 * 1024
+SAMPLE_SIZE = 16 * 1024
+
+ZSTD_LEVEL = 19
+ZLIB_LEVEL = 9
+
+READ_CHUNK = 64 * 1024
+
+
+class _ZlibStreamReader(io.RawIOBase):
+    """Incremental zlib decompression with a preset dictionary"""
+
+    def __init__(self, source: BinaryIO, zdict: Optional[bytes]):
+        self.source = source
+        self.decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+        self.buffer = b''
+        self.eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        while not self.buffer and not self.eof:
+            chunk = self.source.read(READ_CHUNK)
+            if chunk:
+                self.buffer = self.decompressor.decompress(chunk)
+            else:
+                self.buffer = self.decompressor.flush()
+                self.eof = True
+
+        size = min(len(target), len(self.buffer))
+        target[:size] = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return size
+
+    def close(self):
+        self.source.close()
+        super().close()
+
+
+class FilingStore:
+    """Store filings compressed once per unique content, readable as streams"""
+
+    def __init__(self, data_dir: Union[str, Path] = "data"):
+        self.data_dir = Path(data_dir)
+        self.filings_dir = self.data_dir / "ipo_filings"
+        self.root = self.data_dir / "filing_store"
+        self.objects_dir = self.root / "objects"
+        self.dictionaries_dir = self.root / "dictionaries"
+        self.refs_path = self.root / "refs.json"
+
+        self.codec = "zstd" if zstandard is not None else "zlib"
+
+        # "DIR/filename" -> {sha256, size, stored_size, codec, dictionary}
+        self.refs: Dict[str, Dict] = {}
+        # sha256 -> ref, for content dedup
+        self._objects: Dict[str, Dict] = {}
+        self._refs_mtime: Optional[float] = None
+        self._dictionaries: Dict[str, bytes] = {}
+        self.active_dictionary: Optional[str] = None
+
+        self._load_refs()
+
+    # --- Refs ----------------------------------------------------------------
+
+    def _load_refs(self):
+        if not self.refs_path.exists():
+            return
+        mtime = self.refs_path.stat().st_mtime
+        if mtime == self._refs_mtime:
+            return
+        with open(self.refs_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.refs = data.get('refs', {})
+        self._objects = {r['sha256']: r for r in self.refs.values()}
+        self.active_dictionary = data.get('active_dictionary')
+        self._refs_mtime = mtime
+
+    def _save_refs(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.refs_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'updated_at': datetime.now(timezone.utc).isoformat(),
+                'active_dictionary': self.active_dictionary,
+                'refs': self.refs
+            }, f, indent=2)
+        tmp_path.replace(self.refs_path)
+        self._refs_mtime = self.refs_path.stat().st_mtime
+
+    def key_for(self, path: Union[str, Path]) -> str:
+        """'data/ipo_filings/AIRO/S-1.html' (or 'AIRO/S-1.html') -> 'AIRO/S-1.html'"""
+        path = Path(path)
+        try:
+            return path.resolve().relative_to(self.filings_dir.resolve()).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def __contains__(self, path: Union[str, Path]) -> bool:
+        self._load_refs()
+        return self.key_for(path) in self.refs
+
+    def keys(self) -> List[str]:
+        self._load_refs()
+        return list(self.refs)
+
+    def get_ref(self, path: Union[str, Path]) -> Optional[Dict]:
+        self._load_refs()
+        return self.refs.get(self.key_for(path))
+
+    # --- Dictionaries ----------------------------------------------------------
+
+    def _dictionary(self, dictionary_id: Optional[str]) -> Optional[bytes]:
+        if not dictionary_id:
+            return None
+        if dictionary_id not in self._dictionaries:
+            self._dictionaries[dictionary_id] = (self.dictionaries_dir / f"{dictionary_id}.dict").read_bytes()
+        return self._dictionaries[dictionary_id]
+
+    @staticmethod
+    def _samples(documents: List[bytes]) -> List[bytes]:
+        """Split documents into fixed-size samples so a few large filings still train well"""
+        samples = []
+        for doc in documents:
+            for start in range(0, len(doc), SAMPLE_SIZE):
+                samples.append(doc[start:start + SAMPLE_SIZE])
+        return samples
+
+    def train_dictionary(self, documents: List[bytes]) -> str:
+        """Train a dictionary on SEC HTML and make it the one used for new blobs"""
+        samples = self._samples(documents)
+        if not samples:
+            raise ValueError("No samples to train a dictionary on")
+
+        if self.codec == "zstd":
+            dictionary = zstandard.train_dictionary(DICTIONARY_SIZE, samples).as_bytes()
+        else:
+            # zlib has no trainer: keep the most widely shared sample chunks
+            counts: Dict[bytes, int] = {}
+            for sample in samples:
+                for start in range(0, len(sample) - 256, 256):
+                    chunk = sample[start:start + 256]
+                    counts[chunk] = counts.get(chunk, 0) + 1
+            common = sorted((c for c in counts if counts[c] > 1), key=counts.get)
+            # zlib favours matches near the end of the dictionary, so most common goes last
+            dictionary = b''.join(common)[-ZLIB_DICTIONARY_SIZE:]
+
+        dictionary_id = f"{self.codec}-{hashlib.sha256(dictionary).hexdigest()[:12]}"
+        self.dictionaries_dir.mkdir(parents=True, exist_ok=True)
+        (self.dictionaries_dir / f"{dictionary_id}.dict").write_bytes(dictionary)
+
+        self._dictionaries[dictionary_id] = dictionary
+        self.active_dictionary = dictionary_id
+        self._save_refs()
+        return dictionary_id
+
+    # --- Write -------------------------------------------------------------------
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def compress(self, data: bytes, dictionary_id: Optional[str] = None) -> bytes:
+        dictionary = self._dictionary(dictionary_id)
+        if self.codec == "zstd":
+            dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data).compress(data)
+
+        compressor = (zlib.compressobj(ZLIB_LEVEL, zdict=dictionary) if dictionary
+                      else zlib.compressobj(ZLIB_LEVEL))
+        return compressor.compress(data) + compressor.flush()
+
+    def put(self, path: Union[str, Path], data: bytes, save: bool = True) -> Dict:
+        """Store a filing; identical content is only compressed and written once"""
+        self._load_refs()
+        digest = hashlib.sha256(data).hexdigest()
+        key = self.key_for(path)
+
+        existing = self._objects.get(digest)
+        object_path = self._object_path(digest)
+
+        if existing and object_path.exists():
+            ref = dict(existing)
+        else:
+            blob = self.compress(data, self.active_dictionary)
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = object_path.with_suffix('.tmp')
+            tmp_path.write_bytes(blob)
+            tmp_path.replace(object_path)
+            ref = {
+                'sha256': digest,
+                'size': len(data),
+                'stored_size': len(blob),
+                'codec': self.codec,
+                'dictionary': self.active_dictionary,
+            }
+
+        self.refs[key] = ref
+        self._objects[digest] = ref
+        if save:
+            self._save_refs()
+        return ref
+
+    def put_file(self, path: Union[str, Path], save: bool = True) -> Dict:
+        return self.put(path, Path(path).read_bytes(), save=save)
+
+    def import_filings(self, remove_originals: bool = False) -> Dict[str, int]:
+        """Store every filing under data/ipo_filings"""
+        stored = 0
+        for path in sorted(self.filings_dir.rglob("*.html")):
+            if path.stem.endswith('_cited'):
+                continue
+            self.put_file(path, save=False)
+            stored += 1
+            if remove_originals:
+                path.unlink()
+        self._save_refs()
+        return {'stored': stored, 'objects': len({r['sha256'] for r in self.refs.values()})}
+
+    # --- Read --------------------------------------------------------------------
+
+    def open(self, path: Union[str, Path]) -> BinaryIO:
+        """Binary stream of a filing: the plain file if present, else the decompressed blob"""
+        path = Path(path)
+        for plain in (path, self.filings_dir / path):
+            if plain.is_file():
+                return open(plain, 'rb')
+
+        ref = self.get_ref(path)
+        if ref is None:
+            raise FileNotFoundError(str(path))
+
+        source = open(self._object_path(ref['sha256']), 'rb')
+        dictionary = self._dictionary(ref.get('dictionary'))
+        if ref['codec'] == "zstd":
+            if zstandard is None:
+                source.close()
+                raise RuntimeError("zstandard is required to read this filing")
+            dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            return zstandard.ZstdDecompressor(dict_data=dict_data).stream_reader(source, closefd=True)
+        return io.BufferedReader(_ZlibStreamReader(source, dictionary), READ_CHUNK)
+
+    def iter_chunks(self, path: Union[str, Path], chunk_size: int = READ_CHUNK) -> Iterator[bytes]:
+        """Stream a filing in chunks without holding it all in memory"""
+        with self.open(path) as stream:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def read_bytes(self, path: Union[str, Path]) -> bytes:
+        with self.open(path) as stream:
+            return stream.read()
+
+    def read_text(self, path: Union[str, Path], errors: str = 'replace') -> str:
+        return self.read_bytes(path).decode('utf-8', errors=errors)
+
+    def stats(self) -> Dict:
+        """Raw vs stored size across all refs and unique objects"""
+        self._load_refs()
+        objects = {r['sha256']: r for r in self.refs.values()}
+        raw = sum(r['size'] for r in self.refs.values())
+        stored = sum(r['stored_size'] for r in objects.values())
+        return {
+            'filings': len(self.refs),
+            'objects': len(objects),
+            'raw_bytes': raw,
+            'stored_bytes': stored,
+            'ratio': round(raw / stored, 2) if stored else 0.0,
+            'codec': self.codec,
+            'dictionary': self.active_dictionary,
+        }
@@ -0,0 +1,66 @@
+"""
+Filing text helpers - fast, regex-based HTML to text for SEC filings
+"""
+
+import html
+import re
+from typing import Iterator, Optional, Tuple
+
+STRIP_PATTERN = re.compile(r'<(script|style|head)\b.*?</\1\s*>', re.I | re.S)
+BLOCK_PATTERN = re.compile(r'<(?:/p|/div|br\s*/?|/tr|/h[1-6]|/li|/table)\b[^>]*>', re.I)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+SPACE_PATTERN = re.compile(r'\s+')
+
+PAGE_FOOTER_PATTERN = re.compile(r'^\d{1,3}$')
+HEADING_PATTERN = re.compile(r"^[A-Z][A-Za-z0-9,'&\-’ ]{3,78}$")
+
+
+def html_text(raw_html: str) -> str:
+    """Plain text of an HTML fragment, e.g. one citation's element"""
+    return SPACE_PATTERN.sub(' ', html.unescape(TAG_PATTERN.sub(' ', raw_html))).strip()
+
+
+def iter_blocks(raw_html: str) -> Iterator[Tuple[str, int, Optional[str]]]:
+    """Yield (text, page, section) for each block-level chunk of a filing"""
+    raw_html = STRIP_PATTERN.sub(' ', raw_html)
+    page = 1
+    section = None
+
+    for raw_block in BLOCK_PATTERN.split(raw_html):
+        text = html_text(raw_block)
+        if not text:
+            continue
+
+        # Page footers are bare numbers; the text after one is on the next page
+        if PAGE_FOOTER_PATTERN.match(text):
+            page = int(text) + 1
+            continue
+
+        if HEADING_PATTERN.match(text) and len(text.split()) <= 10:
+            section = text
+            continue
+
+        yield text, page, section
+
+
+def iter_sections(raw_html: str, max_chars: int = 2000) -> Iterator[Tuple[str, str, int]]:
+    """Yield (title, text, page) chunks grouped under headings, at most max_chars each"""
+    title = None
+    parts = []
+    size = 0
+    first_page = 1
+
+    for text, page, section in iter_blocks(raw_html):
+        if parts and (section != title or size + len(text) > max_chars):
+            yield title or "Untitled", ' '.join(parts), first_page
+            parts = []
+            size = 0
+
+        if not parts:
+            title = section
+            first_page = page
+        parts.append(text)
+        size += len(text) + 1
+
+    if parts:
+        yield title or "Untitled", ' '.join(parts), first_page
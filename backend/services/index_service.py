@@ -0,0 +1,308 @@
+"""
+Index Service - boilerplate stripping and near-duplicate section dedup at ingest
+"""
+
+import hashlib
+import json
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from backend.services.filing_store import FilingStore
+from backend.services.filing_text import iter_sections
+
+INDEX_VERSION = "1.1"
+
+# --- SEC page chrome ------------------------------------------------------
+# EDGAR pages are scraped as run-together text ("SEC homepageMenuClose"), so
+# words inside a phrase may be glued together or split by any whitespace.
+
+SEC_BOILERPLATE_SENTENCES = [
+    "An official website of the United States government",
+    "Here’s how you know",
+    "Official websites use .gov",
+    "A .gov website belongs to an official government organization in the United States.",
+    "Secure .gov websites use HTTPS",
+    "A lock ( Lock A locked padlock ) or https:// means you’ve safely connected to the .gov website.",
+    "Share sensitive information only on official, secure websites.",
+    "Enjoy free public access to millions of informational documents filed by publicly traded "
+    "companies and others in the SEC's Electronic Data Gathering, Analysis, and Retrieval (EDGAR) system.",
+    "Find registration statements, periodic reports, and other forms by typing the name or ticker "
+    "symbol of a company (CIK lookup info) (confidential treatment orders) (SEC correspondence with issuers)",
+    "File Number (must be left blank to search by company name)",
+    "Some specific ways to access filings based on time, type, or other categories.",
+    "Find keywords and phrases in more than 20 years of EDGAR filings, and filter by date, company, "
+    "person, filing category, or location.",
+    "View a listing of real-time filings as they are submitted into the EDGAR system.",
+]
+
+# Navigation labels are only removed when several appear back to back, so a
+# lone "Search" or "Home" inside real filing text survives.
+SEC_NAV_LABELS = [
+    "SEC homepage", "Menu", "Close", "Search SEC.gov & EDGAR", "Search", "Search Filings",
+    "Full Text Search", "Latest Filings", "Mutual Fund Search", "Mutual Funds Search",
+    "Variable Insurance Products Search", "Confidential Treatment Orders Search",
+    "Standard Industrial Classification (SIC) Code List", "SIC Codes", "CIK Lookup",
+    "Public Dissemination Service (PDS)", "EDGAR Public Dissemination Service (PDS) System",
+    "Effectiveness Notices", "EDGAR Application Programming Interfaces", "EDGAR Search Assistance",
+    "Search Assistance", "Submit Filings", "EDGAR Filer Management Portal", "EDGAR Filing Portal",
+    "Online Forms Management Portal", "EDGAR Next", "Forms Index", "Technical Specifications",
+    "Filer Support & Resources", "Data & Research", "SEC & Markets Data", "Taxonomies",
+    "Data Visualizations", "Rules, Enforcement & Guidance", "Securities Topics", "Cybersecurity",
+    "Saving and Investing for Military Personnel", "Market Structure",
+    "Saving and Investing for Teachers", "About", "Mission", "Crypto Task Force", "Commissioners",
+    "Divisions & Offices", "Division & Office Directors", "Advisory Committees",
+    "Budget & Performance", "Reports & Publications", "Commission Votes", "Contact the SEC",
+    "Careers", "Newsroom", "|", "Investors", "Small Businesses", "Whistleblowers", "Home",
+    "Company Search", "Search By", "Submit", "more search options", "Search Match Options",
+    "Starts with", "Contains", "File Number", "State", "Include", "Exclude", "Only",
+    "EDGAR Search Tools", "Ownership Forms 3, 4, and 5.", "Standard Industry Classification.",
+    "View the list of SIC Codes",
+]
+
+US_STATES = [
+    "Alabama", "Alaska", "Arizona", "Arkansas", "California", "Colorado", "Connecticut", "Delaware",
+    "District of Columbia", "Florida", "Georgia", "Hawaii", "Idaho", "Illinois", "Indiana", "Iowa",
+    "Kansas", "Kentucky", "Louisiana", "Maine", "Maryland", "Massachusetts", "Michigan", "Minnesota",
+    "Mississippi", "Missouri", "Montana", "Nebraska", "Nevada", "New Hampshire", "New Jersey",
+    "New Mexico", "New York", "North Carolina", "North Dakota", "Ohio", "Oklahoma", "Oregon",
+    "Pennsylvania", "Rhode Island", "South Carolina", "South Dakota", "Tennessee", "Texas", "Utah",
+    "Vermont", "Virginia", "Washington", "West Virginia", "Wisconsin", "Wyoming",
+]
+
+
+def _phrase_pattern(phrase: str) -> str:
+    """Regex for a phrase whose words may be glued together or split by whitespace"""
+    return r'\s*'.join(re.escape(token) for token in phrase.split())
+
+
+def _alternation(phrases: List[str]) -> str:
+    # Longest first so "Search Filings" wins over "Search"
+    return '|'.join(_phrase_pattern(p) for p in sorted(phrases, key=len, reverse=True))
+
+
+BOILERPLATE_PATTERN = re.compile(r'(?:' + _alternation(SEC_BOILERPLATE_SENTENCES) + r')\s*', re.I)
+NAV_RUN_PATTERN = re.compile(r'(?:(?:' + _alternation(SEC_NAV_LABELS) + r')\s*){3,}')
+STATE_RUN_PATTERN = re.compile(r'(?:(?:' + _alternation(US_STATES) + r')\s*){5,}')
+SPACE_PATTERN = re.compile(r'\s+')
+WORD_PATTERN = re.compile(r'\w+')
+
+# Sections with less text than this left after stripping carry no content
+MIN_SECTION_CHARS = 40
+
+
+# Indexed sections are truncated, so a banner sentence may be cut off mid-way
+_BOILERPLATE_KEYS = [re.sub(r'\W+', '', s.lower()) for s in SEC_BOILERPLATE_SENTENCES]
+
+
+def strip_boilerplate(text: str) -> str:
+    """Remove SEC.gov navigation and banner text from a section"""
+    text = BOILERPLATE_PATTERN.sub(' ', text)
+    text = NAV_RUN_PATTERN.sub(' ', text)
+    text = STATE_RUN_PATTERN.sub(' ', text)
+    text = SPACE_PATTERN.sub(' ', text).strip()
+
+    key = re.sub(r'\W+', '', text.lower())
+    if key and any(sentence.startswith(key) for sentence in _BOILERPLATE_KEYS):
+        return ''
+    return text
+
+
+# --- MinHash / LSH ---------------------------------------------------------
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+class MinHasher:
+    """MinHash signatures over word shingles with banded LSH lookup"""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 5,
+                 threshold: float = 0.85):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+
+        # Deterministic permutations so signatures are stable between runs
+        seed = hashlib.sha256(b"genesis-minhash").digest()
+        self.permutations = []
+        for i in range(num_perm):
+            block = hashlib.sha256(seed + i.to_bytes(4, 'big')).digest()
+            a = int.from_bytes(block[:8], 'big') % MERSENNE_PRIME or 1
+            b = int.from_bytes(block[8:16], 'big') % MERSENNE_PRIME
+            self.permutations.append((a, b))
+
+        # band index -> band hash -> section ids
+        self.buckets: List[Dict[tuple, List[str]]] = [{} for _ in range(bands)]
+        self.shingle_sets: Dict[str, Set[int]] = {}
+
+    def shingles(self, text: str) -> Set[int]:
+        """Hashed word n-grams"""
+        words = WORD_PATTERN.findall(text.lower())
+        size = self.shingle_size
+        if len(words) < size:
+            grams = [' '.join(words)] if words else []
+        else:
+            grams = [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+        return {
+            int.from_bytes(hashlib.blake2b(g.encode('utf-8'), digest_size=4).digest(), 'big')
+            for g in grams
+        }
+
+    def signature(self, shingles: Set[int]) -> List[int]:
+        if not shingles:
+            return [MAX_HASH] * self.num_perm
+        return [
+            min(((a * s + b) % MERSENNE_PRIME) & MAX_HASH for s in shingles)
+            for a, b in self.permutations
+        ]
+
+    @staticmethod
+    def jaccard(left: Set[int], right: Set[int]) -> float:
+        if not left and not right:
+            return 1.0
+        return len(left & right) / len(left | right)
+
+    def query(self, shingles: Set[int], signature: List[int]) -> Optional[tuple]:
+        """(section id, similarity) of the best indexed near-duplicate, if any"""
+        candidates = set()
+        for band in range(self.bands):
+            key = tuple(signature[band * self.rows:(band + 1) * self.rows])
+            candidates.update(self.buckets[band].get(key, ()))
+
+        best = None
+        for candidate in candidates:
+            # LSH only proposes candidates; confirm with the exact shingle overlap
+            similarity = self.jaccard(shingles, self.shingle_sets[candidate])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+        return best
+
+    def add(self, section_id: str, shingles: Set[int], signature: List[int]):
+        self.shingle_sets[section_id] = shingles
+        for band in range(self.bands):
+            key = tuple(signature[band * self.rows:(band + 1) * self.rows])
+            self.buckets[band].setdefault(key, []).append(section_id)
+
+
+class IndexService:
+    """Build data/indexed_documents/document_index.json without chrome or repeats"""
+
+    def __init__(self, index_path: str = "data/indexed_documents/document_index.json"):
+        self.index_path = Path(index_path)
+        self.sections: List[Dict] = []
+        self._by_id: Dict[str, Dict] = {}
+
+    def load(self) -> List[Dict]:
+        """Load the current index"""
+        if self.index_path.exists():
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.sections = json.load(f).get('sections', [])
+        self._by_id = {s['id']: s for s in self.sections}
+        return self.sections
+
+    def ingest(self, sections: Iterable[Dict]) -> Dict[str, int]:
+        """Strip boilerplate, drop empty sections and store near-duplicates as references"""
+        hasher = MinHasher()
+        exact: Dict[str, str] = {}
+        kept: List[Dict] = []
+        stats = {'input': 0, 'empty': 0, 'exact_duplicates': 0, 'near_duplicates': 0,
+                 'unique': 0, 'chars_in': 0, 'chars_out': 0}
+
+        for section in sections:
+            stats['input'] += 1
+            original = section.get('text') or ''
+            stats['chars_in'] += len(original)
+
+            # References from an already-compacted index are carried over as-is
+            if section.get('duplicate_of'):
+                kept.append(section)
+                continue
+
+            text = strip_boilerplate(original)
+            if len(text) < MIN_SECTION_CHARS:
+                stats['empty'] += 1
+                continue
+
+            section = {**section, 'text': text}
+            digest = hashlib.md5(SPACE_PATTERN.sub(' ', text.lower()).encode('utf-8')).hexdigest()
+
+            if digest in exact:
+                section.pop('text')
+                section.update(duplicate_of=exact[digest], similarity=1.0)
+                stats['exact_duplicates'] += 1
+                kept.append(section)
+                continue
+
+            shingles = hasher.shingles(text)
+            signature = hasher.signature(shingles)
+            match = hasher.query(shingles, signature)
+            if match:
+                section.pop('text')
+                section.update(duplicate_of=match[0], similarity=round(match[1], 3))
+                stats['near_duplicates'] += 1
+                kept.append(section)
+                continue
+
+            exact[digest] = section['id']
+            hasher.add(section['id'], shingles, signature)
+            stats['unique'] += 1
+            stats['chars_out'] += len(text)
+            kept.append(section)
+
+        self.sections = kept
+        self._by_id = {s['id']: s for s in kept}
+        return stats
+
+    def get_text(self, section: Dict) -> str:
+        """Section text, following duplicate references"""
+        if 'text' in section:
+            return section['text']
+        canonical = self._by_id.get(section.get('duplicate_of'))
+        return canonical.get('text', '') if canonical else ''
+
+    def save(self):
+        """Write the compacted index"""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'total_sections': len(self.sections),
+                'unique_sections': sum(1 for s in self.sections if 'text' in s),
+                'sections': self.sections
+            }, f, indent=1)
+
+
+def sections_from_filing(path: Path, ticker: str, form_type: str = "Unknown",
+                         filing_date: str = "Unknown", store: Optional[FilingStore] = None) -> List[Dict]:
+    """Split a filing into index sections"""
+    # Plain file if present, otherwise decompressed from the filing store
+    raw_html = (store or FilingStore()).read_text(path)
+    doc_hash = hashlib.md5(path.as_posix().encode('utf-8')).hexdigest()
+    indexed_at = datetime.now().isoformat()
+
+    return [
+        {
+            'id': f"{doc_hash}_{i}",
+            'company': ticker,
+            'ticker': ticker,
+            'document': path.as_posix(),
+            'document_name': path.name,
+            'title': title,
+            'section_type': form_type,
+            'filing_date': filing_date,
+            'indexed_at': indexed_at,
+            'section_index': i,
+            'page': page,
+            'text': text,
+            'relevance': 1.0
+        }
+        for i, (title, text, page) in enumerate(iter_sections(raw_html))
+    ]
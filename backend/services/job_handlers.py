@@ -0,0 +1,88 @@
+"""
+Job Handlers - the work the job queue knows how to run
+"""
+
+import json
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from backend.services.job_queue import job_kind
+
+# Services are built once per worker process, on first use
+_services: Dict[str, object] = {}
+
+
+def _service(name: str, factory: Callable):
+    if name not in _services:
+        _services[name] = factory()
+    return _services[name]
+
+
+def _documents():
+    from backend.services.document_service import DocumentService
+    return _service('documents', DocumentService)
+
+
+def _data():
+    from backend.services.data_service import get_data_service
+    return _service('data', get_data_service)
+
+
+def _filing_path(payload: Dict) -> Path:
+    path = _documents().resolve(str(payload.get('ticker', '')), str(payload.get('filename', '')))
+    if path is None:
+        raise ValueError("Document not found")
+    return path
+
+
+def _filing_version(payload: Dict) -> str:
+    """Re-processing is only new work once the filing itself changed"""
+    path = _filing_path(payload)
+    if path.is_file():
+        stat = path.stat()
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+    # Only in the compressed filing store: its content hash
+    return (_documents().store.get_ref(path) or {}).get('sha256', '')
+
+
+def _listing_version(payload: Dict) -> str:
+    listing = _data().get_company_profile(str(payload.get('ticker', '')))
+    if not listing:
+        raise ValueError("Company not found")
+    return json.dumps(listing, sort_keys=True)
+
+
+@job_kind("process_document", lane="cpu", fingerprint=_filing_version)
+async def process_document(payload: Dict, progress: Callable[[float, Optional[str]], None]) -> Dict:
+    """Citation IDs, offsets and table frames for one filing"""
+    from backend.services.citation_service import CitationService
+
+    path = _filing_path(payload)
+    service = _service('citations', CitationService)
+    result = await service.process_document(str(path), progress=progress)
+    return {
+        'path': result['path'],
+        'total': result['total'],
+        'tables': result['tables'],
+        'revision': {k: v if not isinstance(v, list) else len(v) for k, v in result['revision'].items()},
+    }
+
+
+@job_kind("validate_ipo", lane="io", fingerprint=_listing_version)
+async def validate_ipo(payload: Dict, progress: Callable[[float, Optional[str]], None]) -> Dict:
+    """Cross-check a calendar listing with the configured models"""
+    from backend.services.ai_service import AIService
+
+    listing = _data().get_company_profile(payload['ticker'])
+    progress(0.1, "validating")
+    return await _service('ai', AIService).validate_ipo_data(listing, _data().get_lockup(payload['ticker']))
+
+
+def _prospectus_versions(payload: Dict) -> str:
+    return _data().lockups.source_version()
+
+
+@job_kind("extract_lockups", lane="cpu", fingerprint=_prospectus_versions)
+def extract_lockups(payload: Dict, progress: Callable[[float, Optional[str]], None]) -> Dict:
+    """Lock-up extraction over new or changed prospectuses"""
+    return _data().lockups.extract_new(force=bool(payload.get('force')))
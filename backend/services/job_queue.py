@@ -0,0 +1,318 @@
+"""
+Job Queue - persistent background jobs (SQLite) with CPU and IO worker lanes
+
+CPU-bound kinds (HTML parsing, table extraction) run in a process pool so they never hold
+the API's GIL; IO-bound kinds (model calls) run on threads. Jobs are deduplicated by
+(kind, input hash): submitting the same work again returns the queued, running or
+finished job instead of adding another.
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from backend.core.log import get_logger
+from backend.core.metrics import JOB_DURATION, JOBS
+
+logger = get_logger(__name__)
+
+DEFAULT_DB_PATH = "data/jobs.db"
+LANES = ("cpu", "io")
+
+# Workers also poll, so jobs submitted by other processes are picked up
+POLL_SECONDS = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id              TEXT PRIMARY KEY,
+    kind            TEXT NOT NULL,
+    input_hash      TEXT NOT NULL,
+    lane            TEXT NOT NULL,
+    priority        INTEGER NOT NULL DEFAULT 0,
+    status          TEXT NOT NULL,          -- queued, running, done, failed
+    payload         TEXT NOT NULL,
+    progress        REAL NOT NULL DEFAULT 0,
+    message         TEXT,
+    result          TEXT,
+    error           TEXT,
+    worker          TEXT,
+    created_at      TEXT NOT NULL,
+    started_at      TEXT,
+    finished_at     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (lane, status, priority DESC, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_input ON jobs (kind, input_hash, status);
+"""
+
+@dataclass
+class JobKind:
+    lane: str
+    handler: Callable
+    # Extra input for the dedup hash, e.g. the version of a file the payload names
+    fingerprint: Optional[Callable[[Dict], str]] = None
+
+
+# kind -> JobKind; filled in by backend.services.job_handlers
+JOB_KINDS: Dict[str, JobKind] = {}
+
+
+def job_kind(name: str, lane: str, fingerprint: Optional[Callable[[Dict], str]] = None):
+    """Register a handler(payload, progress) -> result; handlers may be coroutines"""
+    if lane not in LANES:
+        raise ValueError(f"Unknown lane: {lane}")
+
+    def register(handler: Callable) -> Callable:
+        JOB_KINDS[name] = JobKind(lane, handler, fingerprint)
+        return handler
+    return register
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists but belongs to someone else
+        return True
+    return True
+
+
+def input_hash(kind: str, payload: Dict) -> str:
+    """Dedup key; raises ValueError if the kind's fingerprint rejects the payload"""
+    spec = JOB_KINDS[kind]
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    extra = spec.fingerprint(payload) if spec.fingerprint else ''
+    return hashlib.sha256(f"{kind}\0{canonical}\0{extra}".encode('utf-8')).hexdigest()
+
+
+class JobQueue:
+    """The jobs table; safe to share between threads and processes"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        # Set on submit so local workers wake without waiting for the next poll
+        self.submitted = threading.Event()
+        self.conn.executescript(SCHEMA)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA busy_timeout = 10000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _row(row: Optional[sqlite3.Row]) -> Optional[Dict]:
+        if row is None:
+            return None
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def submit(self, kind: str, payload: Dict, priority: int = 0) -> Dict:
+        """Queue a job, or return the existing one for the same (kind, input hash)"""
+        if kind not in JOB_KINDS:
+            raise KeyError(kind)
+        digest = input_hash(kind, payload)
+        # A finished job only answers for the same input if the hash covers the data it read
+        statuses = ('queued', 'running', 'done') if JOB_KINDS[kind].fingerprint else ('queued', 'running')
+        with self.transaction() as conn:
+            existing = conn.execute(
+                f"SELECT * FROM jobs WHERE kind = ? AND input_hash = ? AND status IN ({', '.join('?' * len(statuses))}) "
+                "ORDER BY created_at DESC LIMIT 1", (kind, digest, *statuses)
+            ).fetchone()
+            if existing is not None:
+                # A more urgent duplicate raises the queued job's priority
+                if existing['status'] == 'queued' and priority > existing['priority']:
+                    conn.execute("UPDATE jobs SET priority = ? WHERE id = ?", (priority, existing['id']))
+                    return {**self._row(existing), 'priority': priority, 'deduplicated': True}
+                return {**self._row(existing), 'deduplicated': True}
+
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, kind, input_hash, lane, priority, status, payload, created_at) "
+                "VALUES (?, ?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, digest, JOB_KINDS[kind].lane, priority,
+                 json.dumps(payload, sort_keys=True), _now())
+            )
+        self.submitted.set()
+        logger.info("Job queued", extra={'job': job_id, 'kind': kind, 'priority': priority})
+        return {**self.get(job_id), 'deduplicated': False}
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self._row(self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def recent(self, status: Optional[str] = None, kind: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        where = []
+        params: List = []
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if kind:
+            where.append("kind = ?")
+            params.append(kind)
+        sql = "SELECT * FROM jobs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        return [self._row(row) for row in self.conn.execute(sql, params)]
+
+    def claim(self, lane: str, worker: str) -> Optional[Dict]:
+        """Atomically take the most urgent queued job of a lane"""
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE lane = ? AND status = 'queued' "
+                "ORDER BY priority DESC, created_at LIMIT 1", (lane,)
+            ).fetchone()
+            if row is None:
+                return None
+            started = _now()
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, started_at = ? WHERE id = ?",
+                (worker, started, row['id'])
+            )
+        return {**self._row(row), 'status': 'running', 'worker': worker, 'started_at': started}
+
+    def progress(self, job_id: str, fraction: float, message: Optional[str] = None):
+        self.conn.execute(
+            "UPDATE jobs SET progress = ?, message = COALESCE(?, message) WHERE id = ?",
+            (max(0.0, min(1.0, fraction)), message, job_id)
+        )
+
+    def finish(self, job_id: str, result=None, error: Optional[str] = None):
+        self.conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, progress = CASE WHEN ? THEN progress ELSE 1 END, "
+            "finished_at = ? WHERE id = ?",
+            ('failed' if error else 'done', json.dumps(result, default=str) if error is None else None,
+             error, error is not None, _now(), job_id)
+        )
+
+    def requeue_abandoned(self, host: str) -> int:
+        """Put back jobs left 'running' by worker processes on this host that have exited"""
+        rows = self.conn.execute(
+            "SELECT id, worker FROM jobs WHERE status = 'running' AND worker LIKE ?", (host + ':%',)
+        ).fetchall()
+        # Worker names are host:pid/lane-n
+        abandoned = [row['id'] for row in rows
+                     if not _pid_alive(int(row['worker'].split(':', 1)[1].split('/', 1)[0]))]
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE jobs SET status = 'queued', worker = NULL, started_at = NULL, progress = 0 "
+                "WHERE id = ? AND status = 'running'", [(job_id,) for job_id in abandoned]
+            )
+        return len(abandoned)
+
+
+def run_job(db_path: str, job_id: str, kind: str, payload: Dict):
+    """Execute one job; runs inside a pool process for the CPU lane"""
+    # Importing the handlers module registers every kind in this process
+    import backend.services.job_handlers  # noqa: F401
+
+    queue = JobQueue(db_path)
+    handler = JOB_KINDS[kind].handler
+
+    def report(fraction: float, message: Optional[str] = None):
+        queue.progress(job_id, fraction, message)
+
+    if asyncio.iscoroutinefunction(handler):
+        return asyncio.run(handler(payload, report))
+    return handler(payload, report)
+
+
+class WorkerPool:
+    """Lane threads that claim jobs; CPU jobs are executed in a process pool"""
+
+    def __init__(self, queue: JobQueue, cpu_workers: int = 2, io_workers: int = 4):
+        self.queue = queue
+        self.sizes = {'cpu': cpu_workers, 'io': io_workers}
+        self.host = socket.gethostname()
+        self.name = f"{self.host}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._processes: Optional[ProcessPoolExecutor] = None
+
+    def start(self):
+        requeued = self.queue.requeue_abandoned(self.host)
+        if requeued:
+            logger.warning("Requeued abandoned jobs", extra={'count': requeued})
+        if self.sizes['cpu']:
+            # spawn, not fork: the API process has threads (and their locks) running
+            self._processes = ProcessPoolExecutor(max_workers=self.sizes['cpu'],
+                                                  mp_context=multiprocessing.get_context('spawn'))
+        for lane, size in self.sizes.items():
+            for n in range(size):
+                thread = threading.Thread(target=self._run, args=(lane, f"{self.name}/{lane}-{n}"),
+                                          name=f"jobs-{lane}-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info("Job workers started", extra={'cpu': self.sizes['cpu'], 'io': self.sizes['io']})
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self.queue.submitted.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        if self._processes:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, lane: str, worker: str):
+        while not self._stop.is_set():
+            job = self.queue.claim(lane, worker)
+            if job is None:
+                self.queue.submitted.wait(POLL_SECONDS)
+                self.queue.submitted.clear()
+                continue
+
+            start = time.perf_counter()
+            try:
+                args = (str(self.queue.db_path), job['id'], job['kind'], job['payload'])
+                if lane == 'cpu':
+                    result = self._processes.submit(run_job, *args).result()
+                else:
+                    result = run_job(*args)
+            except Exception as e:
+                logger.exception("Job failed", extra={'job': job['id'], 'kind': job['kind']})
+                self.queue.finish(job['id'], error=f"{type(e).__name__}: {e}")
+                JOBS.inc(job['kind'], 'failed')
+            else:
+                self.queue.finish(job['id'], result)
+                JOBS.inc(job['kind'], 'done')
+            JOB_DURATION.observe(time.perf_counter() - start, job['kind'])
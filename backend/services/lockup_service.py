@@ -0,0 +1,246 @@
+"""
+Lockup Service - extract lock-up periods from prospectus filings
+"""
+
+import hashlib
+import json
+import re
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from backend.core.metrics import record_cache
+from backend.models.ipo import LockupCitation, LockupMetadata
+from backend.services.filing_manifest import FilingManifest, document_key
+from backend.services.filing_store import FilingStore
+from backend.services.filing_text import iter_blocks
+
+# Only prospectus-type filings describe the offering's lock-up
+LOCKUP_FORMS = ('S-1', 'S-1/A', 'F-1', 'F-1/A', '424B1', '424B3', '424B4', '424B5')
+
+# Newer, more final documents win when filings disagree
+FORM_PRIORITY = {'424B4': 3, '424B1': 3, '424B3': 2, '424B5': 2, 'S-1/A': 1, 'F-1/A': 1}
+
+# --- Precompiled automata -------------------------------------------------
+# All trigger phrases are folded into one alternation so each block is scanned once
+
+SPACE_PATTERN = re.compile(r'\s+')
+SENTENCE_PATTERN = re.compile(r'(?<=[.;:])\s+(?=[A-Z●•(])')
+
+TRIGGER_PATTERN = re.compile(
+    r'lock[\s\-‑]?ups?'
+    r'|market[\s\-]stand[\s\-]?off'
+    r'|no sales of similar securities'
+    r'|dispose of or hedge'
+    r'|not to,? (?:directly or indirectly,? )?(?:offer|sell|pledge|dispose|transfer)',
+    re.I
+)
+ANCHOR_PATTERN = re.compile(
+    r'after the date of (?:this|the final) prospectus'
+    r'|after the date of the underwriting agreement'
+    r'|after the (?:closing|completion) of (?:this|the) offering',
+    re.I
+)
+# "180 days", "(180) days", "180-day", "one hundred eighty (180) calendar days"
+DAYS_PATTERN = re.compile(r'\(?\b(\d{2,3})\)?[\s\-]+(?:calendar\s+|trading\s+)?days?\b', re.I)
+MONTHS_PATTERN = re.compile(r'\b(\d{1,2}|six|twelve|eighteen)\)?[\s\-]+months?\b', re.I)
+WORD_MONTHS = {'six': 6, 'twelve': 12, 'eighteen': 18}
+
+# Over-allotment options and Rule 144 holding periods look like lock-ups but are not
+FALSE_POSITIVE_PATTERN = re.compile(r'option to purchase additional|over-?allotment|rule 144|rule 701', re.I)
+
+
+def _days_in(sentence: str) -> List[Tuple[int, str, float]]:
+    """(days, matched text, base confidence) for every period in a sentence"""
+    found = []
+    for match in DAYS_PATTERN.finditer(sentence):
+        found.append((int(match.group(1)), match.group(0), 0.4))
+    for match in MONTHS_PATTERN.finditer(sentence):
+        value = match.group(1).lower()
+        months = WORD_MONTHS.get(value) or int(value)
+        # Month-based periods are approximate
+        days = months // 12 * 365 if months % 12 == 0 else months * 30
+        found.append((days, match.group(0), 0.3))
+    return found
+
+
+def extract_lockups(raw_html: str, filing: Optional[str] = None,
+                    citation_ids: Optional[Dict[str, str]] = None) -> List[LockupCitation]:
+    """Find lock-up periods in a filing's HTML"""
+    citations = []
+    seen = set()
+
+    for text, page, section in iter_blocks(raw_html):
+        # Cheap pre-filter: most blocks never mention a lock-up
+        if not TRIGGER_PATTERN.search(text):
+            continue
+
+        for sentence in SENTENCE_PATTERN.split(text):
+            trigger = TRIGGER_PATTERN.search(sentence)
+            if not trigger:
+                continue
+            if FALSE_POSITIVE_PATTERN.search(sentence) and not trigger.group(0).lower().startswith('lock'):
+                continue
+
+            for days, matched, confidence in _days_in(sentence):
+                if not 30 <= days <= 730:
+                    continue
+                if ANCHOR_PATTERN.search(sentence):
+                    confidence += 0.3
+                if trigger.group(0).lower().startswith(('lock', 'market')):
+                    confidence += 0.2
+                if section and re.search(r'lock|underwrit|future sale|similar securities', section, re.I):
+                    confidence += 0.1
+
+                key = (days, sentence[:120])
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                citations.append(LockupCitation(
+                    text=matched,
+                    days=days,
+                    context=sentence[:500],
+                    page=page,
+                    section=section,
+                    confidence=round(min(confidence, 1.0), 2),
+                    citation_id=(citation_ids or {}).get(_citation_key(text)),
+                    filing=filing
+                ))
+
+    return citations
+
+
+def _citation_key(text: str) -> str:
+    """Normalized prefix used to line blocks up with citation index entries"""
+    return SPACE_PATTERN.sub(' ', text).strip().lower()[:40]
+
+
+def summarize(citations: List[LockupCitation]) -> LockupMetadata:
+    """Pick the best-supported period from a set of citations"""
+    weights: Dict[int, float] = defaultdict(float)
+    for citation in citations:
+        weights[citation.days] += citation.confidence
+
+    period = max(weights, key=weights.get) if weights else None
+    total = sum(weights.values())
+
+    return LockupMetadata(
+        period_days=period,
+        citations=sorted(citations, key=lambda c: c.confidence, reverse=True),
+        verified_by_ai=False,
+        confidence_score=round(weights[period] / total, 2) if period else 0.0,
+        last_updated=datetime.now(timezone.utc)
+    )
+
+
+class LockupService:
+    """Incremental lock-up extraction over the filing manifest"""
+
+    def __init__(self, data_dir: Path, manifest: FilingManifest):
+        self.data_dir = Path(data_dir)
+        self.manifest = manifest
+        self.store = manifest.store or FilingStore(self.data_dir)
+        self.results_path = self.data_dir / "lockups.json"
+        self.indices_dir = self.data_dir / "indices"
+
+        self._results: Dict[str, Dict] = {}
+        self._results_mtime: Optional[float] = None
+        self._periods: Optional[Dict[str, str]] = None
+
+    def _load(self) -> Dict[str, Dict]:
+        """filing id -> stored extraction (reloaded when the file changes)"""
+        if not self.results_path.exists():
+            return {}
+        mtime = self.results_path.stat().st_mtime
+        if mtime != self._results_mtime:
+            with open(self.results_path, 'r', encoding='utf-8') as f:
+                self._results = json.load(f).get('filings', {})
+            self._results_mtime = mtime
+            self._periods = None
+        return self._results
+
+    def _save(self, results: Dict[str, Dict]):
+        tmp_path = self.results_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'updated_at': datetime.now(timezone.utc).isoformat(),
+                'filings': results
+            }, f, indent=2)
+        tmp_path.replace(self.results_path)
+        self._results = results
+        self._results_mtime = self.results_path.stat().st_mtime
+        self._periods = None
+
+    def _citation_ids(self, filing: Dict) -> Dict[str, str]:
+        """Citation index prefix -> citation id, if the filing was processed"""
+        index_path = self.indices_dir / f"{document_key(filing['path'])}_citations.json"
+        if not index_path.exists():
+            return {}
+        with open(index_path, 'r', encoding='utf-8') as f:
+            citations = json.load(f).get('citations', [])
+        return {_citation_key(c['text']): c['id'] for c in citations}
+
+    def source_version(self) -> str:
+        """Hash of every prospectus's id and content hash: what extract_new would read"""
+        self.manifest.refresh(force=True)
+        versions = sorted((f['id'], f['sha256']) for f in self.manifest.entries.values()
+                          if f['form_type'] in LOCKUP_FORMS)
+        return hashlib.sha256(json.dumps(versions).encode('utf-8')).hexdigest()
+
+    def extract_new(self, force: bool = False) -> Dict[str, int]:
+        """Extract lock-ups from prospectus filings that are new or changed"""
+        self.manifest.refresh(force=True)
+        results = dict(self._load())
+        processed = 0
+        skipped = 0
+
+        filings = [f for f in self.manifest.entries.values() if f['form_type'] in LOCKUP_FORMS]
+        for filing in filings:
+            stored = results.get(filing['id'])
+            if not force and stored and stored.get('sha256') == filing['sha256']:
+                skipped += 1
+                continue
+
+            raw_html = self.store.read_text(filing['path'])
+
+            citations = extract_lockups(raw_html, filing['id'], self._citation_ids(filing))
+            results[filing['id']] = {
+                'ticker': filing['ticker'],
+                'form_type': filing['form_type'],
+                'filing_date': filing['filing_date'],
+                'sha256': filing['sha256'],
+                'extracted_at': datetime.now(timezone.utc).isoformat(),
+                'citations': [c.model_dump() for c in citations]
+            }
+            processed += 1
+
+        # Forget filings that left the manifest
+        for filing_id in set(results) - set(self.manifest.entries):
+            del results[filing_id]
+
+        self._save(results)
+        return {'processed': processed, 'skipped': skipped}
+
+    def get_lockup(self, ticker: str) -> Optional[LockupMetadata]:
+        """Lock-up metadata from the most final prospectus that mentions one"""
+        candidates = [r for r in self._load().values() if r['ticker'] == ticker and r['citations']]
+        if not candidates:
+            return None
+
+        best = max(candidates, key=lambda r: (FORM_PRIORITY.get(r['form_type'], 0), r['filing_date'] or ''))
+        return summarize([LockupCitation(**c) for c in best['citations']])
+
+    def get_periods(self) -> Dict[str, str]:
+        """ticker -> display string for every ticker with an extracted lock-up"""
+        results = self._load()
+        record_cache('lockup_periods', self._periods is not None)
+        if self._periods is None:
+            periods = {}
+            for ticker in {r['ticker'] for r in results.values() if r['citations']}:
+                metadata = self.get_lockup(ticker)
+                if metadata and metadata.period_days:
+                    periods[ticker] = f"{metadata.period_days} days"
+            self._periods = periods
+        return self._periods
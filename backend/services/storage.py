@@ -0,0 +1,436 @@
+"""
+Storage - SQLite (WAL) tables for calendar listings, profiles, watchlists and alerts
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from backend.core.log import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_DB_PATH = "data/hedge.db"
+SCHEMA_VERSION = 1
+
+# Upserts are sent in batches of this many rows per executemany
+BATCH_SIZE = 500
+
+# The calendar the app serves; the other scraped variants are imported alongside it
+CURRENT_CALENDAR = "current"
+CALENDAR_FILES = {
+    "ipo_calendar.json": CURRENT_CALENDAR,
+    "ipo_calendar_real.json": "real",
+    "ipo_calendar_complete.json": "complete",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    calendar        TEXT NOT NULL,
+    ticker          TEXT NOT NULL,
+    position        INTEGER NOT NULL,
+    company         TEXT,
+    cik             TEXT,
+    status          TEXT,
+    expected_date   TEXT,               -- ISO date parsed from the scraped text, for range queries
+    exchange        TEXT,
+    data            TEXT NOT NULL,
+    updated_at      TEXT NOT NULL,
+    PRIMARY KEY (calendar, ticker)
+);
+CREATE INDEX IF NOT EXISTS idx_listings_ticker ON listings (ticker);
+CREATE INDEX IF NOT EXISTS idx_listings_cik ON listings (cik);
+CREATE INDEX IF NOT EXISTS idx_listings_status ON listings (calendar, status);
+CREATE INDEX IF NOT EXISTS idx_listings_expected_date ON listings (calendar, expected_date);
+CREATE INDEX IF NOT EXISTS idx_listings_position ON listings (calendar, position);
+
+CREATE TABLE IF NOT EXISTS profiles (
+    ticker          TEXT PRIMARY KEY,
+    name            TEXT,
+    sector          TEXT,
+    industry        TEXT,
+    data            TEXT NOT NULL,
+    updated_at      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_profiles_sector ON profiles (sector, industry);
+
+CREATE TABLE IF NOT EXISTS watchlists (
+    id              INTEGER PRIMARY KEY,
+    name            TEXT NOT NULL UNIQUE,
+    created_at      TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS watchlist_items (
+    watchlist_id    INTEGER NOT NULL REFERENCES watchlists (id) ON DELETE CASCADE,
+    ticker          TEXT NOT NULL,
+    added_at        TEXT NOT NULL,
+    data            TEXT,
+    PRIMARY KEY (watchlist_id, ticker)
+);
+CREATE INDEX IF NOT EXISTS idx_watchlist_items_ticker ON watchlist_items (ticker);
+
+CREATE TABLE IF NOT EXISTS alert_rules (
+    watchlist_id    INTEGER NOT NULL REFERENCES watchlists (id) ON DELETE CASCADE,
+    ticker          TEXT NOT NULL,
+    type            TEXT NOT NULL,
+    enabled         INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (watchlist_id, ticker, type)
+);
+
+CREATE TABLE IF NOT EXISTS alerts (
+    id              INTEGER PRIMARY KEY,
+    ticker          TEXT NOT NULL,
+    type            TEXT,
+    title           TEXT,
+    message         TEXT,
+    timestamp       TEXT NOT NULL,
+    read            INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (ticker, type, message, timestamp)
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_ticker ON alerts (ticker, timestamp);
+CREATE INDEX IF NOT EXISTS idx_alerts_unread ON alerts (read, timestamp);
+
+-- Bumped on every write so readers can cache per table version
+CREATE TABLE IF NOT EXISTS table_versions (
+    name            TEXT PRIMARY KEY,
+    version         INTEGER NOT NULL
+);
+"""
+
+# Statements are module constants so sqlite3's per-connection cache reuses the prepared form
+# The scraper does not know CIKs: keep one resolved earlier, in the column and in the data
+MERGED_LISTING_DATA = """CASE WHEN excluded.cik IS NULL AND listings.cik IS NOT NULL
+        THEN json_set(excluded.data, '$.cik', listings.cik) ELSE excluded.data END"""
+UPSERT_LISTING = f"""
+INSERT INTO listings (calendar, ticker, position, company, cik, status, expected_date, exchange, data, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (calendar, ticker) DO UPDATE SET
+    position = excluded.position, company = excluded.company, cik = COALESCE(excluded.cik, listings.cik),
+    status = excluded.status, expected_date = excluded.expected_date, exchange = excluded.exchange,
+    data = {MERGED_LISTING_DATA}, updated_at = excluded.updated_at
+WHERE listings.data != {MERGED_LISTING_DATA} OR listings.position != excluded.position
+"""
+SET_LISTING_CIK = """
+UPDATE listings SET cik = ?, data = json_set(data, '$.cik', ?)
+WHERE ticker = ? AND cik IS NULL
+"""
+UPSERT_PROFILE = """
+INSERT INTO profiles (ticker, name, sector, industry, data, updated_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (ticker) DO UPDATE SET
+    name = excluded.name, sector = excluded.sector, industry = excluded.industry,
+    data = excluded.data, updated_at = excluded.updated_at
+WHERE profiles.data != excluded.data
+"""
+INSERT_ALERT = """
+INSERT OR IGNORE INTO alerts (ticker, type, title, message, timestamp, read)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+BUMP_VERSION = """
+INSERT INTO table_versions (name, version) VALUES (?, 1)
+ON CONFLICT (name) DO UPDATE SET version = version + 1
+"""
+SELECT_VERSION = "SELECT version FROM table_versions WHERE name = ?"
+
+
+def iso_date(value: Optional[str]) -> Optional[str]:
+    """'6/16/2025 Week of' or '2025-06-16' -> '2025-06-16', so date ranges compare as strings"""
+    if not value:
+        return None
+    match = re.match(r'\s*(\d{1,2})/(\d{1,2})/(\d{4})', value)
+    if match:
+        month, day, year = match.groups()
+        return f"{year}-{int(month):02d}-{int(day):02d}"
+    match = re.match(r'\s*(\d{4}-\d{2}-\d{2})', value)
+    return match.group(1) if match else None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _json(value) -> str:
+    return json.dumps(value, separators=(',', ':'), sort_keys=True)
+
+
+def _batches(rows: Iterable, size: int = BATCH_SIZE) -> Iterator[List]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Storage:
+    """SQLite in WAL mode: readers never block the scraper's writes, nor it theirs"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection per thread; sqlite3 connections must not be shared across threads
+        self._local = threading.local()
+        self._init_schema()
+
+    @classmethod
+    def exists(cls, db_path: str = DEFAULT_DB_PATH) -> bool:
+        return Path(db_path).exists()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit; writes take explicit transactions below
+            conn = sqlite3.connect(self.db_path, timeout=10.0, isolation_level=None, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA busy_timeout = 10000")
+            conn.execute("PRAGMA temp_store = MEMORY")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """BEGIN IMMEDIATE so concurrent writers queue on busy_timeout instead of failing mid-way"""
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _init_schema(self):
+        conn = self.conn
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def version(self, table: str) -> int:
+        """Write counter for a table; changes whenever its rows do"""
+        row = self.conn.execute(SELECT_VERSION, (table,)).fetchone()
+        return row[0] if row else 0
+
+    # --- Listings --------------------------------------------------------------
+
+    def upsert_listings(self, listings: List[Dict], calendar: str = CURRENT_CALENDAR,
+                        replace: bool = True) -> int:
+        """Batch-upsert a calendar; with replace, listings missing from it are removed"""
+        now = _now()
+        rows = (
+            (calendar, ipo['ticker'], position, ipo.get('company'), ipo.get('cik'), ipo.get('status'),
+             iso_date(ipo.get('expected_date')), ipo.get('exchange'), _json(ipo), now)
+            for position, ipo in enumerate(listings) if ipo.get('ticker')
+        )
+
+        with self.transaction() as conn:
+            for batch in _batches(rows):
+                conn.executemany(UPSERT_LISTING, batch)
+            if replace:
+                tickers = [ipo['ticker'] for ipo in listings if ipo.get('ticker')]
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_tickers (ticker TEXT PRIMARY KEY)")
+                conn.execute("DELETE FROM keep_tickers")
+                conn.executemany("INSERT OR IGNORE INTO keep_tickers VALUES (?)", ((t,) for t in tickers))
+                conn.execute(
+                    "DELETE FROM listings WHERE calendar = ? AND ticker NOT IN (SELECT ticker FROM keep_tickers)",
+                    (calendar,)
+                )
+            conn.execute(BUMP_VERSION, ('listings',))
+        return len(listings)
+
+    def get_listings(self, calendar: str = CURRENT_CALENDAR, status: Optional[str] = None,
+                     since: Optional[str] = None, until: Optional[str] = None,
+                     cik: Optional[str] = None, sector: Optional[str] = None) -> List[Dict]:
+        """Listings in calendar order, filtered through the indexes"""
+        sql = "SELECT l.data FROM listings l"
+        where = ["l.calendar = ?"]
+        params: List = [calendar]
+        if sector:
+            sql += " JOIN profiles p ON p.ticker = l.ticker"
+            where.append("p.sector = ?")
+            params.append(sector)
+        if status:
+            where.append("l.status = ?")
+            params.append(status)
+        if since:
+            where.append("l.expected_date >= ?")
+            params.append(since)
+        if until:
+            where.append("l.expected_date <= ?")
+            params.append(until)
+        if cik:
+            where.append("l.cik = ?")
+            params.append(cik.zfill(10))
+        sql += " WHERE " + " AND ".join(where) + " ORDER BY l.position"
+        return [json.loads(row[0]) for row in self.conn.execute(sql, params)]
+
+    def get_listing(self, ticker: str, calendar: str = CURRENT_CALENDAR) -> Optional[Dict]:
+        row = self.conn.execute(
+            "SELECT data FROM listings WHERE calendar = ? AND ticker = ?", (calendar, ticker)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # --- Profiles --------------------------------------------------------------
+
+    def upsert_profiles(self, profiles: List[Dict]) -> int:
+        now = _now()
+        rows = (
+            (p['ticker'], p.get('name'), p.get('sector'), p.get('industry'), _json(p), now)
+            for p in profiles if p.get('ticker')
+        )
+        with self.transaction() as conn:
+            for batch in _batches(rows):
+                conn.executemany(UPSERT_PROFILE, batch)
+            conn.execute(BUMP_VERSION, ('profiles',))
+        return len(profiles)
+
+    def get_profiles(self, sector: Optional[str] = None) -> List[Dict]:
+        if sector:
+            rows = self.conn.execute("SELECT data FROM profiles WHERE sector = ? ORDER BY ticker", (sector,))
+        else:
+            rows = self.conn.execute("SELECT data FROM profiles ORDER BY ticker")
+        return [json.loads(row[0]) for row in rows]
+
+    # --- Watchlists ------------------------------------------------------------
+
+    def _watchlist_id(self, conn: sqlite3.Connection, name: str) -> int:
+        conn.execute("INSERT OR IGNORE INTO watchlists (name, created_at) VALUES (?, ?)", (name, _now()))
+        return conn.execute("SELECT id FROM watchlists WHERE name = ?", (name,)).fetchone()[0]
+
+    def get_watchlist(self, name: str = "default") -> List[str]:
+        rows = self.conn.execute(
+            "SELECT i.ticker FROM watchlist_items i JOIN watchlists w ON w.id = i.watchlist_id "
+            "WHERE w.name = ? ORDER BY i.added_at, i.ticker", (name,)
+        )
+        return [row[0] for row in rows]
+
+    def add_to_watchlist(self, tickers: List[str], name: str = "default",
+                         details: Optional[Dict[str, Dict]] = None) -> int:
+        details = details or {}
+        with self.transaction() as conn:
+            watchlist_id = self._watchlist_id(conn, name)
+            conn.executemany(
+                "INSERT OR IGNORE INTO watchlist_items (watchlist_id, ticker, added_at, data) VALUES (?, ?, ?, ?)",
+                [(watchlist_id, t, details.get(t, {}).get('added_date') or _now(),
+                  _json(details[t]) if t in details else None) for t in tickers]
+            )
+            conn.execute(BUMP_VERSION, ('watchlists',))
+        return len(tickers)
+
+    def remove_from_watchlist(self, ticker: str, name: str = "default") -> bool:
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM watchlist_items WHERE ticker = ? AND watchlist_id = "
+                "(SELECT id FROM watchlists WHERE name = ?)", (ticker, name)
+            )
+            conn.execute(BUMP_VERSION, ('watchlists',))
+        return cursor.rowcount > 0
+
+    def set_alert_rules(self, rules: List[Dict], name: str = "default"):
+        with self.transaction() as conn:
+            watchlist_id = self._watchlist_id(conn, name)
+            conn.executemany(
+                "INSERT OR REPLACE INTO alert_rules (watchlist_id, ticker, type, enabled) VALUES (?, ?, ?, ?)",
+                [(watchlist_id, r['ticker'], r.get('type', 'filing'), int(r.get('enabled', True))) for r in rules]
+            )
+
+    # --- Alerts ----------------------------------------------------------------
+
+    def add_alerts(self, alerts: List[Dict]) -> int:
+        rows = (
+            (a['ticker'], a.get('type'), a.get('title'), a.get('message'),
+             a.get('timestamp') or _now(), int(bool(a.get('read'))))
+            for a in alerts if a.get('ticker')
+        )
+        with self.transaction() as conn:
+            before = conn.total_changes
+            for batch in _batches(rows):
+                conn.executemany(INSERT_ALERT, batch)
+            added = conn.total_changes - before
+            conn.execute(BUMP_VERSION, ('alerts',))
+        return added
+
+    def get_alerts(self, ticker: Optional[str] = None, unread_only: bool = False,
+                   limit: int = 100) -> List[Dict]:
+        where = []
+        params: List = []
+        if ticker:
+            where.append("ticker = ?")
+            params.append(ticker)
+        if unread_only:
+            where.append("read = 0")
+        sql = "SELECT id, ticker, type, title, message, timestamp, read FROM alerts"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY timestamp DESC LIMIT ?"
+        params.append(limit)
+        return [{**dict(row), 'read': bool(row['read'])} for row in self.conn.execute(sql, params)]
+
+    def mark_alert_read(self, alert_id: int) -> bool:
+        with self.transaction() as conn:
+            cursor = conn.execute("UPDATE alerts SET read = 1 WHERE id = ?", (alert_id,))
+        return cursor.rowcount > 0
+
+    # --- Import ----------------------------------------------------------------
+
+    def import_json(self, data_dir: str = "data") -> Dict[str, int]:
+        """Load the legacy JSON files; safe to re-run (everything is an upsert)"""
+        data_dir = Path(data_dir)
+        counts: Dict[str, int] = {}
+
+        def load(path: Path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        for filename, calendar in CALENDAR_FILES.items():
+            path = data_dir / filename
+            if path.exists():
+                counts[f"listings:{calendar}"] = self.upsert_listings(load(path).get('listings', []), calendar)
+
+        # CIKs resolved earlier live in cik_mappings.json, keyed "TICKER:Company"
+        path = data_dir / "cik_mappings.json"
+        if path.exists():
+            ciks = {m['ticker']: m['cik'] for m in load(path).values()
+                    if isinstance(m, dict) and m.get('ticker') and m.get('cik') and m.get('confidence', 0) >= 90}
+            with self.transaction() as conn:
+                updated = conn.executemany(SET_LISTING_CIK,
+                                           [(cik, cik, ticker) for ticker, cik in ciks.items()]).rowcount
+                conn.execute(BUMP_VERSION, ('listings',))
+            # Rows actually given a CIK, not mappings read
+            counts['ciks'] = updated
+
+        path = data_dir / "company_profiles.json"
+        if path.exists():
+            counts['profiles'] = self.upsert_profiles(load(path))
+
+        path = data_dir / "watchlists.json"
+        if path.exists():
+            watchlist = load(path)
+            name = watchlist.get('name', 'default')
+            counts['watchlist:' + name] = self.add_to_watchlist(watchlist.get('tickers', []), name)
+            self.set_alert_rules(watchlist.get('alerts', []), name)
+
+        watchlists_dir = data_dir / "watchlists"
+        path = watchlists_dir / "default.json"
+        if path.exists():
+            counts['watchlist:default'] = self.add_to_watchlist(load(path), "default")
+        path = watchlists_dir / "watchlist.json"
+        if path.exists():
+            details = load(path)
+            counts['watchlist:stocks'] = self.add_to_watchlist(list(details), "stocks", details)
+        path = watchlists_dir / "alerts.json"
+        if path.exists():
+            counts['alerts'] = self.add_alerts(load(path))
+
+        logger.info("Imported JSON data", extra={'counts': counts, 'db': str(self.db_path)})
+        return counts
@@ -0,0 +1,319 @@
+"""
+Table Extractor - normalize filing <table>s into labelled numeric frames
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# --- Cell parsing ------------------------------------------------------------
+
+SPACE_PATTERN = re.compile(r'\s+')
+
+# "(1,234.5)(2)", "12.5 %", "(3)", "−1,000*" once "$" is dropped: sign, digits, percent, footnotes
+NUMBER_PATTERN = re.compile(
+    r'^(?P<open>\()?\s*(?P<sign>[-−–])?\s*(?P<digits>\d[\d,]*(?:\.\d+)?|\.\d+)\s*'
+    r'(?P<close>\))?\s*(?P<percent>%)?\s*(?P<close_after>\))?\s*'
+    r'(?P<notes>(?:\(\s*[0-9a-z]{1,2}\s*\)|[*†‡§])*)$',
+    re.I
+)
+FOOTNOTE_PATTERN = re.compile(r'\(\s*([0-9a-z]{1,2})\s*\)|([*†‡§])', re.I)
+# Footnote markers trailing a row label: "Revenue(1)", "Total*"
+LABEL_NOTES_PATTERN = re.compile(r'(?:\s*(?:\(\s*[0-9a-z]{1,2}\s*\)|[*†‡§]))+$', re.I)
+
+# A dash (or "nil") in a numeric column reports zero
+ZERO_CELLS = {'—', '–', '-', '−', '— %', '-%', 'nil'}
+# Cells split off a value in EDGAR HTML: "$ | 1,234" and "(1,234 | )" / "12.5 | %"
+PREFIX_CELLS = {'$', '($', '(', '$('}
+SUFFIX_CELLS = {')', '%', ')%', '%)'}
+
+YEAR_PATTERN = re.compile(r'^(?:19|20)\d{2}$')
+
+SCALE_PATTERNS = (
+    (re.compile(r'in\s+billions', re.I), 'billions', 1e9),
+    (re.compile(r'in\s+millions', re.I), 'millions', 1e6),
+    (re.compile(r'in\s+thousands', re.I), 'thousands', 1e3),
+)
+# "(in thousands, except share and per share data)": those cells are reported as-is
+EXCEPT_PATTERN = re.compile(r'except\s+(?:for\s+)?([^);]*)', re.I)
+PER_SHARE_PATTERN = re.compile(r'per[\s-]+(?:share|unit)', re.I)
+SHARES_PATTERN = re.compile(r'\b(?:shares?|units?)\b', re.I)
+# Equity lines ("Common stock, $0.0001 par value per share; 35,000,000 shares authorized") are amounts
+PAR_VALUE_PATTERN = re.compile(r'par\s+value', re.I)
+
+# The offering tables cross-IPO comparisons care about, tested in order against the
+# heading before a table and the table's own opening text
+KIND_PATTERNS = (
+    ('use_of_proceeds', re.compile(r'use of proceeds', re.I)),
+    ('dilution', re.compile(r'dilution|net tangible book value', re.I)),
+    ('capitalization', re.compile(r'capitalization', re.I)),
+    ('selling_stockholders', re.compile(r'selling (?:stock|share)holders?|beneficial(?:ly)? own', re.I)),
+    ('summary_financials', re.compile(r'statements? of operations|balance sheet data|summary (?:consolidated )?financial', re.I)),
+)
+
+HEADING_TAGS = ['h1', 'h2', 'h3', 'h4', 'p', 'b', 'strong']
+CONTEXT_CHARS = 300
+CONTEXT_HEADINGS = 4
+
+
+def clean_text(text: str) -> str:
+    return SPACE_PATTERN.sub(' ', text.replace('\xa0', ' ')).strip()
+
+
+def parse_number(text: str) -> Optional[Tuple[float, bool, List[str]]]:
+    """(value, is_percent, footnotes) for a numeric cell, None for anything else"""
+    text = clean_text(text)
+    if not text:
+        return None
+    if text.lower() in ZERO_CELLS:
+        return 0.0, text.endswith('%'), []
+
+    match = NUMBER_PATTERN.match(text.replace('$', '').strip())
+    if not match:
+        return None
+    value = float(match.group('digits').replace(',', ''))
+    closed = match.group('close') or match.group('close_after')
+    if (match.group('open') and closed) or match.group('sign'):
+        value = -value
+    elif match.group('open') or closed:
+        # Unbalanced parenthesis: a footnote or stray text, not a number
+        return None
+
+    notes = [a or b for a, b in FOOTNOTE_PATTERN.findall(match.group('notes') or '')]
+    return value, bool(match.group('percent')), notes
+
+
+def split_label(text: str) -> Tuple[str, List[str]]:
+    """Row label without trailing footnote markers, and the markers"""
+    text = clean_text(text)
+    notes_match = LABEL_NOTES_PATTERN.search(text)
+    if not notes_match or notes_match.start() == 0:
+        return text, []
+    notes = [a or b for a, b in FOOTNOTE_PATTERN.findall(notes_match.group(0))]
+    return text[:notes_match.start()].rstrip(' :'), notes
+
+
+# --- Table layout ------------------------------------------------------------
+
+@dataclass
+class Cell:
+    start: int
+    end: int
+    text: str
+
+
+@dataclass
+class ExtractedTable:
+    """One table as a frame: row labels x columns, with None for blank cells"""
+    citation_id: str
+    kind: str
+    unit: Optional[str]
+    scale: float
+    columns: List[str]
+    labels: List[str]
+    # values[c][r], so each column is a contiguous list
+    values: List[List[Optional[float]]]
+    percent: List[List[bool]]
+    raw: List[List[str]]
+    footnotes: List[List[List[str]]]
+    label_footnotes: List[List[str]] = field(default_factory=list)
+    # Cells the scale does not apply to: 'per_share' amounts and/or 'shares' counts
+    scale_except: List[str] = field(default_factory=list)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.labels), len(self.columns)
+
+
+def scale_exceptions(context: List[str]) -> List[str]:
+    """What an "except ..." qualifier on the unit leaves unscaled: 'per_share' and/or 'shares'"""
+    excepted = []
+    for text in context:
+        for clause in EXCEPT_PATTERN.findall(text):
+            if PER_SHARE_PATTERN.search(clause) and 'per_share' not in excepted:
+                excepted.append('per_share')
+            if SHARES_PATTERN.search(PER_SHARE_PATTERN.sub('', clause)) and 'shares' not in excepted:
+                excepted.append('shares')
+    return excepted
+
+
+def cell_scale(scale: float, scale_except: List[str], label: str, column: str) -> float:
+    """The multiplier for one cell: 1 for per-share amounts and share counts the unit excepts"""
+    if not scale_except or PAR_VALUE_PATTERN.search(label):
+        return scale
+    # A header can carry the unit note itself: "Actual (in thousands, except share ... data)"
+    text = EXCEPT_PATTERN.sub('', f"{label} {column}")
+    if 'per_share' in scale_except and PER_SHARE_PATTERN.search(text):
+        return 1.0
+    if 'shares' in scale_except and SHARES_PATTERN.search(PER_SHARE_PATTERN.sub('', text)):
+        return 1.0
+    return scale
+
+
+def _grid(table) -> List[List[Cell]]:
+    """Rows of non-empty cells with their colspan-expanded column ranges"""
+    rows = []
+    for tr in table.find_all('tr'):
+        cells = []
+        position = 0
+        for td in tr.find_all(['td', 'th'], recursive=False):
+            try:
+                span = max(1, int(td.get('colspan', 1)))
+            except ValueError:
+                span = 1
+            text = clean_text(td.get_text(' '))
+            if text:
+                cells.append(Cell(position, position + span, text))
+            position += span
+        rows.append(cells)
+    return rows
+
+
+def _merge_fragments(cells: List[Cell]) -> List[Cell]:
+    """Glue "$" onto the value after it and ")" / "%" onto the value before it"""
+    merged: List[Cell] = []
+    pending_prefix = ''
+    for cell in cells:
+        if cell.text in PREFIX_CELLS:
+            pending_prefix += cell.text
+            continue
+        if cell.text in SUFFIX_CELLS and merged:
+            merged[-1].text += cell.text
+            continue
+        merged.append(Cell(cell.start, cell.end, pending_prefix + cell.text))
+        pending_prefix = ''
+    return merged
+
+
+def heading_text(elem) -> str:
+    """Context text of one heading-like element; empty ones still count towards CONTEXT_HEADINGS"""
+    return clean_text(elem.get_text(' '))[:CONTEXT_CHARS]
+
+
+def _context(table, preceding: Optional[List[str]] = None) -> List[str]:
+    """Heading-like text before the table, nearest first, then the table's own opening text.
+
+    preceding continues the search when the table was parsed from a fragment: heading_text of
+    the heading-like elements before the fragment, in document order.
+    """
+    texts = [heading_text(elem) for elem in table.find_all_previous(HEADING_TAGS, limit=CONTEXT_HEADINGS)]
+    if preceding and len(texts) < CONTEXT_HEADINGS:
+        texts.extend(preceding[::-1][:CONTEXT_HEADINGS - len(texts)])
+    parts = [text for text in texts if text]
+    parts.append(clean_text(table.get_text(' '))[:CONTEXT_CHARS])
+    return parts
+
+
+def classify(context: List[str]) -> str:
+    """Kind named by the nearest context; a table naming several kinds is a table of contents"""
+    if sum(1 for _, pattern in KIND_PATTERNS if pattern.search(context[-1])) >= 3:
+        return 'table_of_contents'
+    for text in context:
+        for kind, pattern in KIND_PATTERNS:
+            if pattern.search(text):
+                return kind
+    return 'other'
+
+
+def extract_table(table, citation_id: str, preceding: Optional[List[str]] = None) -> Optional[ExtractedTable]:
+    """Frame for a financial table; None for layout tables without numeric columns.
+
+    preceding is the heading context before the parsed fragment (see _context).
+    """
+    rows = [_merge_fragments(cells) for cells in _grid(table)]
+
+    parsed = [[parse_number(cell.text) for cell in cells] for cells in rows]
+
+    # Body rows carry a text label followed by at least one number
+    def is_body(i: int) -> bool:
+        cells = rows[i]
+        return (len(cells) > 1 and parsed[i][0] is None
+                and any(p is not None for p in parsed[i][1:]))
+
+    body = [i for i in range(len(rows)) if is_body(i)]
+    # "December 31, | 2024 | 2023" is a header row, not data
+    while body and all(YEAR_PATTERN.match(cell.text) for cell in rows[body[0]][1:]):
+        body.pop(0)
+    if not body:
+        return None
+
+    # Numeric columns are the grid positions values start at in the body
+    positions = sorted({
+        cell.start for i in body for cell, p in zip(rows[i][1:], parsed[i][1:]) if p is not None
+    })
+    label_end = positions[0]
+
+    # Headers: rows above the body, joined top to bottom over each column's range
+    headers = {position: [] for position in positions}
+    for i in range(body[0]):
+        for cell in rows[i]:
+            if cell.end <= label_end:
+                continue
+            covered = [position for position in positions if cell.start <= position < cell.end]
+            if not covered:
+                # Header misaligned with its values by a "$" cell: take the next column
+                covered = [position for position in positions if position >= cell.start][:1]
+            for position in covered:
+                headers[position].append(cell.text)
+    columns = []
+    for n, position in enumerate(positions):
+        name = ' '.join(headers[position]) or f"col{n + 1}"
+        columns.append(name if name not in columns else f"{name} ({n + 1})")
+
+    context = _context(table, preceding)
+    unit, scale = None, 1.0
+    for pattern, name, factor in SCALE_PATTERNS:
+        if any(pattern.search(text) for text in context):
+            unit, scale = name, factor
+            break
+    scale_except = scale_exceptions(context) if unit else []
+
+    labels = []
+    label_footnotes = []
+    values = [[] for _ in positions]
+    percent = [[] for _ in positions]
+    raw = [[] for _ in positions]
+    footnotes = [[] for _ in positions]
+    column_of = {position: n for n, position in enumerate(positions)}
+
+    for i in body:
+        label, notes = split_label(rows[i][0].text) if rows[i][0].start < label_end else ('', [])
+        labels.append(label)
+        label_footnotes.append(notes)
+        row_values: Dict[int, Tuple[Tuple[float, bool, List[str]], str]] = {}
+        for cell, p in zip(rows[i], parsed[i]):
+            if p is None:
+                continue
+            # Values land on the numeric column whose range they overlap
+            n = column_of.get(cell.start)
+            if n is None:
+                n = next((column_of[pos] for pos in positions if cell.start <= pos < cell.end), None)
+            if n is not None and n not in row_values:
+                row_values[n] = (p, cell.text)
+        for n in range(len(positions)):
+            if n in row_values:
+                (value, is_percent, notes), text = row_values[n]
+                values[n].append(value)
+                percent[n].append(is_percent)
+                raw[n].append(text)
+                footnotes[n].append(notes)
+            else:
+                values[n].append(None)
+                percent[n].append(False)
+                raw[n].append('')
+                footnotes[n].append([])
+
+    return ExtractedTable(
+        citation_id=citation_id,
+        kind=classify(context),
+        unit=unit,
+        scale=scale,
+        columns=columns,
+        labels=labels,
+        values=values,
+        percent=percent,
+        raw=raw,
+        footnotes=footnotes,
+        label_footnotes=label_footnotes,
+        scale_except=scale_except,
+    )
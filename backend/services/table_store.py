@@ -0,0 +1,301 @@
+"""
+Table Store - extracted filing tables as one columnar file per filing
+
+Every numeric cell is a row of a long ("tidy") frame; the file stores that frame column
+by column so queries read only the columns they touch:
+
+    8 bytes   magic
+    4 bytes   header length (little endian)
+    N bytes   header JSON {"document", "ticker", "tables": [...], "rows",
+                           "layout": {column: [type, offset, length]},
+                           "dictionaries": {column: [values]}}
+    ...       packed columns: float64 values, uint32 ids and dictionary codes, uint8 flags
+"""
+
+import json
+import math
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.core.metrics import record_cache
+from backend.services.table_extractor import ExtractedTable, cell_scale
+
+TABLES_MAGIC = b'HICOLS01'
+
+# column -> array typecode; string columns are dictionary-encoded as uint32 codes
+COLUMN_TYPES = {
+    'table': 'I',
+    'row': 'I',
+    'label': 'I',
+    'column': 'I',
+    'value': 'd',
+    'percent': 'B',
+    'raw': 'I',
+    'footnotes': 'I',
+}
+DICTIONARY_COLUMNS = ('label', 'column', 'raw', 'footnotes')
+
+
+def _encode(tables: List[ExtractedTable]) -> Tuple[Dict[str, array], Dict[str, List[str]]]:
+    columns = {name: array(typecode) for name, typecode in COLUMN_TYPES.items()}
+    dictionaries: Dict[str, Dict[str, int]] = {name: {} for name in DICTIONARY_COLUMNS}
+
+    def code(name: str, value: str) -> int:
+        entries = dictionaries[name]
+        if value not in entries:
+            entries[value] = len(entries)
+        return entries[value]
+
+    for t, table in enumerate(tables):
+        for c, name in enumerate(table.columns):
+            column_code = code('column', name)
+            for r, value in enumerate(table.values[c]):
+                if value is None:
+                    continue
+                columns['table'].append(t)
+                columns['row'].append(r)
+                columns['label'].append(code('label', table.labels[r]))
+                columns['column'].append(column_code)
+                columns['value'].append(value)
+                columns['percent'].append(int(table.percent[c][r]))
+                columns['raw'].append(code('raw', table.raw[c][r]))
+                columns['footnotes'].append(code('footnotes', ','.join(table.footnotes[c][r])))
+
+    return columns, {name: list(entries) for name, entries in dictionaries.items()}
+
+
+class TableFile:
+    """One filing's columnar tables; columns are decoded on first use"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._data = path.read_bytes()
+        if self._data[:8] != TABLES_MAGIC:
+            raise ValueError(f"Not a table file: {path}")
+        header_len = int.from_bytes(self._data[8:12], 'little')
+        header = json.loads(self._data[12:12 + header_len])
+        self._base = 12 + header_len
+
+        self.document: str = header['document']
+        self.ticker: str = header['ticker']
+        self.tables: List[Dict] = header['tables']
+        self.rows: int = header['rows']
+        self.layout: Dict[str, list] = header['layout']
+        self.dictionaries: Dict[str, List[str]] = header['dictionaries']
+        self._columns: Dict[str, array] = {}
+        self._frames: Optional[List[Dict]] = None
+
+    def column(self, name: str) -> array:
+        if name not in self._columns:
+            typecode, offset, length = self.layout[name]
+            values = array(typecode)
+            start = self._base + offset
+            values.frombytes(self._data[start:start + length])
+            if sys.byteorder != 'little':
+                values.byteswap()
+            self._columns[name] = values
+        return self._columns[name]
+
+    def codes_matching(self, name: str, needle: Optional[str]) -> Optional[Set[int]]:
+        """Dictionary codes whose value contains needle; the dictionary is scanned, not the rows"""
+        if needle is None:
+            return None
+        needle = needle.lower()
+        return {code for code, value in enumerate(self.dictionaries[name]) if needle in value.lower()}
+
+    def frames(self) -> List[Dict]:
+        """Every table as columns of values, blanks as None; the rows are decoded in one pass"""
+        if self._frames is None:
+            frames = [{**meta, 'values': [[None] * len(meta['labels']) for _ in meta['columns']]}
+                      for meta in self.tables]
+            positions = [{name: c for c, name in enumerate(meta['columns'])} for meta in self.tables]
+            names = self.dictionaries['column']
+            for table, row, column, value in zip(self.column('table'), self.column('row'),
+                                                 self.column('column'), self.column('value')):
+                frames[table]['values'][positions[table][names[column]]][row] = value
+            self._frames = frames
+        return self._frames
+
+    def frame(self, t: int) -> Dict:
+        """Table t as columns of values, blanks as None"""
+        return self.frames()[t]
+
+    def extracted(self) -> Dict[str, ExtractedTable]:
+        """citation id -> every table rebuilt as extracted, so unchanged tables can be reused"""
+        tables = [
+            ExtractedTable(
+                citation_id=meta['citation_id'], kind=meta['kind'], unit=meta['unit'], scale=meta['scale'],
+                columns=meta['columns'], labels=meta['labels'],
+                values=[[None] * len(meta['labels']) for _ in meta['columns']],
+                percent=[[False] * len(meta['labels']) for _ in meta['columns']],
+                raw=[[''] * len(meta['labels']) for _ in meta['columns']],
+                footnotes=[[[] for _ in meta['labels']] for _ in meta['columns']],
+                label_footnotes=meta.get('label_footnotes', [[] for _ in meta['labels']]),
+                scale_except=meta.get('scale_except', []),
+            )
+            for meta in self.tables
+        ]
+        positions = [{name: c for c, name in enumerate(t.columns)} for t in tables]
+        names = self.dictionaries['column']
+        raw_values = self.dictionaries['raw']
+        note_values = self.dictionaries['footnotes']
+        for t, row, column, value, percent, raw, notes in zip(
+                self.column('table'), self.column('row'), self.column('column'), self.column('value'),
+                self.column('percent'), self.column('raw'), self.column('footnotes')):
+            table = tables[t]
+            c = positions[t][names[column]]
+            table.values[c][row] = value
+            table.percent[c][row] = bool(percent)
+            table.raw[c][row] = raw_values[raw]
+            table.footnotes[c][row] = [n for n in note_values[notes].split(',') if n]
+        return {table.citation_id: table for table in tables}
+
+
+class TableStore:
+    """Write and query the per-filing columnar table files"""
+
+    def __init__(self, data_dir: Path = Path("data")):
+        self.tables_dir = Path(data_dir) / "tables"
+        self.tables_dir.mkdir(parents=True, exist_ok=True)
+        # path -> (mtime, decoded file)
+        self._files: Dict[str, Tuple[float, TableFile]] = {}
+
+    def path_for(self, ticker: str, document: str) -> Path:
+        return self.tables_dir / ticker / f"{document}.cols"
+
+    def save(self, ticker: str, document: str, tables: List[ExtractedTable]) -> Path:
+        columns, dictionaries = _encode(tables)
+
+        layout = {}
+        offset = 0
+        blobs = []
+        for name, values in columns.items():
+            if sys.byteorder != 'little':
+                values = array(values.typecode, values)
+                values.byteswap()
+            blob = values.tobytes()
+            layout[name] = [values.typecode, offset, len(blob)]
+            blobs.append(blob)
+            offset += len(blob)
+
+        header = json.dumps({
+            'document': document,
+            'ticker': ticker,
+            'tables': [{
+                'citation_id': table.citation_id,
+                'kind': table.kind,
+                'unit': table.unit,
+                'scale': table.scale,
+                'columns': table.columns,
+                'labels': table.labels,
+                'label_footnotes': table.label_footnotes,
+                'scale_except': table.scale_except,
+            } for table in tables],
+            'rows': len(columns['value']),
+            'layout': layout,
+            'dictionaries': dictionaries,
+        }, separators=(',', ':')).encode('utf-8')
+
+        path = self.path_for(ticker, document)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(TABLES_MAGIC)
+            f.write(len(header).to_bytes(4, 'little'))
+            f.write(header)
+            for blob in blobs:
+                f.write(blob)
+        tmp_path.replace(path)
+        return path
+
+    def _open(self, path: Path) -> TableFile:
+        key = str(path)
+        mtime = path.stat().st_mtime
+        cached = self._files.get(key)
+        hit = bool(cached and cached[0] == mtime)
+        record_cache('table_columns', hit)
+        if not hit:
+            cached = (mtime, TableFile(path))
+            self._files[key] = cached
+        return cached[1]
+
+    def _paths(self, tickers: Optional[Iterable[str]] = None) -> List[Path]:
+        if tickers is None:
+            return sorted(self.tables_dir.glob("*/*.cols"))
+        return sorted(p for ticker in tickers for p in (self.tables_dir / ticker).glob("*.cols"))
+
+    def load(self, ticker: str, document: str) -> Optional[Dict[str, ExtractedTable]]:
+        """A filing's tables by citation id; None if never extracted or written by an older extractor"""
+        path = self.path_for(ticker, document)
+        if not path.exists():
+            return None
+        table_file = self._open(path)
+        # Files from before scale exceptions were recorded would carry the wrong scaling forward
+        if any('scale_except' not in meta for meta in table_file.tables):
+            return None
+        return table_file.extracted()
+
+    def tables(self, ticker: str, document: str) -> Optional[List[Dict]]:
+        """Every extracted table of a filing as a frame"""
+        path = self.path_for(ticker, document)
+        if not path.exists():
+            return None
+        return self._open(path).frames()
+
+    def query(self, kind: Optional[str] = None, label: Optional[str] = None,
+              column: Optional[str] = None, tickers: Optional[Iterable[str]] = None,
+              limit: int = 1000) -> List[Dict]:
+        """Numeric cells across filings by table kind, row label and column name (substrings)"""
+        results = []
+        for path in self._paths(tickers):
+            table_file = self._open(path)
+            wanted_tables = {t for t, meta in enumerate(table_file.tables) if kind is None or meta['kind'] == kind}
+            if not wanted_tables:
+                continue
+            labels = table_file.codes_matching('label', label)
+            columns = table_file.codes_matching('column', column)
+            if (labels is not None and not labels) or (columns is not None and not columns):
+                continue
+
+            # Filter on the narrow integer columns first, then fetch values only for hits
+            table_ids = table_file.column('table')
+            label_codes = table_file.column('label')
+            column_codes = table_file.column('column')
+            hits = [
+                i for i in range(table_file.rows)
+                if table_ids[i] in wanted_tables
+                and (labels is None or label_codes[i] in labels)
+                and (columns is None or column_codes[i] in columns)
+            ]
+            if not hits:
+                continue
+
+            values = table_file.column('value')
+            percent = table_file.column('percent')
+            raw = table_file.column('raw')
+            footnotes = table_file.column('footnotes')
+            dictionaries = table_file.dictionaries
+            for i in hits:
+                meta = table_file.tables[table_ids[i]]
+                value = values[i]
+                label_name = dictionaries['label'][label_codes[i]]
+                column_name = dictionaries['column'][column_codes[i]]
+                scale = cell_scale(meta['scale'], meta.get('scale_except', []), label_name, column_name)
+                results.append({
+                    'ticker': table_file.ticker,
+                    'document': table_file.document,
+                    'citation_id': meta['citation_id'],
+                    'kind': meta['kind'],
+                    'label': label_name,
+                    'column': column_name,
+                    'value': value,
+                    'scaled_value': value if percent[i] or math.isnan(value) else value * scale,
+                    'percent': bool(percent[i]),
+                    'raw': dictionaries['raw'][raw[i]],
+                    'footnotes': [n for n in dictionaries['footnotes'][footnotes[i]].split(',') if n],
+                })
+                if len(results) >= limit:
+                    return results
+        return results
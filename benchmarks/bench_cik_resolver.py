@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+CIK resolver lookup latency over a synthetic EDGAR-sized company index
+
+Usage: python benchmarks/bench_cik_resolver.py [--companies N] [--lookups N] [--output results.json]
+"""
+
+import argparse
+import json
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.cik_resolver import CikResolver
+
+WORDS = [
+    'acme', 'global', 'pacific', 'bio', 'therapeutics', 'energy', 'capital', 'digital', 'health',
+    'robotics', 'systems', 'partners', 'holdings', 'acquisition', 'medical', 'networks', 'solar',
+    'semiconductor', 'pharma', 'financial', 'aerospace', 'logistics', 'foods', 'labs', 'genomics',
+]
+SUFFIXES = ['Inc.', 'Corp', 'Ltd', 'Holdings Inc', 'Co., Ltd.', 'plc', 'LLC']
+SYLLABLES = ['ar', 'ba', 'cor', 'di', 'el', 'fa', 'gen', 'hy', 'is', 'jo', 'ka', 'lu', 'mo', 'nex',
+             'or', 'pi', 'qu', 'ra', 'sol', 'ta', 'ul', 'vi', 'wa', 'xo', 'ze']
+
+def synthetic_companies(count: int, rng: random.Random):
+    """EDGAR-like names: a distinctive brand word plus common industry words"""
+    for i in range(count):
+        brand = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 4))).title()
+        industry = ' '.join(rng.choice(WORDS).title() for _ in range(rng.randint(0, 2)))
+        ticker = ''.join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(2, 5)))
+        yield str(1_000_000 + i), ticker, f"{brand} {industry} {rng.choice(SUFFIXES)}"
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--companies", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    resolver = CikResolver(tickers_path="/nonexistent")
+    companies = list(synthetic_companies(args.companies, rng))
+
+    start = time.perf_counter()
+    for cik, ticker, name in companies:
+        resolver.add(cik, ticker, name)
+    build_seconds = time.perf_counter() - start
+
+    queries = rng.sample(companies, min(args.lookups, len(companies)))
+    results = {
+        "benchmark": "cik_resolver",
+        "companies": len(companies),
+        "lookups": len(queries),
+        "build_seconds": round(build_seconds, 3),
+        "modes": {}
+    }
+
+    modes = {
+        # Calendar rows usually carry both; renamed/unlisted issuers only a name
+        "ticker+name": lambda c: resolver.resolve(c[1], c[2]),
+        "name_only": lambda c: resolver.resolve(None, c[2].replace(',', '').lower()),
+    }
+    for mode, lookup in modes.items():
+        timings = []
+        hits = 0
+        for company in queries:
+            start = time.perf_counter()
+            resolution = lookup(company)
+            timings.append((time.perf_counter() - start) * 1e6)
+            match = resolution['candidates'][0] if resolution['candidates'] else None
+            hits += bool(match and match['cik'] == company[0].zfill(10))
+
+        results["modes"][mode] = {
+            "p50_us": round(percentile(timings, 0.50), 1),
+            "p99_us": round(percentile(timings, 0.99), 1),
+            "top1_accuracy": round(hits / len(queries), 4),
+        }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
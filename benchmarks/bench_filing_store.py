@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Filing store compression ratio and decode throughput vs plain files
+
+Usage: python benchmarks/bench_filing_store.py [--repeat N] [--output results.json]
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services import filing_store
+from backend.services.filing_store import FilingStore
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def build_store(root: Path, filings_dir: Path, codec: str, use_dictionary: bool) -> FilingStore:
+    """Copy the corpus into a scratch data dir and import it"""
+    data_dir = root / f"{codec}-{'dict' if use_dictionary else 'plain'}"
+    shutil.copytree(filings_dir, data_dir / "ipo_filings")
+
+    store = FilingStore(data_dir)
+    store.codec = codec
+    if use_dictionary:
+        store.train_dictionary([p.read_bytes() for p in sorted(store.filings_dir.rglob("*.html"))])
+
+    start = time.perf_counter()
+    store.import_filings(remove_originals=True)
+    store.compress_seconds = time.perf_counter() - start
+    return store
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filings-dir", default="data/ipo_filings")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    filings_dir = Path(args.filings_dir)
+    paths = [p for p in sorted(filings_dir.rglob("*.html")) if not p.stem.endswith('_cited')]
+    raw_bytes = sum(p.stat().st_size for p in paths)
+    mb = raw_bytes / 1e6
+
+    def read_plain():
+        for p in paths:
+            p.read_bytes()
+
+    results = {
+        "benchmark": "filing_store",
+        "files": len(paths),
+        "raw_mb": round(mb, 2),
+        "plain_read_mb_per_s": round(mb / best_of(read_plain, args.repeat), 1),
+        "variants": {}
+    }
+
+    codecs = ["zlib"] + (["zstd"] if filing_store.zstandard is not None else [])
+    with tempfile.TemporaryDirectory() as tmp:
+        for codec in codecs:
+            for use_dictionary in (False, True):
+                store = build_store(Path(tmp), filings_dir, codec, use_dictionary)
+                keys = store.keys()
+
+                def read_all():
+                    for key in keys:
+                        store.read_bytes(key)
+
+                def stream_all():
+                    for key in keys:
+                        for _ in store.iter_chunks(key):
+                            pass
+
+                stats = store.stats()
+                results["variants"][f"{codec}{'+dict' if use_dictionary else ''}"] = {
+                    "stored_mb": round(stats["stored_bytes"] / 1e6, 3),
+                    "ratio": stats["ratio"],
+                    "unique_objects": stats["objects"],
+                    "compress_mb_per_s": round(mb / store.compress_seconds, 1),
+                    "decode_mb_per_s": round(mb / best_of(read_all, args.repeat), 1),
+                    "stream_mb_per_s": round(mb / best_of(stream_all, args.repeat), 1),
+                }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+In-process ASGI load test for /api/calendar, /api/company/{ticker} and /ws/chat
+
+Usage: python benchmarks/bench_load.py [--listings N] [--requests N] [--concurrency N] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.generators import build_workspace, workspace
+from benchmarks.harness import percentile, write_results
+
+async def load_http(client, paths, requests: int, concurrency: int) -> dict:
+    """Closed-loop load: `concurrency` clients issue `requests` requests in total"""
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(paths[i % len(paths)])
+
+    async def client_loop():
+        nonlocal errors
+        while not queue.empty():
+            path = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': errors,
+        'throughput_rps': round(requests / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1e3, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1e3, 3),
+        'max_ms': round(max(latencies) * 1e3, 3),
+    }
+
+def load_websocket(app, sessions: int, messages: int) -> dict:
+    """Round-trip latency of chat messages over `sessions` sequential connections"""
+    from fastapi.testclient import TestClient
+
+    latencies = []
+    start = time.perf_counter()
+    with TestClient(app) as client:
+        for session in range(sessions):
+            with client.websocket_connect(f"/ws/chat/BENCH-{session % 4}/S-1_2025-01-01.html") as ws:
+                for i in range(messages):
+                    sent = time.perf_counter()
+                    ws.send_text(json.dumps({"text": f"What is the lock-up period? ({i})"}))
+                    ws.receive_json()
+                    latencies.append(time.perf_counter() - sent)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'sessions': sessions,
+        'messages': sessions * messages,
+        'throughput_mps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1e3, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1e3, 3),
+        'max_ms': round(max(latencies) * 1e3, 3),
+    }
+
+async def load_all(app, tickers, args) -> dict:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return {
+            '/api/calendar': await load_http(client, ["/api/calendar"], args.requests, args.concurrency),
+            '/api/company/{ticker}': await load_http(
+                client, [f"/api/company/{t}" for t in tickers], args.requests, args.concurrency),
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listings", type=int, default=1_000)
+    parser.add_argument("--companies", type=int, default=20, help="Listings that get synthetic filings")
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--ws-sessions", type=int, default=20)
+    parser.add_argument("--ws-messages", type=int, default=50)
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = build_workspace(Path(tmp), listings=args.listings, companies=args.companies)
+        with workspace(root):
+            # Services resolve data/ at import time, so the app is imported inside the workspace
+            from backend.main import app
+
+            calendar = json.loads(Path("data/ipo_calendar.json").read_text())
+            tickers = [l['ticker'] for l in calendar['listings'][:max(1, args.companies)]]
+
+            results = {
+                'benchmark': 'load',
+                'listings': args.listings,
+                'http': asyncio.run(load_all(app, tickers, args)),
+                'websocket': {'/ws/chat/{ticker}/{filename}': load_websocket(app, args.ws_sessions, args.ws_messages)},
+            }
+
+    write_results(results, args.output)
+
+if __name__ == "__main__":
+    main()
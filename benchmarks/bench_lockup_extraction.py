@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Lock-up extraction throughput over data/ipo_filings
+
+Usage: python benchmarks/bench_lockup_extraction.py [--repeat N] [--output results.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.filing_text import iter_blocks
+from backend.services.lockup_service import extract_lockups
+
+def load_corpus(filings_dir: Path):
+    """(name, html) for every original filing"""
+    corpus = []
+    for path in sorted(filings_dir.rglob("*.html")):
+        if path.stem.endswith('_cited'):
+            continue
+        corpus.append((path.relative_to(filings_dir).as_posix(),
+                       path.read_text(encoding='utf-8', errors='replace')))
+    return corpus
+
+def bench(fn, corpus, repeat):
+    """Best-of-N wall time for running fn over the whole corpus"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for name, raw_html in corpus:
+            fn(raw_html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filings-dir", default="data/ipo_filings")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    corpus = load_corpus(Path(args.filings_dir))
+    total_bytes = sum(len(raw_html.encode('utf-8')) for _, raw_html in corpus)
+    mb = total_bytes / 1e6
+
+    results = {
+        "benchmark": "lockup_extraction",
+        "files": len(corpus),
+        "corpus_mb": round(mb, 2),
+        "stages": {}
+    }
+
+    stages = {
+        "tokenize_blocks": lambda raw_html: sum(1 for _ in iter_blocks(raw_html)),
+        "extract_lockups": extract_lockups,
+    }
+    for stage, fn in stages.items():
+        seconds = bench(fn, corpus, args.repeat)
+        results["stages"][stage] = {
+            "seconds": round(seconds, 4),
+            "mb_per_s": round(mb / seconds, 2),
+            "files_per_s": round(len(corpus) / seconds, 1),
+        }
+
+    # Per-file results so regressions in recall show up next to speed
+    results["periods"] = {
+        name: sorted({c.days for c in extract_lockups(raw_html)})
+        for name, raw_html in corpus
+    }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
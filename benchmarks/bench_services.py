@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Service micro-benchmarks over synthetic calendars, filings and citation indices
+
+Usage: python benchmarks/bench_services.py [--max-listings N] [--repeat N] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.filing_manifest import document_key
+from benchmarks.generators import build_workspace, sizes_between, synthetic_filing, workspace
+from benchmarks.harness import peak_alloc_mb, run, summarize, write_results
+
+def bench_calendar(root: Path, sizes, repeat: int) -> dict:
+    """Listings read cold (store/JSON parse) and warm (from the snapshot), plus format_ipo_for_display"""
+    from backend.services.calendar_snapshot import format_ipo_for_display
+    from backend.services.data_service import DataService
+
+    results = {}
+    for size in sizes:
+        case = root / f"calendar-{size}"
+        build_workspace(case, listings=size)
+        with workspace(case):
+            service = DataService()
+            # Bigger calendars get fewer repeats so 10^6 stays practical
+            reps = max(3, repeat // max(1, size // 10_000))
+
+            listings = service.get_ipo_calendar()
+            results[str(size)] = {
+                'get_ipo_calendar_cold': summarize(run(service._read_listings, reps), size),
+                'get_ipo_calendar_warm': summarize(run(service.get_ipo_calendar, reps), size),
+                'format_ipo_for_display': summarize(
+                    run(lambda: [format_ipo_for_display(ipo) for ipo in listings], reps), size),
+                'peak_alloc_mb': peak_alloc_mb(service._read_listings),
+            }
+        shutil.rmtree(case)
+    return results
+
+def bench_citations(root: Path, paragraph_counts, repeat: int) -> dict:
+    """CitationService.process_document and citation search by filing size"""
+    from backend.services.citation_service import CitationService
+
+    results = {}
+    for paragraphs in paragraph_counts:
+        case = root / f"citations-{paragraphs}"
+        build_workspace(case, listings=1)
+        with workspace(case):
+            filing = Path("data/ipo_filings/BENCH/S-1_2025-01-01.html")
+            filing.parent.mkdir(parents=True, exist_ok=True)
+            filing.write_text(synthetic_filing(paragraphs, seed=paragraphs), encoding='utf-8')
+            size_mb = filing.stat().st_size / 1e6
+
+            service = CitationService()
+            process = lambda: asyncio.run(service.process_document(str(filing)))
+            timings = run(process, max(3, repeat // 4))
+            total = process()['total']
+
+            key = document_key(filing)
+            citations = service._read_index(key)
+            probes = [c['text'][:30] for c in citations[::max(1, len(citations) // 20)]] + ["no such phrase"]
+            search = lambda: [service.find_citation_by_text(key, probe) for probe in probes]
+
+            results[str(paragraphs)] = {
+                'filing_mb': round(size_mb, 3),
+                'citations': total,
+                'process_document': {**summarize(timings), 'mb_per_s': round(size_mb / min(timings), 2)},
+                'process_document_peak_alloc_mb': peak_alloc_mb(process),
+                'find_citation_by_text': summarize(run(search, repeat), len(probes)),
+            }
+        shutil.rmtree(case)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--min-listings", type=int, default=100)
+    parser.add_argument("--max-listings", type=int, default=10_000,
+                        help="Largest synthetic calendar (up to 1000000)")
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=[200, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        results = {
+            'benchmark': 'services',
+            'calendar': bench_calendar(root, sizes_between(args.min_listings, args.max_listings), args.repeat),
+            'citations': bench_citations(root, args.paragraphs, args.repeat),
+        }
+
+    write_results(results, args.output)
+
+if __name__ == "__main__":
+    main()
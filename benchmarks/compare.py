@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark result files and flag regressions
+
+Usage: python benchmarks/compare.py baseline.json current.json [--threshold 0.1]
+
+Exits 1 if any throughput metric dropped, or any latency/memory metric grew, by more than
+the threshold.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+# Metric name suffix -> True if bigger is better
+DIRECTIONS = {
+    '_per_s': True,
+    '_rps': True,
+    '_mps': True,
+    'p50_ms': False,
+    'p99_ms': False,
+    'peak_alloc_mb': False,
+    'peak_rss_mb': False,
+}
+
+def flatten(results: Dict, prefix: str = '') -> Iterator[Tuple[str, float]]:
+    for key, value in results.items():
+        if key == 'environment':
+            continue
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, path)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, float(value)
+
+def direction(path: str):
+    for suffix, higher_is_better in DIRECTIONS.items():
+        if path.endswith(suffix):
+            return higher_is_better
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed relative change (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    baseline = dict(flatten(json.loads(Path(args.baseline).read_text())))
+    current = dict(flatten(json.loads(Path(args.current).read_text())))
+
+    regressions = 0
+    for path in sorted(baseline.keys() & current.keys()):
+        higher_is_better = direction(path)
+        old, new = baseline[path], current[path]
+        if higher_is_better is None or old == 0:
+            continue
+
+        change = (new - old) / old
+        worse = change < -args.threshold if higher_is_better else change > args.threshold
+        if worse:
+            regressions += 1
+        marker = 'REGRESSION' if worse else ''
+        print(f"{path:<70} {old:>12.3f} -> {new:>12.3f} {change:+7.1%} {marker}")
+
+    print(f"\n{regressions} regression(s) beyond {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
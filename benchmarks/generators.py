@@ -0,0 +1,190 @@
+"""
+Synthetic data generators for benchmarks - calendars, filings and citation indices
+
+Output uses the same layouts as the real files under data/ so services read it unchanged.
+Everything is seeded, so a given size always produces the same bytes.
+"""
+
+import json
+import os
+import random
+import string
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+WORDS = (
+    'company offering shares common stock underwriters proceeds capital market risk business '
+    'revenue growth customers product technology operations management board directors '
+    'holders lock-up period days prospectus registration statement securities exchange '
+    'nasdaq price per share dilution net loss fiscal year financial results agreement'
+).split()
+
+EXCHANGES = ['NASDAQ', 'NYSE', 'NYSE American', 'NASDAQ Capital']
+STATUSES = ['Expected', 'Priced', 'Filed', 'Postponed']
+MANAGERS = ['Goldman Sachs', 'Morgan Stanley', 'J.P. Morgan', 'BofA Securities', 'Cantor', 'BTIG',
+            'Mizuho', 'Jefferies', 'Citigroup', 'Needham']
+SECTIONS = ['Prospectus Summary', 'Risk Factors', 'Use of Proceeds', 'Capitalization', 'Dilution',
+            'Management', 'Principal Stockholders', 'Shares Eligible for Future Sale', 'Underwriting']
+
+
+def _ticker(i: int) -> str:
+    """Unique 3-5 letter ticker for listing i"""
+    letters = string.ascii_uppercase
+    ticker = ''
+    i += 26 * 26
+    while i:
+        i, rem = divmod(i, 26)
+        ticker = letters[rem] + ticker
+    return ticker
+
+
+def synthetic_listing(i: int, rng: random.Random) -> Dict:
+    """One listing shaped like data/ipo_calendar.json entries"""
+    low = round(rng.uniform(4, 30), 1)
+    high = round(low + rng.choice([0, 1, 2, 3]), 1)
+    shares = round(rng.uniform(1, 40), 1)
+    status = rng.choice(STATUSES)
+    expected = (date(2025, 1, 1) + timedelta(days=rng.randint(0, 365))).isoformat()
+    return {
+        'company': f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i} Holdings, Inc.",
+        'ticker': _ticker(i),
+        'lead_managers': '/'.join(rng.sample(MANAGERS, rng.randint(1, 4))),
+        'shares_millions': shares,
+        'price_low': low,
+        'price_high': high,
+        'volume': f"$ {shares * high:.1f} mil",
+        'expected_date': 'Priced' if status == 'Priced' else expected,
+        'scoop_rating': rng.choice(['S/O', '1', '2', '3', '4', '5']),
+        'status': status,
+        'exchange': rng.choice(EXCHANGES),
+        'lockup': '180 days',
+        'documents': 0,
+        'filing_count': 0,
+        'last_updated': datetime(2025, 6, 14, tzinfo=timezone.utc).isoformat(),
+        'price_range': f"${low}" if low == high else f"${low} - ${high}",
+    }
+
+
+def synthetic_calendar(size: int, seed: int = 0) -> Dict:
+    """A whole ipo_calendar.json document with `size` listings"""
+    rng = random.Random(seed)
+    listings = [synthetic_listing(i, rng) for i in range(size)]
+    return {
+        'total': size,
+        'source': 'synthetic',
+        'updated': datetime(2025, 6, 14, tzinfo=timezone.utc).isoformat(),
+        'listings': listings,
+    }
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def synthetic_filing(paragraphs: int, seed: int = 0, company: str = "Synthetic Holdings, Inc.") -> str:
+    """S-1-like HTML: headings, paragraphs, lists, tables and page footers"""
+    rng = random.Random(seed)
+    parts = [f"<html><head><title>{company} S-1</title></head><body>",
+             f"<h1>{company}</h1>"]
+    page = 1
+    for i in range(paragraphs):
+        if i % 40 == 0:
+            parts.append(f"<h2>{SECTIONS[(i // 40) % len(SECTIONS)]}</h2>")
+        if i % 25 == 24:
+            page += 1
+            parts.append(f"<p>Page {page}</p>")
+
+        kind = rng.random()
+        if kind < 0.08:
+            rows = ''.join(
+                f"<tr><td>{rng.choice(WORDS).title()}</td><td>${rng.randint(1, 900):,}.{rng.randint(0, 9)}</td>"
+                f"<td>({rng.randint(1, 90):,})</td></tr>"
+                for _ in range(rng.randint(3, 12))
+            )
+            parts.append(f"<table>{rows}</table>")
+        elif kind < 0.2:
+            items = ''.join(f"<li>{_sentence(rng, rng.randint(6, 20))}</li>" for _ in range(rng.randint(2, 6)))
+            parts.append(f"<ul>{items}</ul>")
+        elif i == paragraphs // 2:
+            parts.append("<p>We, our directors and executive officers have agreed with the underwriters, "
+                         "subject to certain exceptions, not to sell any shares of common stock for a period "
+                         "of 180 days after the date of this prospectus.</p>")
+        else:
+            parts.append(f"<p>{' '.join(_sentence(rng, rng.randint(8, 30)) for _ in range(rng.randint(1, 5)))}</p>")
+
+    parts.append("</body></html>")
+    return '\n'.join(parts)
+
+
+def synthetic_citation_index(doc_name: str, size: int, seed: int = 0) -> Dict:
+    """A *_citations.json document with `size` citations"""
+    rng = random.Random(seed)
+    citations = []
+    for idx in range(size):
+        text = _sentence(rng, rng.randint(8, 40))
+        citations.append({
+            'id': f"cite-{rng.getrandbits(48):012x}",
+            'text': text[:200] + "..." if len(text) > 200 else text,
+            'type': 'p',
+            'page': 1 + idx // 25,
+            'position': idx * 100,
+            'tag': 'p',
+        })
+    return {
+        'document': doc_name,
+        'total_citations': size,
+        'citations': citations,
+        'processed_date': datetime(2025, 6, 14, tzinfo=timezone.utc).isoformat(),
+    }
+
+
+def build_workspace(root: Path, listings: int = 100, companies: int = 0, filings_per_company: int = 2,
+                    paragraphs: int = 400, citations: Optional[int] = None, seed: int = 0) -> Path:
+    """Populate root/data like a real checkout; services run against it after chdir(root)"""
+    root = Path(root)
+    data_dir = root / "data"
+    (data_dir / "indices").mkdir(parents=True, exist_ok=True)
+
+    calendar = synthetic_calendar(listings, seed)
+    (data_dir / "ipo_calendar.json").write_text(json.dumps(calendar), encoding='utf-8')
+
+    for c in range(min(companies, listings)):
+        listing = calendar['listings'][c]
+        company_dir = data_dir / "ipo_filings" / listing['ticker']
+        company_dir.mkdir(parents=True, exist_ok=True)
+        for f in range(filings_per_company):
+            name = f"S-1_2025-{1 + f % 12:02d}-{1 + c % 28:02d}.html" if f % 2 == 0 else f"424B4_2025-{1 + f % 12:02d}-15.html"
+            html = synthetic_filing(paragraphs, seed + c * 1000 + f, listing['company'])
+            (company_dir / name).write_text(html, encoding='utf-8')
+
+            if citations:
+                key = f"{listing['ticker']}/{Path(name).stem}"
+                index = synthetic_citation_index(key, citations, seed + f)
+                (data_dir / "indices" / listing['ticker']).mkdir(parents=True, exist_ok=True)
+                (data_dir / "indices" / f"{key}_citations.json").write_text(
+                    json.dumps(index), encoding='utf-8')
+
+    return root
+
+
+@contextmanager
+def workspace(root: Path) -> Iterator[Path]:
+    """Run with root as the working directory (services resolve data/ relative to it)"""
+    previous = os.getcwd()
+    os.chdir(root)
+    try:
+        yield Path(root)
+    finally:
+        os.chdir(previous)
+
+
+def sizes_between(smallest: int, largest: int) -> List[int]:
+    """Powers of ten from smallest to largest: 100, 1000, ..."""
+    sizes = []
+    size = smallest
+    while size <= largest:
+        sizes.append(size)
+        size *= 10
+    return sizes
@@ -0,0 +1,92 @@
+"""
+Benchmark harness - timing, percentiles, memory and JSON result files
+"""
+
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile, pct in [0, 100]"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summarize(samples: List[float], items: int = 1) -> Dict[str, float]:
+    """Latency percentiles in ms and throughput for per-call wall times in seconds"""
+    total = sum(samples)
+    return {
+        'calls': len(samples),
+        'mean_ms': round(total / len(samples) * 1e3, 4) if samples else 0.0,
+        'p50_ms': round(percentile(samples, 50) * 1e3, 4),
+        'p99_ms': round(percentile(samples, 99) * 1e3, 4),
+        'max_ms': round(max(samples) * 1e3, 4) if samples else 0.0,
+        'items_per_s': round(len(samples) * items / total, 1) if total else 0.0,
+    }
+
+
+def run(fn: Callable[[], object], repeat: int = 20, warmup: int = 1) -> List[float]:
+    """Per-call wall times in seconds"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def peak_alloc_mb(fn: Callable[[], object]) -> float:
+    """Peak Python heap growth of one call (traced separately so timings stay untraced)"""
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1e6, 3)
+
+
+def peak_rss_mb() -> float:
+    """Process high-water RSS so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (1e6 if sys.platform == 'darwin' else 1e3), 1)
+
+
+def environment() -> Dict[str, Optional[str]]:
+    """Enough context to tell two result files apart"""
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                  capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        revision = None
+    return {
+        'revision': revision,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def write_results(results: Dict, output: Optional[str]):
+    """Print results and optionally save them for compare.py"""
+    results = {**results, 'environment': environment(), 'peak_rss_mb': peak_rss_mb()}
+    text = json.dumps(results, indent=2)
+    print(text)
+    if output:
+        Path(output).write_text(text)
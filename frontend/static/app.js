@@ -15,8 +15,8 @@ class HedgeAPI {
         return response.json();
     }
     
-    connectChat(docId) {
-        this.ws = new WebSocket(`ws://localhost:8000/ws/chat/${docId}`);
+    connectChat(ticker, filename) {
+        this.ws = new WebSocket(`ws://localhost:8000/ws/chat/${ticker}/${filename}`);
         return this.ws;
     }
 }
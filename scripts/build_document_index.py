@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Rebuild the document index without SEC page chrome or repeated sections
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.data_service import DataService
+from backend.services.filing_store import FilingStore
+from backend.services.index_service import IndexService, sections_from_filing
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact the document index")
+    parser.add_argument("--index", default="data/indexed_documents/document_index.json")
+    parser.add_argument("--output", help="Write somewhere other than --index")
+    parser.add_argument("--filings", action="store_true", help="Also index data/ipo_filings")
+    parser.add_argument("--dry-run", action="store_true", help="Report stats without writing")
+    args = parser.parse_args()
+
+    index = IndexService(args.index)
+    sections = index.load()
+    print(f"📄 Loaded {len(sections)} sections from {args.index}")
+
+    if args.filings:
+        data_service = DataService()
+        store = FilingStore()
+        indexed = {s['document'] for s in sections}
+        for filing in data_service.get_filings():
+            if filing['path'] in indexed:
+                continue
+            sections.extend(sections_from_filing(
+                Path(filing['path']), filing['ticker'],
+                filing['form_type'], filing['filing_date'] or "Unknown", store
+            ))
+        print(f"📄 {len(sections)} sections after adding filings")
+
+    stats = index.ingest(sections)
+    print(json.dumps(stats, indent=2))
+
+    if not args.dry_run:
+        if args.output:
+            index.index_path = Path(args.output)
+        index.save()
+        print(f"💾 Saved to {index.index_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Move data/ipo_filings into the compressed, content-addressed filing store
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.filing_store import FilingStore
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress filings into data/filing_store")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--retrain", action="store_true", help="Train a new dictionary first")
+    parser.add_argument("--remove-originals", action="store_true",
+                        help="Delete plain HTML once stored (reads fall back to the store)")
+    args = parser.parse_args()
+
+    store = FilingStore(args.data_dir)
+    print(f"🗜️  Codec: {store.codec}")
+
+    if args.retrain or not store.active_dictionary:
+        documents = [
+            p.read_bytes() for p in sorted(store.filings_dir.rglob("*.html"))
+            if not p.stem.endswith('_cited')
+        ]
+        dictionary_id = store.train_dictionary(documents)
+        print(f"📚 Trained dictionary {dictionary_id} on {len(documents)} filings")
+
+    result = store.import_filings(remove_originals=args.remove_originals)
+    print(f"✅ Stored {result['stored']} filings as {result['objects']} unique objects")
+    print(json.dumps(store.stats(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Extract lock-up periods from new or changed prospectus filings
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.data_service import DataService
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract lock-up periods from filings")
+    parser.add_argument("--force", action="store_true", help="Re-extract every filing")
+    args = parser.parse_args()
+
+    data_service = DataService()
+    stats = data_service.lockups.extract_new(force=args.force)
+
+    print(f"\n✅ Processed {stats['processed']} filings ({stats['skipped']} unchanged)")
+    for ticker, period in sorted(data_service.get_lockup_periods().items()):
+        print(f"  {ticker}: {period}")
+
+if __name__ == "__main__":
+    main()
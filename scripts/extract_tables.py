@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Process prospectus filings so their tables land in the columnar table store
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.citation_service import CitationService
+from backend.services.data_service import DataService
+from backend.services.lockup_service import LOCKUP_FORMS
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract filing tables into data/tables")
+    parser.add_argument("--ticker", help="Only this company's filings")
+    parser.add_argument("--force", action="store_true", help="Re-process filings already extracted")
+    args = parser.parse_args()
+
+    data_service = DataService()
+    citation_service = CitationService()
+
+    processed = 0
+    for filing in data_service.get_filings(ticker=args.ticker):
+        path = Path(filing['path'])
+        # Offering tables (proceeds, dilution, capitalization) only appear in prospectuses
+        if filing['form_type'] not in LOCKUP_FORMS or path.stem.endswith('_cited'):
+            continue
+        if not args.force and citation_service.tables.path_for(path.parent.name, path.stem).exists():
+            continue
+        result = asyncio.run(citation_service.process_document(str(path)))
+        processed += 1
+        print(f"  {path.parent.name}/{path.name}: {result['tables']} tables")
+
+    print(f"\n✅ Processed {processed} filings")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Import the JSON data files (calendar, profiles, watchlists, alerts) into SQLite
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.storage import DEFAULT_DB_PATH, Storage
+
+def main():
+    parser = argparse.ArgumentParser(description="Import data/*.json into the SQLite store")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    args = parser.parse_args()
+
+    storage = Storage(args.db)
+    counts = storage.import_json(args.data_dir)
+    print(f"✅ Imported into {args.db} (safe to re-run)")
+    print(json.dumps(counts, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Run background job workers outside the API process
+"""
+
+import argparse
+import signal
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import backend.services.job_handlers  # noqa: F401  (registers the job kinds)
+from backend.services.job_queue import DEFAULT_DB_PATH, JobQueue, WorkerPool
+
+def main():
+    parser = argparse.ArgumentParser(description="Process queued jobs from data/jobs.db")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--cpu", type=int, default=2, help="Process-pool workers for CPU-bound jobs")
+    parser.add_argument("--io", type=int, default=4, help="Threads for IO-bound jobs")
+    args = parser.parse_args()
+
+    pool = WorkerPool(JobQueue(args.db), cpu_workers=args.cpu, io_workers=args.io)
+    stopped = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+
+    pool.start()
+    print(f"⚙️  Workers running (cpu={args.cpu}, io={args.io}); Ctrl+C to stop")
+    stopped.wait()
+    pool.stop()
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,18 @@ Author: thorrobber22
 import httpx
 from bs4 import BeautifulSoup
 import json
+import os
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 import asyncio
 import re
 from typing import Optional, Dict, List
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.storage import Storage
+
 class IPOScoopScraper:
     """Scrape complete IPO data from IPOScoop"""
     
@@ -209,6 +215,13 @@ class IPOScoopScraper:
             json.dump(output, f, indent=2)
         
         print(f"\n💾 Saved to {output_path}")
+        
+        # Keep the SQLite store current as well; the API keeps reading while this commits
+        db_path = os.getenv("DATABASE_PATH", str(self.data_dir / "hedge.db"))
+        if Storage.exists(db_path):
+            Storage(db_path).upsert_listings(ipos)
+            print(f"💾 Upserted {len(ipos)} listings into {db_path}")
+        
         return str(output_path)
 
 async def main():
@@ -0,0 +1,77 @@
+"""
+Answer cache: near-match lookups and retiring answers whose cited blocks changed
+"""
+
+import pytest
+
+from backend.services.answer_cache import AnswerCache
+
+DOCUMENT = "AIRO/S-1_20250221"
+CITED = 'cite-000000000000'
+CURRENT_IDS = {CITED, 'cite-111111111111'}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AnswerCache(str(tmp_path / "answers.db"))
+
+
+def _store(cache, question, cited=CITED):
+    cache.store(DOCUMENT, question, f"Answer to: {question}", [{'id': cited, 'text': 'excerpt'}])
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("What was revenue in 2024?", "What was revenue in 2023?"),
+    ("net loss 2024", "net income 2024"),
+    ("lockup period", "lockup period for directors"),
+    ("lockup period for directors", "lockup period"),
+    ("did Alpha acquire Beta", "did Beta acquire Alpha"),
+])
+def test_different_questions_do_not_match(cache, cached, asked):
+    _store(cache, cached)
+    assert cache.lookup(DOCUMENT, asked, CURRENT_IDS) is None
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("What is the lock-up period?", "what's the lockup period"),
+    ("How long is the lockup period?", "The lockup period is how long?"),
+    ("who are the underwriters", "who is the underwriter"),
+    ("what is the lockup period", "lockup period?"),
+])
+def test_rewordings_match(cache, cached, asked):
+    _store(cache, cached)
+    answer = cache.lookup(DOCUMENT, asked, CURRENT_IDS)
+    assert answer is not None
+    assert answer['question'] == cached
+
+
+def test_exact_match_ignores_case_and_punctuation(cache):
+    _store(cache, "What was revenue in 2024?")
+    answer = cache.lookup(DOCUMENT, "what was REVENUE in 2024", CURRENT_IDS)
+    assert answer['match'] == 'exact'
+
+
+def test_answer_citing_a_removed_block_is_not_served(cache):
+    _store(cache, "What is the lock-up period?")
+    assert cache.lookup(DOCUMENT, "What is the lock-up period?", {'cite-111111111111'}) is None
+    # ...and is gone even if the block comes back
+    assert cache.lookup(DOCUMENT, "What is the lock-up period?", CURRENT_IDS) is None
+
+
+def test_invalidate_retires_only_answers_citing_removed_blocks(cache):
+    _store(cache, "What is the lock-up period?", cited=CITED)
+    _store(cache, "Who are the underwriters?", cited='cite-111111111111')
+    assert cache.invalidate(DOCUMENT, [CITED]) == 1
+    assert cache.lookup(DOCUMENT, "What is the lock-up period?", CURRENT_IDS) is None
+    assert cache.lookup(DOCUMENT, "Who are the underwriters?", CURRENT_IDS) is not None
+
+
+def test_answers_stored_after_an_invalidation_are_found(cache):
+    # Deleting the newest row must not hide the next one from a long-lived index
+    _store(cache, "What is the lock-up period?", cited=CITED)
+    _store(cache, "Who are the underwriters?", cited='cite-111111111111')
+    assert cache.lookup(DOCUMENT, "What is the lock-up period?", CURRENT_IDS) is not None
+    cache.invalidate(DOCUMENT, ['cite-111111111111'])
+    _store(cache, "What is the offering price?", cited=CITED)
+    assert cache.lookup(DOCUMENT, "What is the offering price?", CURRENT_IDS) is not None
+    assert cache.lookup(DOCUMENT, "Who are the underwriters?", CURRENT_IDS) is None
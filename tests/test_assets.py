@@ -0,0 +1,29 @@
+"""
+Conditional requests: If-None-Match lists and per-encoding entity tags
+"""
+
+import pytest
+
+from backend.core.assets import Asset, encoded_etag, etag_matches
+
+
+@pytest.mark.parametrize("if_none_match, matches", [
+    ('"abc"', True),
+    ('"zzz", "abc"', True),
+    ('W/"abc"', True),
+    ('*', True),
+    ('', False),
+    ('"abc-gzip"', False),
+    ('"xabcx"', False),
+    ('"ab", "c"', False),
+])
+def test_etag_matches_whole_tags_only(if_none_match, matches):
+    assert etag_matches(if_none_match, '"abc"') is matches
+
+
+def test_each_encoding_has_its_own_etag():
+    asset = Asset("css/styles.css", b"body { color: red; }\n" * 100)
+    assert set(asset.variants) >= {"identity", "gzip"}
+    assert asset.etags["identity"] == f'"{asset.digest}"'
+    assert asset.etags["gzip"] == f'"{asset.digest}-gzip"'
+    assert encoded_etag('W/"abc"', "br") == 'W/"abc-br"'
@@ -0,0 +1,89 @@
+"""
+Citation processing: incremental re-citation must match processing the filing from scratch
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from backend.services.citation_service import CitationService
+from backend.services.table_store import TableStore
+
+DOCUMENT = "data/ipo_filings/TEST/S-1_20250101.html"
+
+FILLER = ''.join(f"<p>Paragraph {n} of the prospectus.</p>\n<p>&nbsp;</p>\n" for n in range(30))
+
+FILING = """<html><head><title>S-1</title><style>p { margin: 0 }</style></head><body><div>
+<p>Prospectus summary</p>
+<P>An unclosed paragraph on page 3
+<p>Risk factors</p>
+<p><b>Capitalization</b></p>
+<p>(in thousands)</p>
+%(before_table)s<table><tr><td></td><td>2024</td><td>2023</td></tr>
+<tr><td>Revenue</td><td>1,200</td><td>900</td></tr>
+<tr><td>Net loss</td><td>(300)</td><td>(200)</td></tr></table>
+%(filler)s
+<ul><li>First item</li><li>Second item</li></ul>
+<p>Repeated</p>
+</div></body></html>"""
+
+
+def _filing(**changes) -> str:
+    return FILING % {'before_table': '', 'filler': FILLER, **changes}
+
+
+def _process(root: Path, versions, monkeypatch) -> dict:
+    """Process each version in turn under root; the outputs of the last one"""
+    root.mkdir()
+    monkeypatch.chdir(root)
+    Path(DOCUMENT).parent.mkdir(parents=True)
+    service = CitationService()
+    for text in versions:
+        Path(DOCUMENT).write_text(text, encoding='utf-8')
+        result = asyncio.run(service.process_document(DOCUMENT))
+
+    indices = Path("data/indices/TEST")
+    return {
+        'result': result,
+        'cited': Path(DOCUMENT.replace('.html', '_cited.html')).read_bytes(),
+        'citations': json.loads((indices / "S-1_20250101_citations.json").read_text())['citations'],
+        'offsets': json.loads((indices / "S-1_20250101_offsets.json").read_text()),
+        'blocks': json.loads((indices / "S-1_20250101_blocks.json").read_text()),
+        'tables': TableStore().load("TEST", "S-1_20250101"),
+    }
+
+
+@pytest.mark.parametrize("edited", [
+    _filing(filler=FILLER.replace("Paragraph 12 of", "Paragraph twelve of")),
+    _filing(filler=FILLER.replace("<p>Paragraph 20 of the prospectus.</p>\n", "")),
+    # A duplicate ahead of the original renumbers it
+    _filing(filler="<p>Repeated</p>\n" + FILLER),
+    # A new heading changes the table's kind without touching the table
+    _filing(before_table="<p><b>Dilution</b></p>\n"),
+], ids=['reworded', 'deleted', 'duplicated', 'new heading'])
+def test_incremental_matches_full_processing(tmp_path, monkeypatch, edited):
+    incremental = _process(tmp_path / "incremental", [_filing(), edited], monkeypatch)
+    full = _process(tmp_path / "full", [edited], monkeypatch)
+
+    for key in ('cited', 'citations', 'offsets', 'blocks'):
+        assert incremental[key] == full[key], key
+    assert incremental['tables'] == full['tables']
+    assert [t.kind for t in full['tables'].values()] == (['dilution'] if 'Dilution' in edited else ['capitalization'])
+    revision = incremental['result']['revision']
+    assert revision['blocks_parsed'] < revision['blocks'] / 4
+
+
+def test_citation_offsets_cover_their_elements(tmp_path, monkeypatch):
+    processed = _process(tmp_path / "full", [_filing()], monkeypatch)
+    offsets = processed['offsets']
+    assert offsets['ids'] == [c['id'] for c in processed['citations']]
+    for citation_id, start, end in zip(offsets['ids'], offsets['starts'], offsets['ends']):
+        element = processed['cited'][start:end].decode('utf-8')
+        assert f'id="{citation_id}"' in element.split('>', 1)[0]
+
+    # An unclosed paragraph ends where the next one starts
+    texts = [c['text'] for c in processed['citations']]
+    assert any(text.strip() == "An unclosed paragraph on page 3" for text in texts)
+    assert len(processed['tables']) == 1